@@ -1,3 +1,4 @@
+import atexit
 from flask import Flask
 from flask_restx import Api
 from app.api.v1.users import api as users_ns
@@ -9,9 +10,10 @@ from app.api.v1.amenities import api as amenities_ns
 pip install flask-restx. Makes it easy to create RESTful APIs in Python"""
 
 
-def create_app():
+def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
     """Creating and configuring the Flask application."""
+    app.config.from_object(config_class)
 
     api = Api(app, version='1.0', title='HBnB',
               description='HBnB Application API')
@@ -21,4 +23,28 @@ def create_app():
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
 
+    if app.config.get('STORAGE_DIR'):
+        enable_storage_persistence(app)
+
     return app
+
+
+def enable_storage_persistence(app):
+    """Makes the storage durable in the STORAGE_DIR directory."""
+    from app.models import storage
+    from app.models.amenity import Amenity
+    from app.models.place import Place
+    from app.models.review import Review
+    from app.models.user import User
+
+    # create_app may run more than once in a process (tests, scripts)
+    if storage.persistence is not None:
+        return
+    storage.enable_persistence(
+        app.config['STORAGE_DIR'],
+        models=(User, Place, Review, Amenity),
+        commit_interval=app.config['STORAGE_COMMIT_INTERVAL'],
+        snapshot_interval=app.config['STORAGE_SNAPSHOT_INTERVAL'],
+        snapshot_min_records=app.config['STORAGE_SNAPSHOT_MIN_RECORDS'],
+    )
+    atexit.register(storage.disable_persistence)
@@ -3,4 +3,8 @@
 # the application"""
 
 from app.persistence.repository import InMemoryRepository
-storage = InMemoryRepository()
+
+# Secondary indexes for the email, owner, place and author lookups
+storage = InMemoryRepository(
+    indexes=('email', 'owner_id', 'place_id', 'user_id')
+)
@@ -3,7 +3,12 @@ In-memory repository to manage objects.
 Provides methods to add, retrieve, update, and delete objects.
 """
 
+import threading
 from abc import ABC, abstractmethod
+from app.persistence.journal import StoragePersistence
+
+# Sentinel for attributes an object does not define
+_MISSING = object()
 
 
 class Repository(ABC):
@@ -91,15 +96,184 @@ class InMemoryRepository:
     Class representing an in-memory repository.
 
     This class implements basic methods to manage objects in memory,
-    storing them in a dictionary.
+    storing them in a dictionary keyed by ID and in one partition per
+    class, so class-scoped reads, clears and counts only touch the objects
+    of that class. Attribute lookups can be served by
+    declared secondary indexes, which map an attribute value to the objects
+    carrying it and are kept in sync by add, update, delete and clear_all.
+
+    With enable_persistence, the repository survives restarts: every
+    mutation is appended to a journal that save() waits on, and the state
+    is rebuilt from the latest snapshot plus the journal tail.
     """
 
-    def __init__(self):
+    def __init__(self, indexes=()):
         """
         Initializes the repository with an empty dictionary to store objects.
         Objects are stored with their IDs as keys.
+
+        Args:
+            indexes: Names of the attributes to index (optional), for
+            example ('email',). Lookups on other attributes scan the store.
         """
         self.storage = {}
+        # class -> {object id -> object}
+        self._partitions = {}
+        # attribute name -> {value -> {object id -> object}}
+        self._indexes = {attr_name: {} for attr_name in indexes}
+        # object id -> {attribute name -> value it is indexed under}
+        self._indexed_values = {}
+        # Orders the writes with the journal and the snapshots
+        self._write_lock = threading.RLock()
+        # StoragePersistence journaling the writes, if enabled
+        self._persistence = None
+
+    @property
+    def persistence(self):
+        """The StoragePersistence journaling the writes, or None."""
+        return self._persistence
+
+    def enable_persistence(self, directory, models, **options):
+        """
+        Rebuilds the repository from a persistence directory and journals
+        every later mutation there.
+
+        Args:
+            directory: Where the snapshot and journal files are kept.
+            models: The model classes that may be stored.
+            **options: Tuning passed to StoragePersistence
+            (commit_interval, snapshot_interval, snapshot_min_records).
+
+        Returns:
+            The StoragePersistence attached to the repository.
+
+        Raises:
+            RuntimeError: If persistence is already enabled.
+        """
+        with self._write_lock:
+            if self._persistence is not None:
+                raise RuntimeError("Persistence is already enabled")
+            persistence = StoragePersistence(directory, models, **options)
+            persistence.attach(self)
+            self._persistence = persistence
+        return persistence
+
+    def disable_persistence(self):
+        """
+        Flushes and closes the journal. The objects stay in memory.
+        """
+        with self._write_lock:
+            persistence, self._persistence = self._persistence, None
+        if persistence is not None:
+            persistence.close()
+
+    def _index(self, obj):
+        """
+        Registers an object in every declared index it can be part of.
+
+        Args:
+            obj: The object to index.
+        """
+        values = {}
+        for attr_name, index in self._indexes.items():
+            value = getattr(obj, attr_name, _MISSING)
+            if value is _MISSING:
+                continue
+            try:
+                bucket = index.setdefault(value, {})
+            except TypeError:
+                # Unhashable values cannot be indexed, lookups will scan
+                continue
+            bucket[obj.id] = obj
+            values[attr_name] = value
+        if values:
+            self._indexed_values[obj.id] = values
+
+    def _unindex(self, obj_id):
+        """
+        Removes an object from the indexes it was registered in.
+
+        Args:
+            obj_id: The identifier of the object to unindex.
+        """
+        values = self._indexed_values.pop(obj_id, None)
+        if not values:
+            return
+        for attr_name, value in values.items():
+            index = self._indexes[attr_name]
+            bucket = index.get(value)
+            if bucket is None:
+                continue
+            bucket.pop(obj_id, None)
+            if not bucket:
+                del index[value]
+
+    def _partitions_for(self, cls):
+        """
+        Retrieves the partitions holding instances of a class.
+
+        Args:
+            cls: The class to match, subclasses included.
+
+        Returns:
+            A list of partition dictionaries keyed by object ID.
+        """
+        return [
+            partition for part_cls, partition in self._partitions.items()
+            if issubclass(part_cls, cls)
+        ]
+
+    def _discard(self, obj_id):
+        """
+        Removes an object from the ID map, its partition and the indexes.
+
+        Args:
+            obj_id: The identifier of the object to remove.
+
+        Returns:
+            The removed object, or None if it was not stored.
+        """
+        obj = self.storage.pop(obj_id, None)
+        if obj is None:
+            return None
+        partition = self._partitions.get(type(obj))
+        if partition is not None:
+            partition.pop(obj_id, None)
+        self._unindex(obj_id)
+        return obj
+
+    def _insert(self, obj):
+        """
+        Stores an object, replacing any previous object with the same ID.
+
+        Args:
+            obj: The object to store.
+        """
+        self._discard(obj.id)
+        self.storage[obj.id] = obj
+        self._partitions.setdefault(type(obj), {})[obj.id] = obj
+        self._index(obj)
+
+    def _clear(self, cls=None):
+        """
+        Removes every object, or every object of a specific type.
+
+        Args:
+            cls: The class of objects to remove (optional).
+        """
+        if cls is None:
+            self.storage.clear()
+            self._partitions.clear()
+            self._indexed_values.clear()
+            for index in self._indexes.values():
+                index.clear()
+            return
+        for part_cls in list(self._partitions):
+            if not issubclass(part_cls, cls):
+                continue
+            for obj_id in self._partitions.pop(part_cls):
+                del self.storage[obj_id]
+                self._unindex(obj_id)
 
     def add(self, obj):
         """
@@ -108,7 +282,10 @@ class InMemoryRepository:
         Args:
             obj: The object to add.
         """
-        self.storage[obj.id] = obj
+        with self._write_lock:
+            self._insert(obj)
+            if self._persistence is not None:
+                self._persistence.record_put(obj)
 
     def get(self, obj_id):
         """
@@ -138,10 +315,25 @@ class InMemoryRepository:
             return list(self.storage.values())
         else:
             return [
-                obj for obj in self.storage.values()
-                if isinstance(obj, cls)
+                obj for partition in self._partitions_for(cls)
+                for obj in partition.values()
             ]
 
+    def count(self, cls=None):
+        """
+        Counts all objects or the objects of a specific type.
+
+        Args:
+            cls: The class of objects to count (optional). The count is
+            read from the class partitions without visiting any object.
+
+        Returns:
+            The number of matching objects.
+        """
+        if cls is None:
+            return len(self.storage)
+        return sum(len(partition) for partition in self._partitions_for(cls))
+
     def update(self, obj_id, data):
         """
         Updates an existing object in the repository with new data.
@@ -150,11 +342,16 @@ class InMemoryRepository:
             obj_id: The identifier of the object to update.
             data: A dictionary containing new data for the object.
         """
-        obj = self.get(obj_id)
-        if obj:
-            for key, value in data.items():
-                setattr(obj, key, value)
-            self.storage[obj_id] = obj
+        with self._write_lock:
+            obj = self.get(obj_id)
+            if obj:
+                self._unindex(obj_id)
+                for key, value in data.items():
+                    setattr(obj, key, value)
+                self.storage[obj_id] = obj
+                self._index(obj)
+                if self._persistence is not None:
+                    self._persistence.record_put(obj)
 
     def delete(self, obj_or_id):
         """
@@ -170,8 +367,10 @@ class InMemoryRepository:
         else:
             raise ValueError("delete() requires a valid object or object ID")
 
-        if obj_id in self.storage:
-            del self.storage[obj_id]
+        with self._write_lock:
+            deleted = self._discard(obj_id) is not None
+            if deleted and self._persistence is not None:
+                self._persistence.record_delete(obj_id)
 
     def clear_all(self, cls=None):
         """
@@ -181,12 +380,30 @@ class InMemoryRepository:
             cls: The class of objects to delete (optional). If provided,
             only objects of this type are deleted.
         """
-        if cls is None:
-            self.storage.clear()
-        else:
-            self.storage = {
-                k: v for k, v in self.storage.items() if not isinstance(v, cls)
-            }
+        with self._write_lock:
+            self._clear(cls)
+            if self._persistence is not None:
+                self._persistence.record_clear(cls)
+
+    def _lookup(self, attr_name, attr_value):
+        """
+        Looks up an attribute value in the declared indexes.
+
+        Args:
+            attr_name: The name of the attribute to search by.
+            attr_value: The attribute value to match.
+
+        Returns:
+            A dictionary of the matching objects keyed by ID, or None if
+            the attribute is not indexed and the store must be scanned.
+        """
+        index = self._indexes.get(attr_name)
+        if index is None:
+            return None
+        try:
+            return index.get(attr_value, {})
+        except TypeError:
+            return None
 
     def get_by_attribute(self, attr_name, attr_value):
         """
@@ -200,6 +417,9 @@ class InMemoryRepository:
             The object that matches the search criteria,
             or None if no object matches.
         """
+        bucket = self._lookup(attr_name, attr_value)
+        if bucket is not None:
+            return next(iter(bucket.values()), None)
         return next(
             (
                 obj for obj in self.storage.values()
@@ -220,6 +440,9 @@ class InMemoryRepository:
         Returns:
             A list of objects that match the search criteria.
         """
+        bucket = self._lookup(attr_name, attr_value)
+        if bucket is not None:
+            return list(bucket.values())
         return [
             obj for obj in self.storage.values()
             if getattr(obj, attr_name, None) == attr_value
@@ -228,7 +451,11 @@ class InMemoryRepository:
     def save(self):
         """
         Saves changes to the repository.
-        In this in-memory implementation, this method is empty because
-        changes are immediately reflected.
-        """
-        pass
+        Changes are immediately reflected in memory. When persistence is
+        enabled, this waits until the journaled changes are on disk.
+        Attributes set directly on an object are not journaled, so
+        changes must go through add() or update() to be persisted.
+        """
+        persistence = self._persistence
+        if persistence is not None:
+            persistence.sync()
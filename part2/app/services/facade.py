@@ -48,13 +48,12 @@ class HBnBFacade:
         if not user:
             raise ValidationError("User not found")
 
-        # Update user fields
-        if 'first_name' in user_data:
-            user.first_name = user_data['first_name']
-        if 'last_name' in user_data:
-            user.last_name = user_data['last_name']
-        if 'email' in user_data:
-            user.email = user_data['email']
+        # Update user fields through storage so the email index follows
+        storage.update(user_id, {
+            key: user_data[key]
+            for key in ('first_name', 'last_name', 'email')
+            if key in user_data
+        })
 
         storage.save()  # Save changes
         return user
@@ -72,12 +71,8 @@ class HBnBFacade:
         return storage.get(user_id)
 
     def get_user_by_email(self, email):
-        # Search for the user by email among all users
-        users = storage.get_all(User)
-        for user in users:
-            if user.email == email:
-                return user
-        return None
+        # Search for the user through the email index
+        return storage.get_by_attribute('email', email)
 
     def get_all_users(self):
         return storage.get_all(User)  # Retrieve all users
@@ -121,11 +116,14 @@ class HBnBFacade:
         if not review:
             raise ValidationError("Review not found")
 
+        changes = {}
         if 'text' in review_data:
-            review.text = review_data['text']
+            changes['text'] = review_data['text']
         if 'rating' in review_data:
-            review.rating = review_data['rating']
+            changes['rating'] = review_data['rating']
 
+        # Through the repository so the change reaches the journal
+        storage.update(review_id, changes)
         storage.save()
         return review
 
@@ -0,0 +1,143 @@
+"""
+Unit tests for the InMemoryRepository.
+
+These tests check the per-class partitions and that the declared
+secondary indexes stay in sync with the store through add, update, delete
+and clear_all.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from app.persistence.repository import InMemoryRepository
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.models.review import Review
+
+MODELS = (User, Place, Review, Amenity)
+
+
+class TestInMemoryRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = InMemoryRepository(indexes=('email', 'place_id'))
+        self.user = User(first_name="Jane", last_name="Doe",
+                         email="jane@example.com")
+        self.repo.add(self.user)
+
+    def test_get_by_indexed_attribute(self):
+        found = self.repo.get_by_attribute('email', 'jane@example.com')
+        self.assertIs(found, self.user)
+        self.assertIsNone(
+            self.repo.get_by_attribute('email', 'nobody@example.com'))
+
+    def test_update_moves_index_entry(self):
+        self.repo.update(self.user.id, {'email': 'jane.doe@example.com'})
+        self.assertIsNone(
+            self.repo.get_by_attribute('email', 'jane@example.com'))
+        self.assertIs(
+            self.repo.get_by_attribute('email', 'jane.doe@example.com'),
+            self.user)
+
+    def test_delete_and_clear_remove_index_entries(self):
+        review = Review(text="Nice", rating=4, place_id="p1",
+                        user_id=self.user.id)
+        self.repo.add(review)
+        self.assertEqual(
+            self.repo.get_all_by_attribute('place_id', 'p1'), [review])
+
+        self.repo.delete(review)
+        self.assertEqual(self.repo.get_all_by_attribute('place_id', 'p1'), [])
+
+        self.repo.clear_all(User)
+        self.assertIsNone(
+            self.repo.get_by_attribute('email', 'jane@example.com'))
+
+    def test_unindexed_attribute_falls_back_to_scan(self):
+        self.assertIs(
+            self.repo.get_by_attribute('first_name', 'Jane'), self.user)
+
+    def test_class_partitions(self):
+        review = Review(text="Nice", rating=4, place_id="p1",
+                        user_id=self.user.id)
+        self.repo.add(review)
+        self.assertEqual(self.repo.get_all(Review), [review])
+        self.assertEqual(self.repo.count(User), 1)
+        self.assertEqual(self.repo.count(), 2)
+
+        self.repo.clear_all(Review)
+        self.assertEqual(self.repo.count(Review), 0)
+        self.assertEqual(self.repo.get_all(User), [self.user])
+
+
+class TestStoragePersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def open_repo(self):
+        repo = InMemoryRepository(indexes=('email',))
+        repo.enable_persistence(self.directory, MODELS,
+                                snapshot_interval=None)
+        return repo
+
+    def test_journal_replay(self):
+        repo = self.open_repo()
+        kept = User(first_name="Jane", last_name="Doe",
+                    email="jane@example.com")
+        dropped = User(first_name="John", last_name="Doe",
+                       email="john@example.com")
+        repo.add(kept)
+        repo.add(dropped)
+        repo.update(kept.id, {'first_name': "Janet"})
+        repo.delete(dropped)
+        repo.save()
+        repo.disable_persistence()
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        user = recovered.get(kept.id)
+        self.assertEqual(user.first_name, "Janet")
+        self.assertEqual(user.created_at, kept.created_at)
+        self.assertIsNone(recovered.get(dropped.id))
+        self.assertIs(
+            recovered.get_by_attribute('email', 'jane@example.com'), user)
+
+    def test_snapshot_then_journal_tail(self):
+        repo = self.open_repo()
+        repo.add(Amenity(name="Wifi"))
+        repo.persistence.compact()
+        repo.add(Amenity(name="Pool"))
+        repo.disable_persistence()
+
+        logs = [name for name in os.listdir(self.directory)
+                if name.endswith('.log')]
+        self.assertEqual(len(logs), 1)
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        self.assertEqual(
+            sorted(a.name for a in recovered.get_all(Amenity)),
+            ["Pool", "Wifi"])
+
+    def test_torn_tail_is_dropped(self):
+        repo = self.open_repo()
+        amenity = Amenity(name="Wifi")
+        repo.add(amenity)
+        repo.disable_persistence()
+
+        log, = [name for name in os.listdir(self.directory)
+                if name.endswith('.log')]
+        with open(os.path.join(self.directory, log), 'ab') as journal:
+            journal.write(b'\x00\x00\x01\x00partial')
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        self.assertEqual(recovered.get(amenity.id).name, "Wifi")
+        self.assertEqual(recovered.count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,9 +10,21 @@ class Config:
         environment variables.
         DEBUG (bool): Flag indicating if debugging is enabled; default is
         False.
+        STORAGE_DIR (str): Directory where the in-memory storage keeps its
+        journal and snapshots; persistence is disabled when unset.
+        STORAGE_COMMIT_INTERVAL (float): Seconds the journal waits to group
+        writes into one fsync.
+        STORAGE_SNAPSHOT_INTERVAL (float): Seconds between compactions of
+        the journal into a snapshot.
+        STORAGE_SNAPSHOT_MIN_RECORDS (int): Journal records needed before a
+        compaction runs.
     """
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    STORAGE_DIR = os.getenv('HBNB_STORAGE_DIR')
+    STORAGE_COMMIT_INTERVAL = 0.002
+    STORAGE_SNAPSHOT_INTERVAL = 300
+    STORAGE_SNAPSHOT_MIN_RECORDS = 1000
 
 
 class DevelopmentConfig(Config):
@@ -1,9 +1,11 @@
+import atexit
 from flask import Flask
 from flask_bcrypt import Bcrypt
 from flask_restx import Api
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from app.logger import configure_logging
 
 db = SQLAlchemy()
 
@@ -16,12 +18,16 @@ def create_app(config_class="config.DevelopmentConfig"):
     """Creating and configuring the Flask application."""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    configure_logging(app)
 
     # Set JWT secret key
     app.config['JWT_SECRET_KEY'] = 'dev-secret-key'
 
     # Initialize extensions
     db.init_app(app)
+    configure_database(app)
+    configure_unit_of_work(app)
+    configure_identity_map(app)
     CORS(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
@@ -65,4 +71,53 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
     api.add_namespace(admin_ns, path='/api/v1/admin')
 
+    configure_storage(app)
+
     return app
+
+
+def configure_database(app):
+    """Apply the SQLITE_PRAGMAS setting to the connections of the app."""
+    from app.persistence.sqlite import apply_pragmas
+
+    with app.app_context():
+        apply_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS'))
+
+
+def configure_unit_of_work(app):
+    """Apply the UNIT_OF_WORK setting to the requests of the app."""
+    from app.persistence import unit_of_work
+
+    unit_of_work.init_app(app)
+
+
+def configure_identity_map(app):
+    """Apply the IDENTITY_MAP setting to the requests of the app."""
+    from app.persistence import identity_map
+
+    identity_map.init_app(app)
+
+
+def configure_storage(app):
+    """Apply the STORAGE_* settings to the in-memory storage."""
+    from app.models import storage
+    from app.models.amenity import Amenity
+    from app.models.place import Place
+    from app.models.review import Review
+    from app.models.user import User
+
+    models = {model.__name__: model
+              for model in (User, Place, Review, Amenity)}
+    for name in app.config.get('STORAGE_COMPACT_MODELS', ()):
+        storage.compact(models[name])
+
+    # create_app may run more than once in a process (tests, scripts)
+    if app.config.get('STORAGE_DIR') and storage.persistence is None:
+        storage.enable_persistence(
+            app.config['STORAGE_DIR'],
+            models=models.values(),
+            commit_interval=app.config['STORAGE_COMMIT_INTERVAL'],
+            snapshot_interval=app.config['STORAGE_SNAPSHOT_INTERVAL'],
+            snapshot_min_records=app.config['STORAGE_SNAPSHOT_MIN_RECORDS'],
+        )
+        atexit.register(storage.disable_persistence)
@@ -7,10 +7,18 @@ amenity control.
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.facade import HBnBFacade
+from app.models.amenity import Amenity
+from app.models.serializers import serializer
+from app.models.user import User
 
 api = Namespace('admin', description='Admin operations')
 facade = HBnBFacade()
 
+# Unlike the public user endpoints, admins see the admin status
+serialize_user = serializer(
+    User, ('id', 'first_name', 'last_name', 'email', 'is_admin'))
+serialize_amenity = serializer(Amenity, ('id', 'name'))
+
 # API Models
 user_model = api.model('UserCreate', {
     'first_name': fields.String(required=True, description='First name'),
@@ -48,13 +56,7 @@ class AdminUserList(Resource):
 
         try:
             new_user = facade.create_user(api.payload)
-            return {
-                'id': new_user.id,
-                'first_name': new_user.first_name,
-                'last_name': new_user.last_name,
-                'email': new_user.email,
-                'is_admin': new_user.is_admin
-            }, 201
+            return serialize_user(new_user), 201
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -75,13 +77,7 @@ class AdminUserResource(Resource):
 
         try:
             updated_user = facade.admin_update_user(user_id, api.payload)
-            return {
-                'id': updated_user.id,
-                'first_name': updated_user.first_name,
-                'last_name': updated_user.last_name,
-                'email': updated_user.email,
-                'is_admin': updated_user.is_admin
-            }, 200
+            return serialize_user(updated_user), 200
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -101,10 +97,7 @@ class AdminAmenityList(Resource):
 
         try:
             new_amenity = facade.create_amenity(api.payload)
-            return {
-                'id': new_amenity.id,
-                'name': new_amenity.name
-            }, 201
+            return serialize_amenity(new_amenity), 201
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -126,9 +119,6 @@ class AdminAmenityResource(Resource):
         try:
             updated_amenity = facade.admin_update_amenity(
                 amenity_id, api.payload)
-            return {
-                'id': updated_amenity.id,
-                'name': updated_amenity.name
-            }, 200
+            return serialize_amenity(updated_amenity), 200
         except ValueError as e:
             return {'error': str(e)}, 400
@@ -4,8 +4,13 @@ Provides routes to create, update, retrieve, and delete amenities via the API.
 """
 
 # app/api/v1/amenities.py
+from flask import request
 from flask_restx import Namespace, Resource, fields
-from app.services.facade import HBnBFacade
+from app.services.facade import HBnBFacade, ValidationError
+from app.api.v1.pagination import page_params, parse_page_args
+from app.api.v1.fields import fields_params, parse_names
+from app.models.amenity import Amenity
+from app.models.serializers import serializer
 
 # Create a namespace for grouping amenity-related routes
 api = Namespace('amenities', description='Amenity operations')
@@ -16,6 +21,10 @@ amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
 })
 
+# Fields an amenity list may return, all of them by default
+AMENITY_FIELDS = ('id', 'name')
+serialize_amenity = serializer(Amenity, AMENITY_FIELDS)
+
 # Create an instance of HBnBFacade to handle business logic for amenities
 facade = HBnBFacade()
 
@@ -36,18 +45,30 @@ class AmenityList(Resource):
         if error:
             return {'error': error}, 400
         # Return the created amenity details with a 201 (created) status
-        return {
-            'id': amenity.id,
-            'name': amenity.name
-        }, 201
+        return serialize_amenity(amenity), 201
 
-    @api.response(200, 'List of amenities retrieved successfully')
+    @api.doc(params={**page_params, **fields_params})
+    @api.response(200, 'Page of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters or fields')
     def get(self):
-        """Retrieve all amenities"""
-        # Retrieve the list of all amenities via the facade
-        amenities = facade.get_all_amenities()
-        # Return a list of amenities, each with its 'id' and 'name'
-        return [{'id': a.id, 'name': a.name} for a in amenities], 200
+        """Retrieve a page of amenities, oldest first"""
+        # Retrieve one page of amenities via the facade, loading only the
+        # requested fields
+        try:
+            limit, cursor = parse_page_args(request.args)
+            selected = parse_names(request.args, 'fields',
+                                   AMENITY_FIELDS) or AMENITY_FIELDS
+            amenities, next_cursor = facade.get_amenities_page(
+                limit, cursor, selected)
+        except (ValueError, ValidationError) as e:
+            return {'error': str(e)}, 400
+        # Return the amenities, each with its 'id' and 'name' unless fewer
+        # fields were requested, and the cursor of the next page
+        return {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'results': serializer(Amenity, selected).many(amenities)
+        }, 200
 
 
 @api.route('/<amenity_id>')
@@ -65,7 +86,7 @@ class AmenityResource(Resource):
         if not amenity:
             return {'error': 'Amenity not found'}, 404
         # Return the amenity details with a 200 (OK) status
-        return {'id': amenity.id, 'name': amenity.name}, 200
+        return serialize_amenity(amenity), 200
 
     @api.expect(amenity_model, validate=True)
     @api.response(200, 'Amenity updated successfully')
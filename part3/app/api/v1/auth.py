@@ -1,8 +1,10 @@
+import logging
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token
 from app.services.facade import HBnBFacade
 
 facade = HBnBFacade()
+logger = logging.getLogger(__name__)
 auth_ns = Namespace('auth', description='Authentication operations')
 api = auth_ns
 
@@ -22,27 +24,22 @@ class Login(Resource):
         Authenticate user and return a JWT token.
         The token includes user ID and admin status for authorization.
         """
-        print("\n=== Login Attempt ===")
         credentials = api.payload
-        print(f"Login attempt for email: {credentials.get('email')}")
+        logger.debug("Login attempt for email: %s", credentials.get('email'))
 
         # Step 1: Get user by email
         user = facade.get_user_by_email(credentials.get('email'))
         if not user:
-            print("No user found with this email")
+            logger.debug("No user found with this email")
             return {'error': 'Invalid credentials'}, 401
 
-        print(f"Found user with email: {user.email}")
-
         # Step 2: Verify password
         password_valid = user.verify_password(credentials.get('password'))
 
         if not password_valid:
-            print("Authentication failed")
+            logger.info("Authentication failed for %s", user.email)
             return {'error': 'Invalid credentials'}, 401
 
-        print("Authentication successful")
-
         # Step 3: Generate JWT token
         token_identity = {
             'id': str(user.id),
@@ -51,7 +48,6 @@ class Login(Resource):
 
         try:
             access_token = create_access_token(identity=token_identity)
-            print("Token created successfully")
 
             return {
                 'access_token': access_token,
@@ -60,5 +56,5 @@ class Login(Resource):
             }, 200
 
         except Exception as e:
-            print(f"Error creating token: {str(e)}")
+            logger.error("Error creating token: %s", e)
             return {'error': 'Authentication error'}, 500
@@ -0,0 +1,25 @@
+"""
+Query parameters of the endpoints returning sparse fieldsets.
+"""
+
+# Documentation of the parameters, for @api.doc(params=...)
+fields_params = {
+    'fields': 'Comma-separated fields to return, all of them by default'
+}
+expand_params = {
+    'expand': 'Comma-separated relations to embed in each result'
+}
+
+
+def parse_names(args, name, allowed):
+    """Read a comma-separated list of names, None when it is absent"""
+    value = args.get(name)
+    if value is None:
+        return None
+    names = [part.strip() for part in value.split(',') if part.strip()]
+    unknown = [part for part in names if part not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown {name}: {', '.join(unknown)} "
+                         f"(expected {', '.join(allowed)})")
+    # Keep the first occurrence of each name
+    return list(dict.fromkeys(names))
@@ -0,0 +1,20 @@
+"""
+Query parameters shared by the paginated list endpoints.
+"""
+
+from app.services.facade import DEFAULT_PAGE_LIMIT
+
+# Documentation of the pagination parameters, for @api.doc(params=...)
+page_params = {
+    'limit': f'Page size (default {DEFAULT_PAGE_LIMIT})',
+    'cursor': 'next_cursor of the previous page, omitted for the first one'
+}
+
+
+def parse_page_args(args):
+    """Read the limit and cursor query parameters"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    return limit, args.get('cursor')
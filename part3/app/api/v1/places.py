@@ -3,11 +3,14 @@ API Endpoints to manage places.
 Provides routes to create, retrieve, update, and delete places via the API.
 """
 
+import logging
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.facade import HBnBFacade
-from app.models.place import Place
-from app.models import storage
+from app.services.facade import HBnBFacade, ValidationError
+from app.api.v1.pagination import page_params, parse_page_args
+from app.api.v1.fields import expand_params, fields_params, parse_names
+from app.models.place import PLACE_FIELDS, PLACE_RELATIONS, place_serializer
 
 # Declare the API Namespace for place-related operations
 api = Namespace('places', description="Operations related to places")
@@ -47,6 +50,7 @@ place_model = api.model('Place', {
 })
 
 facade = HBnBFacade()
+logger = logging.getLogger(__name__)
 
 
 def validate_place_data(data, is_update=False):
@@ -58,21 +62,78 @@ def validate_place_data(data, is_update=False):
     return None
 
 
+def parse_price_range(args):
+    """Read the optional min_price/max_price query parameters"""
+    bounds = []
+    for name in ('min_price', 'max_price'):
+        value = args.get(name)
+        if value is None:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(float(value))
+        except ValueError:
+            raise ValueError(f"{name} must be a number")
+    return bounds
+
+
+def parse_fieldset(args):
+    """Read the optional fields and expand parameters of place results"""
+    return (parse_names(args, 'fields', PLACE_FIELDS),
+            parse_names(args, 'expand', PLACE_RELATIONS))
+
+
+def parse_bbox(args):
+    """Read the optional bbox=min_lon,min_lat,max_lon,max_lat parameter"""
+    value = args.get('bbox')
+    if value is None:
+        return None
+    try:
+        bbox = [float(part) for part in value.split(',')]
+    except ValueError:
+        bbox = []
+    if len(bbox) != 4:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    return bbox
+
+
 @api.route('/')
 class PlaceList(Resource):
-    @api.doc('get_places')
-    @api.response(200, 'List of places retrieved successfully')
+    @api.doc('get_places', params={
+        'min_price': 'Only places with at least this price',
+        'max_price': 'Only places with at most this price',
+        'bbox': 'Only places inside min_lon,min_lat,max_lon,max_lat',
+        'sort': 'rating (average rating) or reviews (number of reviews), '
+                'greatest first, instead of oldest first',
+        **page_params, **fields_params, **expand_params
+    })
+    @api.response(200, 'Page of places retrieved successfully')
+    @api.response(400, 'Invalid filters or pagination parameters')
     @api.response(404, 'No places found')
     def get(self):
-        """Public endpoint: Retrieve all places from storage."""
+        """Public endpoint: Retrieve a page of places, oldest first."""
+        try:
+            min_price, max_price = parse_price_range(request.args)
+            bbox = parse_bbox(request.args)
+            limit, cursor = parse_page_args(request.args)
+            selected, expand = parse_fieldset(request.args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         try:
-            places = storage.get_all(Place)
-            if not places:
+            places, next_cursor = facade.get_places_page(
+                limit, cursor, min_price, max_price, bbox,
+                request.args.get('sort'))
+            if not places and cursor is None:
                 return {"message": "No places found"}, 404
 
-            places_list = [place.to_dict()
-                           for place in places if isinstance(place, Place)]
-            return places_list, 200
+            return {
+                'limit': limit,
+                'next_cursor': next_cursor,
+                'results': place_serializer(selected, expand).many(places)
+            }, 200
+        except ValidationError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             return {"error": f"Server error: {str(e)}"}, 500
 
@@ -85,7 +146,7 @@ class PlaceList(Resource):
     def post(self):
         """Protected endpoint: Create a new place"""
         current_user = get_jwt_identity()
-        print(f"Creating place for user: {current_user}")
+        logger.debug("Creating place for user: %s", current_user)
 
         place_data = api.payload
         place_data['owner_id'] = current_user['id']
@@ -101,18 +162,132 @@ class PlaceList(Resource):
             return {'error': str(e)}, 400
 
 
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc('get_nearby_places', params={
+        'lat': 'Latitude of the search point',
+        'lon': 'Longitude of the search point',
+        'radius_km': 'Only places within this distance (optional)',
+        'limit': 'Maximum number of places (default 10)'
+    })
+    @api.response(200, 'Places sorted by distance')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Public endpoint: Places closest to a point, nearest first"""
+        args = request.args
+        try:
+            latitude = float(args['lat'])
+            longitude = float(args['lon'])
+            radius_km = args.get('radius_km')
+            radius_km = float(radius_km) if radius_km is not None else None
+            limit = int(args.get('limit', 10))
+        except KeyError:
+            return {"error": "lat and lon are required"}, 400
+        except ValueError:
+            return {"error": "lat, lon, radius_km and limit must be "
+                             "numbers"}, 400
+
+        try:
+            nearby = facade.get_nearby_places(latitude, longitude, limit,
+                                              radius_km)
+        except ValidationError as e:
+            return {"error": str(e)}, 400
+
+        results = []
+        for distance, place in nearby:
+            place_dict = place.to_dict()
+            place_dict['distance_km'] = round(distance, 3)
+            results.append(place_dict)
+        return results, 200
+
+
+@api.route('/top')
+class PlaceTop(Resource):
+    @api.doc('top_places', params={
+        'by': 'rating (default) or reviews',
+        'limit': 'Number of places (default 10)',
+        'bayesian': 'Rank by the Bayesian average rating, so places with '
+                    'few reviews do not dominate (default true)',
+        **fields_params, **expand_params
+    })
+    @api.response(200, 'Places ranked best first')
+    @api.response(400, 'Invalid parameters')
+    def get(self):
+        """Public endpoint: Best rated or most reviewed places"""
+        args = request.args
+        try:
+            limit = int(args.get('limit', 10))
+        except ValueError:
+            return {"error": "limit must be an integer"}, 400
+        try:
+            selected, expand = parse_fieldset(args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        bayesian = args.get('bayesian', 'true').lower() not in (
+            'false', '0', 'no')
+
+        try:
+            places = facade.get_top_places(args.get('by', 'rating'), limit,
+                                           bayesian)
+        except ValidationError as e:
+            return {"error": str(e)}, 400
+        return place_serializer(selected, expand).many(places), 200
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc('search_places', params={
+        'q': 'Keywords to find in the title or description',
+        'limit': 'Page size (default 20)',
+        'offset': 'Number of results to skip (default 0)'
+    })
+    @api.response(200, 'Places ranked by relevance')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Public endpoint: Keyword search on places, best match first"""
+        args = request.args
+        try:
+            limit = int(args.get('limit', 20))
+            offset = int(args.get('offset', 0))
+        except ValueError:
+            return {"error": "limit and offset must be integers"}, 400
+
+        try:
+            total, page = facade.search_places(args.get('q', ''), limit,
+                                               offset)
+        except ValidationError as e:
+            return {"error": str(e)}, 400
+
+        results = []
+        for score, place in page:
+            place_dict = place.to_dict()
+            place_dict['score'] = round(score, 4)
+            results.append(place_dict)
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "results": results
+        }, 200
+
+
 @api.route('/<string:place_id>')
 @api.param('place_id', 'The place identifier')
 class PlaceDetail(Resource):
-    @api.doc('get_place')
+    @api.doc('get_place', params={**fields_params, **expand_params})
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(400, 'Invalid fields')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Public endpoint: Get place details"""
+        try:
+            selected, expand = parse_fieldset(request.args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
         place = facade.get_place(place_id)
         if not place:
             return {"error": "Place not found"}, 404
-        return place.to_dict(), 200
+        return place.to_dict(selected, expand), 200
 
     @api.doc('update_place')
     @api.expect(place_model)
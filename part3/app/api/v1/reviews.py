@@ -3,9 +3,14 @@ API Endpoints to manage reviews.
 Provides routes to create, retrieve, update, and delete reviews via the API.
 """
 
+import logging
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.facade import HBnBFacade, ValidationError
+from app.api.v1.pagination import page_params, parse_page_args
+from app.models.review import Review
+from app.models.serializers import serializer
 
 # Create a namespace for review-related operations
 api = Namespace('reviews', description='Review operations')
@@ -30,7 +35,11 @@ review_model = api.model('Review', {
     )
 })
 
+REVIEW_FIELDS = ('id', 'text', 'rating', 'user_id', 'place_id')
+serialize_review = serializer(Review, REVIEW_FIELDS)
+
 facade = HBnBFacade()
+logger = logging.getLogger(__name__)
 
 
 @api.route('/')
@@ -54,57 +63,82 @@ class ReviewList(Resource):
         review_data = api.payload
         review_data['user_id'] = current_user['id']
 
-        print("\n=== Creating Review ===")
-        print(f"Review data: {review_data}")
+        logger.debug("Creating review with data: %s", review_data)
 
         try:
             # Check if the place exists
             place = facade.get_place(review_data['place_id'])
-            print(f"Place found: {place is not None}")
 
             if not place:
                 return {'error': 'Place not found'}, 404
 
-            print(f"Place owner: {place.owner_id}")
-            print(f"Current user: {current_user['id']}")
-
             # Check if user owns the place
             if place.owner_id == current_user['id']:
                 return {'error': 'You cannot review your own place'}, 400
 
-            # Check for existing review
-            existing_review = facade.get_user_review_for_place(
-                current_user['id'], review_data['place_id'])
-            if existing_review:
-                return {'error': 'You have already reviewed this place'}, 400
-
-            # Create the review
+            # Create the review, the facade rejects duplicate reviews
             review = facade.create_review(review_data)
-            print(f"Review created: {review.id}")
 
-            return {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user_id': review.user_id,
-                'place_id': review.place_id
-            }, 201
+            return serialize_review(review), 201
 
         except ValidationError as e:
-            print(f"Validation error: {str(e)}")
+            logger.debug("Validation error: %s", e)
             return {'error': str(e)}, 400
 
-    @api.response(200, 'List of reviews retrieved successfully')
+    @api.doc(params=page_params)
+    @api.response(200, 'Page of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        """Retrieve all reviews."""
-        reviews = facade.get_all_reviews()
-        return [{
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user_id,
-            'place_id': review.place_id
-        } for review in reviews], 200
+        """Retrieve a page of reviews, oldest first."""
+        try:
+            limit, cursor = parse_page_args(request.args)
+            reviews, next_cursor = facade.get_reviews_page(limit, cursor)
+        except (ValueError, ValidationError) as e:
+            return {'error': str(e)}, 400
+
+        return {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'results': serialize_review.many(reviews)
+        }, 200
+
+
+@api.route('/search')
+class ReviewSearch(Resource):
+    """Keyword search on reviews."""
+
+    @api.doc(params={
+        'q': 'Keywords to find in the review text',
+        'place_id': 'Only search the reviews of this place (optional)',
+        'limit': 'Page size (default 20)',
+        'offset': 'Number of results to skip (default 0)'
+    })
+    @api.response(200, 'Reviews ranked by relevance')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Search reviews, best match first."""
+        args = request.args
+        try:
+            limit = int(args.get('limit', 20))
+            offset = int(args.get('offset', 0))
+        except ValueError:
+            return {'error': 'limit and offset must be integers'}, 400
+
+        try:
+            total, page = facade.search_reviews(
+                args.get('q', ''), args.get('place_id'), limit, offset)
+        except ValidationError as e:
+            return {'error': str(e)}, 400
+
+        return {
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'results': [{
+                **serialize_review(review),
+                'score': round(score, 4)
+            } for score, review in page]
+        }, 200
 
 
 @api.route('/<review_id>')
@@ -119,13 +153,7 @@ class ReviewResource(Resource):
         if not review:
             return {'error': 'Review not found'}, 404
 
-        return {
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user_id,
-            'place_id': review.place_id
-        }, 200
+        return serialize_review(review), 200
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
@@ -146,13 +174,7 @@ class ReviewResource(Resource):
 
         try:
             updated_review = facade.update_review(review_id, api.payload)
-            return {
-                'id': updated_review.id,
-                'text': updated_review.text,
-                'rating': updated_review.rating,
-                'user_id': updated_review.user_id,
-                'place_id': updated_review.place_id
-            }, 200
+            return serialize_review(updated_review), 200
         except ValidationError as e:
             return {'error': str(e)}, 400
 
@@ -181,20 +203,27 @@ class ReviewResource(Resource):
 class PlaceReviewList(Resource):
     """Manage reviews for a specific place."""
 
-    @api.response(200, 'List of reviews retrieved successfully')
+    @api.doc(params={**page_params,
+                     'sort': 'newest (default) or rating, best first'})
+    @api.response(200, 'Page of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination or sort parameters')
     @api.response(404, 'Place not found')
     def get(self, place_id):
-        """Retrieve all reviews for a place."""
+        """Retrieve a page of the reviews of a place."""
         # Use facade.get_place instead of facade.place_repo.get
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
 
-        reviews = facade.get_reviews_by_place(place_id)
-        return [{
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user_id': review.user_id,
-            'place_id': review.place_id
-        } for review in reviews], 200
+        try:
+            limit, cursor = parse_page_args(request.args)
+            reviews, next_cursor = facade.get_reviews_by_place(
+                place_id, limit, cursor, request.args.get('sort', 'newest'))
+        except (ValueError, ValidationError) as e:
+            return {'error': str(e)}, 400
+
+        return {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'results': serialize_review.many(reviews)
+        }, 200
@@ -10,8 +10,11 @@ The managed routes include:
 - DELETE to delete a user by ID
 """
 
+import logging
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
+from app.models.serializers import serializer
+from app.models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Creating the namespace for user-related operations
@@ -29,8 +32,13 @@ user_model = api.model('User', {
         required=True, description='Password')
 })
 
+# Fields returned for a user, never the password
+USER_FIELDS = ('id', 'first_name', 'last_name', 'email')
+serialize_user = serializer(User, USER_FIELDS)
+
 # Instantiating the facade for user operations
 facade = HBnBFacade()
+logger = logging.getLogger(__name__)
 
 
 @api.route('/')
@@ -58,31 +66,24 @@ class UserList(Resource):
                    if the data is invalid
         """
         user_data = api.payload
-        print("\n=== Creating User via API ===")
-        print(f"Received request to create user with email: {user_data.get(
-            'email')}")
+        logger.debug("Received request to create user with email: %s",
+                     user_data.get('email'))
 
         # Check for unique email first
         existing_user = facade.get_user_by_email(user_data['email'])
         if existing_user:
-            print(f"Email {user_data['email']} already exists")
+            logger.debug("Email %s already exists", user_data['email'])
             return {'error': 'Email already registered'}, 400
 
         try:
             # Pass the raw data to facade - no password hashing here
             new_user = facade.create_user(user_data)
-            print("User created successfully")
 
             # Return user details (excluding password)
-            return {
-                'id': new_user.id,
-                'first_name': new_user.first_name,
-                'last_name': new_user.last_name,
-                'email': new_user.email
-            }, 201
+            return serialize_user(new_user), 201
 
         except ValueError as error:
-            print(f"Error creating user: {str(error)}")
+            logger.debug("Error creating user: %s", error)
             return {'error': str(error)}, 400
 
 
@@ -108,12 +109,7 @@ class UserResource(Resource):
             return {'error': 'User not found'}, 404
 
         # Return the details of the found user
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email
-        }, 200
+        return serialize_user(user), 200
 
     @jwt_required()
     @api.expect(user_model, validate=True)
@@ -143,12 +139,7 @@ class UserResource(Resource):
 
         try:
             updated_user = facade.update_user(user_id, api.payload)
-            return {
-                'id': updated_user.id,
-                'first_name': updated_user.first_name,
-                'last_name': updated_user.last_name,
-                'email': updated_user.email
-            }, 200
+            return serialize_user(updated_user), 200
         except ValueError as e:
             return {'error': str(e)}, 400
 
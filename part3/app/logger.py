@@ -0,0 +1,80 @@
+"""
+Logging setup for the HBnB application.
+
+Every module logs through ``logging.getLogger(__name__)``, so levels can be
+tuned per module with the ``LOG_LEVELS`` setting. Records are handed to a
+queue and written by a background listener thread, which keeps slow
+output streams off the request path. Log calls take ``%``-style arguments
+that are only formatted when the record is actually emitted; wrap costly
+values in ``Lazy`` so they are not even computed when the level is off.
+"""
+
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+_listener = None
+
+
+class Lazy:
+    """
+    Defers an expensive computation until a log record is formatted.
+
+    Example:
+        logger.debug("Place details: %s", Lazy(place.to_dict))
+    """
+
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+    __repr__ = __str__
+
+
+def configure_logging(app, stream=None):
+    """
+    Configures the ``app`` logger hierarchy from the Flask configuration.
+
+    Settings read from ``app.config``:
+        LOG_LEVEL (str): Level of the ``app`` logger, default WARNING.
+        LOG_LEVELS (dict): Per-module levels, e.g.
+            ``{'app.persistence': 'DEBUG'}``.
+        LOG_FORMAT (str): Format of the emitted lines.
+
+    Args:
+        app (Flask): The application being configured.
+        stream: Output stream of the listener, default ``sys.stderr``.
+    """
+    global _listener
+
+    root = logging.getLogger('app')
+    root.setLevel(app.config.get('LOG_LEVEL', 'WARNING'))
+    for name, level in app.config.get('LOG_LEVELS', {}).items():
+        logging.getLogger(name).setLevel(level)
+
+    # create_app may run several times in one process (tests), the queue
+    # and its listener are only installed once
+    if _listener is not None:
+        _listener.handlers[0].setStream(stream or sys.stderr)
+        return
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(
+        app.config.get('LOG_FORMAT', DEFAULT_FORMAT)))
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -3,7 +3,9 @@
 This business logic layer defines the main entities of the application.
 """
 
+from app.persistence.locks import ExclusiveLock
 from app.persistence.repository import InMemoryRepository
+from app.persistence.text import InvertedIndex
 from app import db
 
 # Table d'association Many-to-Many entre Place et Amenity
@@ -15,5 +17,34 @@ place_amenity = db.Table(
         'amenities.id'), primary_key=True)
 )
 
-# Initialise l'instance de stockage
-storage = InMemoryRepository()
+# Initialise l'instance de stockage, avec les index secondaires utilisés
+# par les recherches par email, propriétaire, lieu et auteur, et l'index
+# unique qui limite chaque utilisateur à un avis par lieu. Le stockage est
+# partagé par les threads du serveur Flask, d'où le verrou. Avec le GIL, les
+# lectures ne s'exécutent jamais en parallèle : un seul mutex est plus rapide
+# que le verrou lecteurs/écrivain, en lecture comme en écriture (voir
+# benchmarks/bench_concurrency.py).
+# Les prix sont triés pour les recherches par fourchette de prix, et les
+# coordonnées indexées sur une grille pour les recherches par zone (bbox).
+# L'index plein texte des lieux favorise les mots du titre ; celui des avis
+# est partitionné par lieu pour les recherches limitées à un lieu. Le tri par
+# date de création sert la pagination par curseur des listes, et les tris
+# composites les avis d'un lieu, des plus récents ou des mieux notés, et les
+# lieux par note moyenne, brute ou bayésienne, ou par nombre d'avis, pour les
+# tris de la liste et les classements
+storage = InMemoryRepository(
+    indexes=('email', 'owner_id', 'place_id', 'user_id'),
+    unique=(('user_id', 'place_id'),),
+    sorted_indexes=('price', 'created_at', ('place_id', 'created_at'),
+                    ('place_id', 'rating', 'created_at'),
+                    ('average_rating', 'created_at'),
+                    ('bayesian_rating', 'created_at'),
+                    ('review_count', 'created_at')),
+    spatial=('latitude', 'longitude'),
+    text_indexes={
+        'places': InvertedIndex(('title', 'description'),
+                                weights={'title': 2.0}),
+        'reviews': InvertedIndex(('text',), scope='place_id'),
+    },
+    lock=ExclusiveLock()
+)
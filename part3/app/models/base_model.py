@@ -1,6 +1,8 @@
 from app import db
+from app.persistence import unit_of_work
 import uuid
 from datetime import datetime
+from .serializers import serializer
 
 
 class BaseModel(db.Model):
@@ -8,15 +10,31 @@ class BaseModel(db.Model):
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(
         uuid.uuid4()))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Indexed for the keyset pagination of the list endpoints
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    def __init__(self, **kwargs):
+        """Assigns the identifier and timestamps when the object is built.
+
+        Column defaults only apply at flush time, while objects kept in the
+        in-memory storage are indexed by their ID as soon as they are added.
+        """
+        super().__init__(**kwargs)
+        if self.id is None:
+            self.id = str(uuid.uuid4())
+        now = datetime.utcnow()
+        if self.created_at is None:
+            self.created_at = now
+        if self.updated_at is None:
+            self.updated_at = now
+
     def save(self):
         """Updates the updated_at timestamp and saves the instance."""
         self.updated_at = datetime.utcnow()
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def update(self, data):
         """Attribute updates based on the dictionary provided."""
@@ -25,11 +43,11 @@ class BaseModel(db.Model):
                 setattr(self, key, value)
         self.save()
 
-    def to_dict(self):
-        """Converts the current instance into a dictionary."""
-        obj_dict = self.__dict__.copy()
-        # Converting dates to ISO 8601 format
-        obj_dict['created_at'] = self.created_at.isoformat()
-        obj_dict['updated_at'] = self.updated_at.isoformat()
-        obj_dict.pop('_sa_instance_state', None)
-        return obj_dict
+    def to_dict(self, fields=None):
+        """Converts the current instance into a dictionary.
+
+        Only the given column names are read, all the columns by default,
+        so columns a query left unloaded (``load_only``) are not fetched.
+        """
+        # Dates are converted to ISO 8601 format
+        return serializer(type(self), fields)(self)
@@ -2,8 +2,41 @@ from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship
 from app import db
 from .base_model import BaseModel
+from .serializers import serializer
 from app.models import place_amenity
 
+# Notes possibles d'un avis, une colonne d'histogramme par note
+RATINGS = range(1, 6)
+# A priori de la moyenne bayésienne : chaque lieu part de RATING_PRIOR_WEIGHT
+# avis fictifs notés RATING_PRIOR_MEAN, pour qu'un seul avis à 5 étoiles ne
+# suffise pas à dépasser les lieux bien notés par beaucoup d'avis. Après un
+# changement, rebuild_place_ratings recalcule les notes stockées
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_WEIGHT = 5
+# Champs de to_dict, dans l'ordre, et relations qu'il peut inclure
+PLACE_FIELDS = ('id', 'title', 'description', 'price', 'latitude',
+                'longitude', 'owner_id', 'review_count', 'average_rating',
+                'bayesian_rating', 'rating_histogram')
+PLACE_RELATIONS = ('reviews', 'amenities')
+
+
+def _review_count(place):
+    return place.review_count or 0
+
+
+def _average_rating(place):
+    return round(place.average_rating or 0.0, 2)
+
+
+def _bayesian_rating(place):
+    return round(place.bayesian_rating, 2) \
+        if place.bayesian_rating is not None else None
+
+
+def _rating_histogram(place):
+    return {str(rating): getattr(place, f'rating_{rating}_count') or 0
+            for rating in RATINGS}
+
 
 class Place(BaseModel, db.Model):
     """
@@ -15,17 +48,48 @@ class Place(BaseModel, db.Model):
     """
 
     __tablename__ = 'places'
+    # Index composite pour les recherches par zone (bbox)
+    __table_args__ = (
+        db.Index('ix_places_lat_lon', 'latitude', 'longitude'),
+    )
 
-    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False)
+    # Indexé pour les recherches des lieux d'un utilisateur
+    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False,
+                        index=True)
     reviews = relationship('Review', backref='place', lazy=True)
 
     # Définir les colonnes SQLAlchemy pour chaque attribut
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255), nullable=True)
-    price = db.Column(db.Float, nullable=False)
+    # Indexé pour les filtres min_price/max_price
+    price = db.Column(db.Float, nullable=False, index=True)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
-    owner_id = db.Column(db.String(36), nullable=False)
+    # Indexé pour les recherches par propriétaire
+    owner_id = db.Column(db.String(36), nullable=False, index=True)
+
+    # Agrégats des notes des avis, tenus à jour à chaque écriture d'un avis
+    # (voir rating_changes) pour ne jamais relire les avis. La moyenne est
+    # stockée pour pouvoir trier et indexer les lieux par note
+    review_count = db.Column(db.Integer, nullable=False, default=0,
+                             server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0,
+                           server_default='0')
+    average_rating = db.Column(db.Float, nullable=False, default=0.0,
+                               server_default='0')
+    # Moyenne bayésienne (voir RATING_PRIOR_MEAN), nulle sans avis pour que
+    # les classements ne gardent que les lieux notés
+    bayesian_rating = db.Column(db.Float, nullable=True)
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0,
+                               server_default='0')
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0,
+                               server_default='0')
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0,
+                               server_default='0')
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0,
+                               server_default='0')
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0,
+                               server_default='0')
 
     # Relation Many-to-Many avec Amenity
     amenities = db.relationship(
@@ -35,6 +99,14 @@ class Place(BaseModel, db.Model):
         backref=db.backref('places', lazy=True)
     )
 
+    # Champs calculés de PLACE_FIELDS, pour les sérialiseurs générés
+    computed_fields = {
+        'review_count': _review_count,
+        'average_rating': _average_rating,
+        'bayesian_rating': _bayesian_rating,
+        'rating_histogram': _rating_histogram,
+    }
+
     def __init__(self, title, price, owner_id, description='',
                  latitude=None, longitude=None):
         """
@@ -62,33 +134,30 @@ class Place(BaseModel, db.Model):
             longitude)  # Validate and assign longitude
         # Validate and assign the owner
         self.owner_id = self.validate_owner_id(owner_id)
+        # No reviews yet
+        self.review_count = 0
+        self.rating_sum = 0
+        self.average_rating = 0.0
+        self.bayesian_rating = None
+        for rating in RATINGS:
+            setattr(self, f'rating_{rating}_count', 0)
         self.reviews = []  # List to store associated reviews
         self.amenities = []  # List to store associated amenities
 
-    def to_dict(self):
+    def to_dict(self, fields=None, expand=None):
         """
         Converts the `Place` object to a JSON-serializable dictionary.
 
+        Args:
+            fields (iterable, optional): Names of PLACE_FIELDS to include,
+            all of them by default. Only the attributes they need are read.
+            expand (iterable, optional): Names of PLACE_RELATIONS to embed.
+            By default both are embedded, unless fields is given.
+
         Returns:
             dict: A dictionary containing the attributes of the Place object.
         """
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "price": self.price,
-            "latitude": self.latitude,
-            "longitude": self.longitude,
-            # Serialize the owner (either ID or BaseModel instance)
-            "owner_id": self.owner_id if isinstance(self.owner_id, BaseModel)
-            else self.owner_id,
-            # Serialize reviews
-            "reviews": [review.to_dict() if hasattr(review, 'to_dict')
-                        else review for review in self.reviews],
-            # Serialize amenities
-            "amenities": [amenity.to_dict() if hasattr(amenity, 'to_dict')
-                          else amenity for amenity in self.amenities]
-        }
+        return place_serializer(fields, expand)(self)
 
     # Validation methods
     def validate_title(self, title):
@@ -209,3 +278,79 @@ class Place(BaseModel, db.Model):
             amenity: The amenity object to add.
         """
         self.amenities.append(amenity)
+
+
+def place_serializer(fields=None, expand=None):
+    """
+    Returns the generated serializer of places, see Place.to_dict for the
+    defaults of fields and expand. It also serializes the compact records
+    of the storage.
+
+    Raises:
+        ValueError: If a name is not in PLACE_FIELDS or PLACE_RELATIONS.
+    """
+    if fields is None:
+        fields = PLACE_FIELDS
+        if expand is None:
+            expand = PLACE_RELATIONS
+    return serializer(Place, fields, expand)
+
+
+def rating_changes(place, added=None, removed=None):
+    """
+    Computes the new rating aggregates of a place when a review rating is
+    added, removed, or both for a changed rating.
+
+    Args:
+        place (Place): The place, or its compact record.
+        added (int, optional): The rating of a new or updated review.
+        removed (int, optional): The rating of a deleted review, or the
+        previous rating of an updated one.
+
+    Returns:
+        dict: The new values of the aggregate columns.
+    """
+    count = place.review_count or 0
+    total = place.rating_sum or 0
+    changes = {}
+    for rating, delta in ((removed, -1), (added, 1)):
+        if rating is None:
+            continue
+        name = f'rating_{rating}_count'
+        changes[name] = changes.get(
+            name, getattr(place, name) or 0) + delta
+        count += delta
+        total += delta * rating
+    changes.update(_rating_averages(count, total))
+    return changes
+
+
+def rating_aggregates(ratings):
+    """
+    Computes the rating aggregates of a place from all its review ratings.
+
+    Args:
+        ratings (iterable): The ratings of the reviews of the place.
+
+    Returns:
+        dict: The values of the aggregate columns.
+    """
+    ratings = list(ratings)
+    aggregates = {f'rating_{rating}_count': ratings.count(rating)
+                  for rating in RATINGS}
+    aggregates.update(_rating_averages(len(ratings), sum(ratings)))
+    return aggregates
+
+
+def _rating_averages(count, total):
+    """Returns the count, sum and averages columns of a place."""
+    if not count:
+        return {'review_count': 0, 'rating_sum': 0, 'average_rating': 0.0,
+                'bayesian_rating': None}
+    return {
+        'review_count': count,
+        'rating_sum': total,
+        'average_rating': total / count,
+        'bayesian_rating': (RATING_PRIOR_WEIGHT * RATING_PRIOR_MEAN + total)
+        / (RATING_PRIOR_WEIGHT + count),
+    }
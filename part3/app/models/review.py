@@ -26,10 +26,22 @@ class Review(BaseModel, db.Model):
     """
 
     __tablename__ = 'reviews'
+    # A user may review a given place only once. The reviews of a place
+    # are read in order, newest or best rated first, from the composite
+    # indexes, which also serve the plain lookups by place_id
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'place_id',
+                            name='uq_reviews_user_place'),
+        db.Index('ix_reviews_place_id_created_at', 'place_id', 'created_at'),
+        db.Index('ix_reviews_place_id_rating', 'place_id', 'rating',
+                 'created_at'),
+    )
 
     place_id = db.Column(db.String(36), ForeignKey(
         'places.id'), nullable=False)
-    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False)
+    # Indexed for the reviews of a user
+    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False,
+                        index=True)
 
     text = db.Column(db.String(255), nullable=False)
     rating = db.Column(db.Integer, nullable=False)
@@ -86,7 +98,6 @@ class Review(BaseModel, db.Model):
         Raises:
             ValueError: If the rating is not between 1 and 5.
         """
-        print(f"Debug: Validating rating={rating} of type {type(rating)}")
         try:
             rating = int(rating)
         except ValueError:
@@ -1,3 +1,4 @@
+import logging
 import re
 from .base_model import BaseModel
 from sqlalchemy.orm import relationship
@@ -5,6 +6,7 @@ from app import db
 from flask_bcrypt import Bcrypt
 
 bcrypt = Bcrypt()
+logger = logging.getLogger(__name__)
 
 
 class User(BaseModel, db.Model):
@@ -22,39 +24,34 @@ class User(BaseModel, db.Model):
 
     def __init__(self, first_name, last_name, email, password, is_admin=False):
         """Initialize a new user with validated data and hashed password"""
+        super().__init__()
         self.first_name = self.validate_name(first_name, 'First name')
         self.last_name = self.validate_name(last_name, 'Last name')
         self.email = self.validate_email(email)
         self.is_admin = is_admin
         self.hash_password(password)
-        print(f"User initialized with email: {email}")
+        logger.debug("User initialized with email: %s", email)
 
     def hash_password(self, password):
         """Hash le mot de passe avant de le stocker"""
         if not password:
             raise ValueError("Password is required")
 
-        print(f"Hashing password for user: {self.email}")
         self.password = bcrypt.generate_password_hash(password).decode('utf-8')
-        print(f"Password hashed. Hash: {self.password[:20]}...")
 
     def verify_password(self, password):
         """Verify a password against the hash"""
-        print("\n=== Password Verification Details ===")
-        print(f"User email: {self.email}")
-        print(f"Stored hash: {self.password[:20]}...")
-
         if not password:
-            print("Error: No password provided")
+            logger.debug("No password provided for %s", self.email)
             return False
 
         try:
-            print("Attempting to verify password...")
             result = bcrypt.check_password_hash(self.password, password)
-            print(f"Password verification result: {result}")
+            logger.debug("Password verification for %s: %s",
+                         self.email, result)
             return result
         except Exception as e:
-            print(f"Error during password verification: {str(e)}")
+            logger.warning("Error during password verification: %s", e)
             return False
 
     def validate_name(self, name, field_name):
@@ -0,0 +1,68 @@
+"""
+Compact records for read-heavy models of the in-memory storage.
+
+A mapped instance carries an ``_sa_instance_state`` and a per-instance
+``__dict__``, which costs far more memory than its few column values.
+``compact_type`` builds a ``__slots__`` class holding only the columns of
+a model; the repository stores instances of compacted models as such
+records. Identifier columns are interned, so a foreign key shares the
+string object of the id it points to.
+
+Records read like the model instances they replace: columns are plain
+attributes, ``to_dict`` is the model's own, and relationships read as
+empty, since the in-memory store does not track them. They are detached
+copies: changes must go through ``InMemoryRepository.update``. Only
+models whose ``to_dict`` reads named attributes, like ``Place``, can be
+compacted; ``BaseModel.to_dict`` copies ``__dict__``, which records lack.
+"""
+
+import sys
+
+from sqlalchemy import inspect as sa_inspect
+
+
+class CompactRecord:
+    """Base class of the record types built by ``compact_type``."""
+
+    __slots__ = ()
+    model = None
+    fields = ()
+    _interned = frozenset()
+
+    @classmethod
+    def from_model(cls, obj):
+        """Copy the column values of a model instance into a record."""
+        record = cls.__new__(cls)
+        for name in cls.fields:
+            setattr(record, name, getattr(obj, name, None))
+        return record
+
+    def __setattr__(self, name, value):
+        if name in self._interned and type(value) is str:
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+
+    def state(self):
+        """Return the column values of the record."""
+        return {name: getattr(self, name) for name in self.fields}
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.id}>"
+
+
+def compact_type(model):
+    """Build the slots record type storing the columns of a model."""
+    mapper = sa_inspect(model)
+    fields = tuple(attr.key for attr in mapper.column_attrs)
+    namespace = {
+        '__slots__': fields,
+        '__module__': __name__,
+        'model': model,
+        'fields': fields,
+        '_interned': frozenset(
+            name for name in fields if name == 'id' or name.endswith('_id')),
+        'to_dict': model.to_dict,
+    }
+    for name, relationship in mapper.relationships.items():
+        namespace[name] = () if relationship.uselist else None
+    return type(f'Compact{model.__name__}', (CompactRecord,), namespace)
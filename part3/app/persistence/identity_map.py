@@ -0,0 +1,123 @@
+"""
+Request-scoped identity map.
+
+When ``IDENTITY_MAP`` is enabled, each request keeps the entities it has
+looked up by key, so an entity asked for again later in the request, by
+the resource or by the facade, the SQL repositories or the in-memory
+storage, is the object already loaded instead of another lookup.
+
+Entities are kept by identifier: ids are UUIDs, unique across models.
+Other lookups, e.g. the review of a user for a place, use a tuple key.
+Only found entities are kept, so a lookup that found nothing is repeated
+and sees an entity created since. Deleted entities must be forgotten.
+
+Outside of a request, e.g. in scripts and tests, every lookup loads.
+"""
+
+import logging
+import threading
+
+from flask import g, has_request_context
+
+logger = logging.getLogger(__name__)
+
+# Lookups over the lifetime of the process, see stats()
+_totals = {'requests': 0, 'hits': 0, 'misses': 0}
+_totals_lock = threading.Lock()
+
+
+class IdentityMap:
+    """Entities looked up during one request."""
+
+    def __init__(self):
+        self.entries = {}
+        # Lookups answered from the map (saved) and loaded
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, load):
+        """Return the entity of a key, calling ``load()`` on a miss."""
+        obj = self.entries.get(key)
+        if obj is not None:
+            self.hits += 1
+            return obj
+        self.misses += 1
+        obj = load()
+        if obj is not None:
+            self.entries[key] = obj
+        return obj
+
+    def add(self, key, obj):
+        self.entries[key] = obj
+
+    def forget(self, obj):
+        """Drop every key of an entity."""
+        for key in [key for key, value in self.entries.items()
+                    if value is obj]:
+            del self.entries[key]
+
+
+def current():
+    """Return the identity map of the current request, or None."""
+    if not has_request_context():
+        return None
+    return g.get('identity_map')
+
+
+def lookup(key, load):
+    """Get an entity through the identity map of the request, if any."""
+    identity_map = current()
+    if identity_map is None:
+        return load()
+    return identity_map.get(key, load)
+
+
+def add(key, obj):
+    identity_map = current()
+    if identity_map is not None and obj is not None:
+        identity_map.add(key, obj)
+
+
+def forget(obj):
+    identity_map = current()
+    if identity_map is not None and obj is not None:
+        identity_map.forget(obj)
+
+
+def stats():
+    """Return the number of requests, hits and misses so far.
+
+    Hits are the lookups saved by the identity maps.
+    """
+    with _totals_lock:
+        return dict(_totals)
+
+
+def end():
+    """Close the identity map of the request and count its lookups.
+
+    A no-op when no identity map is open, so it may be called twice.
+    """
+    identity_map = g.pop('identity_map', None)
+    if identity_map is None:
+        return
+    with _totals_lock:
+        _totals['requests'] += 1
+        _totals['hits'] += identity_map.hits
+        _totals['misses'] += identity_map.misses
+    logger.debug("Identity map: %d lookups saved, %d loaded",
+                 identity_map.hits, identity_map.misses)
+
+
+def init_app(app):
+    """Give every request of the app an identity map if enabled."""
+    if not app.config.get('IDENTITY_MAP'):
+        return
+
+    @app.before_request
+    def begin_identity_map():
+        g.identity_map = IdentityMap()
+
+    @app.teardown_request
+    def end_identity_map(exc):
+        end()
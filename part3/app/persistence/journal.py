@@ -0,0 +1,374 @@
+"""
+Durable append-only journal and snapshots for the in-memory storage.
+
+When persistence is enabled, every mutation of an ``InMemoryRepository``
+is appended to a journal file. Appends only fill a buffer; a flusher
+thread writes whatever has accumulated and fsyncs it once (group commit),
+and ``sync()`` waits until the caller's records are on disk. A compactor
+thread periodically rotates the journal and writes a binary snapshot of
+the whole store, after which the older journal generations are removed.
+
+Files kept in the persistence directory::
+
+    snapshot.bin              state covering journal generations <= N
+    journal.<generation>.log  records written after that snapshot
+
+Startup loads the snapshot and replays only the journal generations
+newer than it. A torn record at the end of a journal, left by a crash in
+the middle of a write, is truncated away.
+"""
+
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+from sqlalchemy import inspect as sa_inspect
+
+from app.persistence.compact import CompactRecord
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = 'snapshot.bin'
+SNAPSHOT_MAGIC = b'HBNBSNP1'
+# Frame header of a journal record: payload length and CRC32
+FRAME = struct.Struct('>II')
+
+
+def model_name(obj):
+    """Return the name of the model of an instance or compact record."""
+    if isinstance(obj, CompactRecord):
+        return obj.model.__name__
+    return type(obj).__name__
+
+
+def object_state(obj):
+    """Return the column values of a model instance or compact record."""
+    if isinstance(obj, CompactRecord):
+        return obj.state()
+    return {
+        attr.key: getattr(obj, attr.key)
+        for attr in sa_inspect(type(obj)).column_attrs
+    }
+
+
+def restore_object(cls, state):
+    """Rebuild a model instance from its column values, without __init__."""
+    obj = sa_inspect(cls).class_manager.new_instance()
+    for key, value in state.items():
+        setattr(obj, key, value)
+    return obj
+
+
+def _fsync_directory(directory):
+    """Make a rename or unlink in a directory durable, where supported."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """
+    Append-only record log with group-commit fsync.
+
+    Records are framed with their length and CRC32 so a partially written
+    tail can be detected on replay.
+    """
+
+    def __init__(self, directory, generation, commit_interval=0.002):
+        self.directory = directory
+        self.generation = generation
+        self.commit_interval = commit_interval
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = []
+        self._appended = 0
+        self._durable = 0
+        self._records = 0
+        self._closed = False
+        self._file = open(self.path_for(generation), 'ab')
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name='storage-journal', daemon=True)
+        self._flusher.start()
+
+    def path_for(self, generation):
+        return os.path.join(self.directory, f'journal.{generation:06d}.log')
+
+    @property
+    def records(self):
+        """Number of records appended to the current generation."""
+        return self._records
+
+    def append(self, record):
+        """Queue a record and return its sequence number."""
+        payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        frame = FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Journal is closed")
+            self._pending.append(frame)
+            self._appended += 1
+            self._records += 1
+            self._cond.notify_all()
+            return self._appended
+
+    def sync(self, sequence=None):
+        """Block until the given record, or every queued one, is durable."""
+        with self._cond:
+            target = self._appended if sequence is None else sequence
+            while self._durable < target:
+                self._cond.wait()
+
+    def _commit(self):
+        """Write and fsync the queued frames as one group.
+
+        Must be called with ``_io_lock`` held, which keeps groups in
+        append order. Appenders are not blocked while the fsync runs.
+        """
+        with self._cond:
+            frames, self._pending = self._pending, []
+            sequence = self._appended
+        if frames:
+            self._file.write(b''.join(frames))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        with self._cond:
+            self._durable = max(self._durable, sequence)
+            self._cond.notify_all()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Let concurrent writers join this commit
+                self._cond.wait(self.commit_interval)
+            with self._io_lock:
+                self._commit()
+
+    def rotate(self):
+        """Make the current generation durable and start the next one.
+
+        Returns:
+            int: The generation that was closed.
+        """
+        with self._io_lock:
+            self._commit()
+            self._file.close()
+            closed = self.generation
+            self.generation += 1
+            self._records = 0
+            self._file = open(self.path_for(self.generation), 'ab')
+            _fsync_directory(self.directory)
+            return closed
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        with self._io_lock:
+            self._commit()
+            self._file.close()
+
+    @staticmethod
+    def read(path):
+        """Yield the records of a journal file, dropping a torn tail."""
+        with open(path, 'rb+') as journal_file:
+            offset = 0
+            while True:
+                header = journal_file.read(FRAME.size)
+                if not header:
+                    break
+                if len(header) == FRAME.size:
+                    length, crc = FRAME.unpack(header)
+                    payload = journal_file.read(length)
+                    if (len(payload) == length
+                            and zlib.crc32(payload) == crc):
+                        offset = journal_file.tell()
+                        yield pickle.loads(payload)
+                        continue
+                logger.warning("Truncating torn journal tail of %s at %d",
+                               path, offset)
+                journal_file.truncate(offset)
+                break
+
+
+class StoragePersistence:
+    """
+    Journal and snapshot manager attached to an ``InMemoryRepository``.
+
+    Args:
+        directory (str): Where the snapshot and journal files are kept.
+        models (iterable): Model classes that may be stored.
+        commit_interval (float): How long the flusher waits for more
+            records before an fsync, in seconds.
+        snapshot_interval (float): Seconds between compaction attempts,
+            or None to compact only on demand.
+        snapshot_min_records (int): Journal records needed before a
+            periodic compaction is worth it.
+    """
+
+    def __init__(self, directory, models, commit_interval=0.002,
+                 snapshot_interval=300, snapshot_min_records=1000):
+        self.directory = directory
+        self.models = {model.__name__: model for model in models}
+        self.commit_interval = commit_interval
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_min_records = snapshot_min_records
+        self.journal = None
+        self._repo = None
+        self._compact_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._compactor = None
+        os.makedirs(directory, exist_ok=True)
+
+    # Records -------------------------------------------------------------
+
+    def record_put(self, obj):
+        return self.journal.append(
+            ('put', model_name(obj), object_state(obj)))
+
+    def record_put_many(self, objs):
+        # One record for the whole batch
+        return self.journal.append(('put_many', [
+            (model_name(obj), object_state(obj)) for obj in objs]))
+
+    def record_delete(self, obj_id):
+        return self.journal.append(('delete', obj_id))
+
+    def record_delete_many(self, obj_ids):
+        return self.journal.append(('delete_many', list(obj_ids)))
+
+    def record_clear(self, cls):
+        return self.journal.append(
+            ('clear', cls.__name__ if cls is not None else None))
+
+    def sync(self):
+        self.journal.sync()
+
+    # Recovery ------------------------------------------------------------
+
+    def _journal_generations(self):
+        generations = []
+        for name in os.listdir(self.directory):
+            if name.startswith('journal.') and name.endswith('.log'):
+                try:
+                    generations.append(int(name.split('.')[1]))
+                except ValueError:
+                    continue
+        return sorted(generations)
+
+    def _load_snapshot(self):
+        """Return (covered generation, [(class name, state)])."""
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return 0, []
+        with open(path, 'rb') as snapshot_file:
+            if snapshot_file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a storage snapshot")
+            return pickle.load(snapshot_file)
+
+    def attach(self, repo):
+        """Rebuild the repository state, then journal its mutations."""
+        self._repo = repo
+        covered, objects = self._load_snapshot()
+        for cls_name, state in objects:
+            repo._insert(restore_object(self.models[cls_name], state))
+
+        replayed = 0
+        generations = self._journal_generations()
+        for generation in generations:
+            if generation <= covered:
+                continue
+            path = os.path.join(self.directory,
+                                f'journal.{generation:06d}.log')
+            for record in Journal.read(path):
+                self._apply(repo, record)
+                replayed += 1
+        logger.info("Recovered %d objects from snapshot and %d journal "
+                    "records", len(objects), replayed)
+
+        # Start a fresh generation after everything that was replayed
+        next_generation = max([covered, *generations]) + 1
+        self.journal = Journal(self.directory, next_generation,
+                               self.commit_interval)
+        if self.snapshot_interval:
+            self._compactor = threading.Thread(
+                target=self._compact_loop, name='storage-compactor',
+                daemon=True)
+            self._compactor.start()
+
+    def _apply(self, repo, record):
+        kind = record[0]
+        if kind == 'put':
+            _, cls_name, state = record
+            repo._insert(restore_object(self.models[cls_name], state))
+        elif kind == 'put_many':
+            for cls_name, state in record[1]:
+                repo._insert(restore_object(self.models[cls_name], state))
+        elif kind == 'delete':
+            repo._discard(record[1])
+        elif kind == 'delete_many':
+            for obj_id in record[1]:
+                repo._discard(obj_id)
+        elif kind == 'clear':
+            repo._clear(self.models[record[1]] if record[1] else None)
+
+    # Compaction ----------------------------------------------------------
+
+    def compact(self):
+        """Write a snapshot of the store and drop the journals it covers."""
+        with self._compact_lock:
+            # Capture the state and rotate in one step so the snapshot
+            # covers exactly the closed journal generations
+            with self._repo._lock.write_locked():
+                objects = [
+                    (model_name(obj), object_state(obj))
+                    for obj in self._repo.storage.values()
+                ]
+                covered = self.journal.rotate()
+
+            path = os.path.join(self.directory, SNAPSHOT_FILE)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as snapshot_file:
+                snapshot_file.write(SNAPSHOT_MAGIC)
+                pickle.dump((covered, objects), snapshot_file,
+                            pickle.HIGHEST_PROTOCOL)
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(tmp_path, path)
+            _fsync_directory(self.directory)
+
+            for generation in self._journal_generations():
+                if generation <= covered:
+                    os.remove(os.path.join(
+                        self.directory, f'journal.{generation:06d}.log'))
+            logger.info("Snapshot of %d objects written, journal "
+                        "generations up to %d compacted", len(objects),
+                        covered)
+
+    def _compact_loop(self):
+        while not self._stop.wait(self.snapshot_interval):
+            if self.journal.records >= self.snapshot_min_records:
+                try:
+                    self.compact()
+                except Exception:
+                    logger.exception("Storage compaction failed")
+
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        self.journal.close()
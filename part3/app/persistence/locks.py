@@ -0,0 +1,129 @@
+"""
+Lock policies for the in-memory storage.
+
+``InMemoryRepository`` takes one of these policies and wraps its reads in
+``read_locked()`` and its writes in ``write_locked()``:
+
+- ``WriterLock`` serializes writers and lets readers run unlocked, which
+  is enough for single-threaded use such as scripts and tests.
+- ``ExclusiveLock`` runs every operation under one mutex, for a threaded
+  server. Under the GIL readers cannot run Python code in parallel anyway,
+  and a plain mutex is the cheapest lock for reads and writes alike.
+- ``ReadWriteLock`` lets any number of readers run together while a
+  writer has exclusive access. Each read takes its internal mutex twice,
+  so it only pays off when reads release the GIL for long stretches;
+  ``benchmarks/bench_concurrency.py`` compares the policies.
+"""
+
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+class WriterLock:
+    """Reentrant lock for writers, readers never wait."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def read_locked(self):
+        return nullcontext()
+
+    def write_locked(self):
+        return self._lock
+
+
+class ExclusiveLock:
+    """One reentrant mutex shared by readers and writers."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def read_locked(self):
+        return self._lock
+
+    def write_locked(self):
+        return self._lock
+
+
+class ReadWriteLock:
+    """
+    Shared lock for readers, exclusive lock for writers.
+
+    Waiting writers are preferred over new readers so a steady stream of
+    reads cannot starve them. Both sides are reentrant, and the thread
+    holding the write lock may also take the read lock. Upgrading a read
+    lock to a write lock is not supported and would deadlock.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        # Only the owning thread ever sets _writer to its own ident, so
+        # this check is safe without holding the condition
+        if self._writer == me:
+            # Reads nested in a write are covered by the write lock
+            self._write_depth += 1
+            return
+        depth = getattr(self._local, 'read_depth', 0)
+        if depth == 0:
+            with self._cond:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.read_depth = depth + 1
+
+    def release_read(self):
+        if self._writer == threading.get_ident():
+            self._write_depth -= 1
+            return
+        self._local.read_depth -= 1
+        if self._local.read_depth == 0:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        self._write_depth -= 1
+        if self._write_depth == 0:
+            with self._cond:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
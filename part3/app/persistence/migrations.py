@@ -0,0 +1,112 @@
+"""
+Column and index migration for existing databases.
+
+``db.create_all()`` builds the columns and indexes declared on the models
+only when it creates their table, so a database created before one was
+declared lacks it. ``add_missing_columns`` and ``create_missing_indexes``
+compare what the models declare with what the database has and add the
+missing parts; they can be run again at any time.
+"""
+
+import logging
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.schema import CreateColumn
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+def missing_columns(engine, metadata=None):
+    """Return the declared columns of existing tables that the database
+    does not have."""
+    metadata = metadata if metadata is not None else db.metadata
+    inspector = sa_inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {column['name']
+                   for column in inspector.get_columns(table.name)}
+        missing += [column for column in table.columns
+                    if column.name not in present]
+    return missing
+
+
+def add_missing_columns(engine, metadata=None):
+    """Add the declared columns missing from the tables of a database.
+
+    A column that is NOT NULL needs a server default to fill the existing
+    rows; others are skipped with a warning.
+
+    Returns:
+        list: The ``table.column`` names of the columns that were added.
+    """
+    added = []
+    for column in missing_columns(engine, metadata):
+        name = f'{column.table.name}.{column.name}'
+        if not column.nullable and column.server_default is None:
+            logger.warning("Cannot add %s: NOT NULL without a server "
+                           "default", name)
+            continue
+        logger.info("Adding column %s", name)
+        definition = CreateColumn(column).compile(dialect=engine.dialect)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                f'ALTER TABLE {column.table.name} ADD COLUMN {definition}')
+        added.append(name)
+    return added
+
+
+def declared_indexes(metadata=None):
+    """Return the indexes declared on the models, ordered by table."""
+    metadata = metadata if metadata is not None else db.metadata
+    return [
+        index
+        for table in metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda index: index.name)
+    ]
+
+
+def missing_indexes(engine, metadata=None):
+    """Return the declared indexes that the database does not have.
+
+    Indexes of tables that do not exist yet, or that lack one of the
+    indexed columns, are left out: ``create_all`` or a schema change has
+    to come first.
+    """
+    inspector = sa_inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for index in declared_indexes(metadata):
+        table = index.table.name
+        if table not in tables:
+            continue
+        present = {found['name'] for found in inspector.get_indexes(table)}
+        if index.name in present:
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table)}
+        absent = [column.name for column in index.columns
+                  if column.name not in columns]
+        if absent:
+            logger.warning("Cannot create %s: %s has no column %s",
+                           index.name, table, ', '.join(absent))
+            continue
+        missing.append(index)
+    return missing
+
+
+def create_missing_indexes(engine, metadata=None):
+    """Build the declared indexes missing from a database.
+
+    Returns:
+        list: The names of the indexes that were created.
+    """
+    created = []
+    for index in missing_indexes(engine, metadata):
+        logger.info("Creating index %s on %s", index.name, index.table.name)
+        index.create(bind=engine, checkfirst=True)
+        created.append(index.name)
+    return created
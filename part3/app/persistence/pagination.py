@@ -0,0 +1,70 @@
+"""
+Keyset pagination on (created_at, id).
+
+Pages are ordered by creation time, ties broken by id, and each page
+starts right after the key of the last object of the previous one.
+Reading a page is a seek in an index ordered by that key, so deep pages
+cost the same as the first one, where OFFSET reads and skips every
+earlier row. Clients get the key as an opaque cursor.
+
+Other orders work the same way with a key made of the sorted values
+followed by the id, e.g. (rating, created_at, id) for the best reviews.
+"""
+
+import base64
+import heapq
+import json
+from datetime import datetime
+
+
+def page_key(obj):
+    """Return the (created_at, id) key an object is paginated by."""
+    return obj.created_at, obj.id
+
+
+def encode_cursor(key):
+    """Encode a page key as an opaque, URL-safe cursor."""
+    values = [value.isoformat() if isinstance(value, datetime) else value
+              for value in key]
+    raw = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, types=(datetime, str)):
+    """Decode a cursor back into its page key.
+
+    Args:
+        cursor: A cursor made by encode_cursor.
+        types: Types of the values of the key, (created_at, id) by default.
+
+    Raises:
+        ValueError: If the cursor was not made by encode_cursor for a key
+            of these types.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(value) if value_type is datetime
+            else value_type(value)
+            for value_type, value in zip(types, values))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor") from None
+
+
+def paginate(objs, after=None, limit=20, key=page_key, descending=False):
+    """Return the page of an unordered collection following a key.
+
+    Used when no index is ordered by the page key, e.g. on the result of
+    a filter; costs O(n log limit). Pages follow the ``key`` of the
+    objects, greatest first if ``descending``.
+    """
+    if descending:
+        if after is not None:
+            objs = (obj for obj in objs if key(obj) < after)
+        return heapq.nlargest(limit, objs, key=key)
+    if after is not None:
+        objs = (obj for obj in objs if key(obj) > after)
+    return heapq.nsmallest(limit, objs, key=key)
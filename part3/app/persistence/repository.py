@@ -3,39 +3,149 @@ In-memory repository to manage objects.
 Provides methods to add, retrieve, update, and delete objects.
 """
 
+import bisect
+import heapq
+import logging
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from sqlalchemy import update as sql_update
+from sqlalchemy.orm import load_only
 from app import db
+from app.persistence import unit_of_work
+from app.persistence.compact import compact_type
+from app.persistence.journal import StoragePersistence
+from app.persistence.locks import WriterLock
+from app.persistence.pagination import page_key, paginate
+from app.persistence.spatial import GridIndex, haversine_km
+from app.persistence.text import ANY_SCOPE
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for attributes an object does not define
+_MISSING = object()
+# Value of a (value, object id) entry of a sorted index
+_first = itemgetter(0)
+# Ids per DELETE ... IN (...) statement of SQLAlchemyRepository.delete_many
+SQL_CHUNK_SIZE = 500
+
+
+class UniqueConstraintError(ValueError):
+    """Raised when a write would duplicate the key of a unique index."""
+    pass
 
 
 class SQLAlchemyRepository:
     def __init__(self, model):
         self.model = model
 
+    def _query(self, columns=None):
+        """Return a query on the model.
+
+        With ``columns``, only these columns and the primary key are
+        selected; the others are loaded on first access.
+        """
+        if columns is None:
+            return self.model.query
+        return self.model.query.options(load_only(
+            *(getattr(self.model, name) for name in columns)))
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        unit_of_work.commit()
 
     def get(self, obj_id):
-        return self.model.query.get(obj_id)
+        return self._query().get(obj_id)
 
-    def get_all(self):
-        return self.model.query.all()
+    def get_all(self, columns=None):
+        return self._query(columns).all()
+
+    def iter_all(self, batch_size=1000):
+        # Rows are fetched and mapped batch_size at a time, from a
+        # server-side cursor where the driver has one
+        result = db.session.execute(
+            db.select(self.model).execution_options(yield_per=batch_size))
+        try:
+            yield from result.scalars()
+        finally:
+            result.close()
 
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            unit_of_work.commit()
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            unit_of_work.commit()
+
+    def add_many(self, objs):
+        # One transaction; the ORM batches the INSERTs of a flush into
+        # executemany calls
+        db.session.add_all(objs)
+        unit_of_work.commit()
+
+    def update_many(self, updates):
+        rows = [{'id': obj_id, **data} for obj_id, data in updates.items()]
+        if rows:
+            # ORM bulk UPDATE by primary key, run as one executemany
+            db.session.execute(sql_update(self.model), rows)
+        unit_of_work.commit()
+
+    def delete_many(self, obj_ids):
+        obj_ids = list(obj_ids)
+        deleted = 0
+        # Stay below the bound-parameter limit of SQLite
+        for start in range(0, len(obj_ids), SQL_CHUNK_SIZE):
+            chunk = obj_ids[start:start + SQL_CHUNK_SIZE]
+            deleted += self.model.query.filter(
+                self.model.id.in_(chunk)).delete(synchronize_session=False)
+        unit_of_work.commit()
+        return deleted
 
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter_by(**{attr_name: attr_value}).first()
+        return self._query().filter_by(**{attr_name: attr_value}).first()
+
+    def get_by_attributes(self, **criteria):
+        return self._query().filter_by(**criteria).first()
+
+    def get_all_by_range(self, attr_name, low=None, high=None):
+        column = getattr(self.model, attr_name)
+        query = self._query()
+        if low is not None:
+            query = query.filter(column >= low)
+        if high is not None:
+            query = query.filter(column <= high)
+        return query.order_by(column).all()
+
+    def get_page(self, after=None, limit=20, columns=None):
+        # Keyset seek on (created_at, id), no OFFSET; created_at is also
+        # read for the cursor of the next page
+        if columns is not None:
+            columns = ['created_at', *columns]
+        query = self._query(columns)
+        if after is not None:
+            query = query.filter(
+                db.tuple_(self.model.created_at, self.model.id) > after)
+        return query.order_by(self.model.created_at,
+                              self.model.id).limit(limit).all()
+
+    def get_all_in_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        query = self._query().filter(
+            self.model.latitude.between(min_lat, max_lat))
+        if min_lon <= max_lon:
+            query = query.filter(
+                self.model.longitude.between(min_lon, max_lon))
+        else:
+            # Box crossing the antimeridian
+            query = query.filter(db.or_(self.model.longitude >= min_lon,
+                                        self.model.longitude <= max_lon))
+        return query.all()
 
 
 class Repository(ABC):
@@ -81,6 +191,22 @@ class Repository(ABC):
         """
         pass
 
+    def iter_all(self, batch_size=1000):
+        """
+        Iterates over all objects of the repository.
+
+        Implementations should load ``batch_size`` objects at a time so
+        that memory use does not grow with the number of objects; this
+        default iterates over ``get_all()``.
+
+        Args:
+            batch_size: How many objects to load at a time.
+
+        Yields:
+            The objects of the repository.
+        """
+        yield from self.get_all()
+
     @abstractmethod
     def update(self, obj_id, data):
         """
@@ -117,131 +243,893 @@ class Repository(ABC):
         """
         pass
 
+    def add_many(self, objs):
+        """
+        Adds several objects to the repository.
+
+        Implementations should do it in one transaction or one pass over
+        their indexes; this default adds them one by one.
+
+        Args:
+            objs: The objects to add.
+        """
+        for obj in objs:
+            self.add(obj)
+
+    def update_many(self, updates):
+        """
+        Updates several objects in the repository.
+
+        Args:
+            updates: A dictionary mapping object identifiers to
+                dictionaries of new data.
+        """
+        for obj_id, data in updates.items():
+            self.update(obj_id, data)
+
+    def delete_many(self, obj_ids):
+        """
+        Deletes several objects from the repository.
+
+        Args:
+            obj_ids: The identifiers of the objects to delete.
+        """
+        for obj_id in obj_ids:
+            self.delete(obj_id)
+
 
 class InMemoryRepository:
-    """In-memory repository implementation."""
+    """In-memory repository implementation.
+
+    Objects are kept in one partition per model class next to the global
+    id map, so class-scoped reads, clears and counts only touch the objects
+    of that class. Attribute lookups can be served by declared secondary
+    indexes instead of a scan over the whole store. Each index maps an
+    attribute value to the objects carrying it and is kept in sync by
+    ``add``, ``update``, ``delete`` and ``clear_all``. Attributes that are
+    not indexed fall back to a full scan. Sorted indexes keep the
+    ``(value, id)`` pairs of an attribute in a bisect-maintained list per
+    model class, so a class-scoped query never walks past the objects of
+    other classes, and answer range queries in O(log N + k); queries over
+    several classes merge their lists. Composite ones, ordered by
+    several attributes in turn, answer keyset pages of the objects sharing
+    their leading values, such as the newest reviews of a place, in
+    O(log N + k) as well. A spatial grid index over
+    a latitude/longitude pair answers bounding-box and nearest-neighbour
+    queries. Named full-text indexes rank keyword searches with BM25.
+
+    Reads and writes go through a lock policy from
+    ``app.persistence.locks``. With an ``ExclusiveLock`` or a
+    ``ReadWriteLock`` the repository can be shared by the threads of a
+    server: writers are exclusive and ``get_all`` returns a consistent
+    snapshot.
+
+    Instances of the models passed to ``compact`` are stored as slots
+    records holding only their column values (see
+    ``app.persistence.compact``), for read-heavy models.
+
+    ``enable_persistence`` makes the storage durable: mutations are written
+    to an append-only journal that ``save`` waits on, and the state is
+    rebuilt from the latest snapshot plus the journal tail on startup.
+    """
 
-    def __init__(self):
-        """Initialize empty storage."""
+    def __init__(self, indexes=(), unique=(), sorted_indexes=(),
+                 spatial=None, text_indexes=None, lock=None):
+        """Initialize empty storage and the declared attribute indexes.
+
+        Args:
+            indexes: Attributes to index, e.g. ``('email',)``. A tuple of
+                names declares a composite index, e.g.
+                ``('user_id', 'place_id')``.
+            unique: Indexes whose key may only be held by one object. They
+                are maintained like the ones listed in ``indexes``.
+            sorted_indexes: Attributes to keep sorted for
+                ``get_all_by_range``, e.g. ``('price',)``. A tuple of names
+                declares a composite sorted index for ``get_page_by``,
+                e.g. ``('place_id', 'created_at')``.
+            spatial: ``(latitude, longitude)`` attribute names to index
+                on a grid for ``get_all_in_bbox`` and ``get_nearest``.
+            text_indexes: ``{name: InvertedIndex}`` full-text indexes for
+                ``search``. An object is indexed in those whose text
+                attributes it carries.
+            lock: Lock policy, ``WriterLock()`` by default, which only
+                serializes writers.
+        """
         self.storage = {}
-        print("New InMemoryRepository instance created")
+        # model class -> {object id -> object}
+        self._partitions = {}
+        # index name -> {key -> {object id -> object}}, where the name is an
+        # attribute name or a tuple of them for composite indexes
+        self._indexes = {name: {} for name in (*indexes, *unique)}
+        self._unique = set(unique)
+        # frozenset of attribute names -> name of the index covering them
+        self._covering = {
+            frozenset(name if isinstance(name, tuple) else (name,)): name
+            for name in self._indexes
+        }
+        # object id -> {index name -> key it is indexed under}
+        self._indexed_values = {}
+        # index name -> {model class -> sorted list of (value, object id)},
+        # where the name is an attribute name, or a tuple of them whose
+        # values are a tuple
+        self._sorted = {attr_name: {} for attr_name in sorted_indexes}
+        # object id -> (model class, {index name -> value it is sorted
+        # under})
+        self._sorted_values = {}
+        # (index name, model class) lists left unsorted during a batch, see
+        # _batched
+        self._pending_sorted = None
+        # (latitude, longitude) attribute names and their grid index
+        self._spatial_attrs = spatial
+        self._spatial = GridIndex() if spatial else None
+        # name -> InvertedIndex
+        self._text_indexes = dict(text_indexes or {})
+        # Writes are exclusive so unique checks and inserts are atomic
+        self._lock = lock if lock is not None else WriterLock()
+        # StoragePersistence journaling the writes, if enabled
+        self._persistence = None
+        # compacted model -> record type, and record type -> model
+        self._record_types = {}
+        self._record_models = {}
+        logger.debug("New InMemoryRepository instance created")
+
+    def compact(self, model):
+        """Store the instances of a model as compact slots records.
+
+        Objects already stored are converted. Reads return the records,
+        which keep the model's attributes and ``to_dict``.
+        """
+        with self._lock.write_locked():
+            if model in self._record_types:
+                return
+            record_type = compact_type(model)
+            self._record_types[model] = record_type
+            self._record_models[record_type] = model
+            for obj in list(self._partitions.get(model, {}).values()):
+                self._insert(obj)
+
+    @property
+    def persistence(self):
+        """The StoragePersistence journaling writes, or None."""
+        return self._persistence
+
+    def enable_persistence(self, directory, models, **options):
+        """Recover the storage from a directory and journal later writes.
+
+        Args:
+            directory: Where the snapshot and journal files are kept.
+            models: Model classes that may be stored.
+            **options: Tuning passed to ``StoragePersistence``.
+        """
+        with self._lock.write_locked():
+            if self._persistence is not None:
+                raise RuntimeError("Persistence is already enabled")
+            persistence = StoragePersistence(directory, models, **options)
+            persistence.attach(self)
+            self._persistence = persistence
+        return persistence
+
+    def disable_persistence(self):
+        """Flush and close the journal, keeping the in-memory state."""
+        with self._lock.write_locked():
+            persistence, self._persistence = self._persistence, None
+        if persistence is not None:
+            persistence.close()
+
+    @staticmethod
+    def _index_key(obj, name, changes=None):
+        """Return the key of an object in an index, or _MISSING."""
+        attr_names = name if isinstance(name, tuple) else (name,)
+        values = []
+        for attr_name in attr_names:
+            if changes and attr_name in changes:
+                value = changes[attr_name]
+            else:
+                value = getattr(obj, attr_name, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+            values.append(value)
+        return tuple(values) if isinstance(name, tuple) else values[0]
+
+    @staticmethod
+    def _sort_key(obj, name):
+        """Return the value of an object in a sorted index, or None."""
+        if not isinstance(name, tuple):
+            return getattr(obj, name, None)
+        values = tuple(getattr(obj, attr_name, None) for attr_name in name)
+        return None if None in values else values
+
+    def _check_unique(self, obj, changes=None):
+        """Raise if an object would take a unique key held by another."""
+        for name in self._unique:
+            key = self._index_key(obj, name, changes)
+            if key is _MISSING:
+                continue
+            try:
+                bucket = self._indexes[name].get(key)
+            except TypeError:
+                continue
+            if bucket and any(obj_id != obj.id for obj_id in bucket):
+                raise UniqueConstraintError(
+                    f"Duplicate entry {key!r} for unique index {name!r}")
+
+    def _index(self, obj):
+        """Register an object in every declared index it can be part of."""
+        values = {}
+        for name, index in self._indexes.items():
+            key = self._index_key(obj, name)
+            if key is _MISSING:
+                continue
+            try:
+                bucket = index.setdefault(key, {})
+            except TypeError:
+                # Unhashable values cannot be indexed, lookups will scan
+                continue
+            bucket[obj.id] = obj
+            values[name] = key
+        if values:
+            self._indexed_values[obj.id] = values
+
+        sorted_values = {}
+        cls = self._record_models.get(type(obj), type(obj))
+        for attr_name, lists in self._sorted.items():
+            value = self._sort_key(obj, attr_name)
+            if value is None:
+                continue
+            entries = lists.setdefault(cls, [])
+            if self._pending_sorted is not None:
+                # Batched writes sort each index once, at the end
+                entries.append((value, obj.id))
+                self._pending_sorted.add((attr_name, cls))
+            else:
+                try:
+                    bisect.insort(entries, (value, obj.id))
+                except TypeError:
+                    # Not comparable with the values already sorted
+                    continue
+            sorted_values[attr_name] = value
+        if sorted_values:
+            self._sorted_values[obj.id] = (cls, sorted_values)
+
+        if self._spatial is not None:
+            lat_attr, lon_attr = self._spatial_attrs
+            latitude = getattr(obj, lat_attr, None)
+            longitude = getattr(obj, lon_attr, None)
+            if latitude is not None and longitude is not None:
+                self._spatial.insert(obj.id, latitude, longitude)
+
+        for text_index in self._text_indexes.values():
+            text_index.add(obj.id, obj)
+
+    def _unindex(self, obj_id):
+        """Remove an object from the indexes it was registered in."""
+        if self._spatial is not None:
+            self._spatial.remove(obj_id)
+        for text_index in self._text_indexes.values():
+            text_index.remove(obj_id)
+        cls, sorted_values = self._sorted_values.pop(obj_id, (None, {}))
+        for attr_name, value in sorted_values.items():
+            entries = self._sorted[attr_name][cls]
+            if (self._pending_sorted is not None
+                    and (attr_name, cls) in self._pending_sorted):
+                # Unsorted until the end of the batch
+                entries.remove((value, obj_id))
+                continue
+            position = bisect.bisect_left(entries, (value, obj_id))
+            if position < len(entries) and entries[position][1] == obj_id:
+                del entries[position]
+        values = self._indexed_values.pop(obj_id, None)
+        if not values:
+            return
+        for name, key in values.items():
+            index = self._indexes[name]
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(obj_id, None)
+            if not bucket:
+                del index[key]
+
+    @contextmanager
+    def _batched(self):
+        """Defer the sorting of the sorted indexes to the end of a batch.
+
+        Appending and sorting once costs O((N + k) log(N + k)) instead of
+        k insertions of O(N) each.
+        """
+        self._pending_sorted = set()
+        try:
+            yield
+        finally:
+            pending, self._pending_sorted = self._pending_sorted, None
+            for attr_name, cls in pending:
+                entries = self._sorted[attr_name][cls]
+                try:
+                    entries.sort()
+                except TypeError:
+                    # Drop the values not comparable with the others
+                    kept = []
+                    for value, obj_id in entries:
+                        try:
+                            bisect.insort(kept, (value, obj_id))
+                        except TypeError:
+                            del self._sorted_values[obj_id][1][attr_name]
+                    entries[:] = kept
+
+    def _check_unique_many(self, changed):
+        """Raise if (object, changes) pairs would duplicate a unique key,
+        between themselves or with the stored objects."""
+        for name in self._unique:
+            taken = {}
+            for obj, changes in changed:
+                key = self._index_key(obj, name, changes)
+                if key is _MISSING:
+                    continue
+                try:
+                    owner = taken.setdefault(key, obj.id)
+                    bucket = self._indexes[name].get(key)
+                except TypeError:
+                    continue
+                if owner != obj.id or (bucket and any(
+                        obj_id != obj.id for obj_id in bucket)):
+                    raise UniqueConstraintError(
+                        f"Duplicate entry {key!r} for unique index {name!r}")
+
+    def _check_columns(self, obj, data):
+        """Raise if changes set attributes a compact record lacks.
+
+        Records only hold columns: relationships are read-only and other
+        names have no slot, so they are rejected before anything changes.
+        """
+        if type(obj) not in self._record_models:
+            return
+        unknown = set(data).difference(obj.fields)
+        if unknown:
+            raise ValueError(
+                f"Cannot update {', '.join(sorted(unknown))} of "
+                f"{obj.model.__name__} {obj.id}: not a column")
+
+    def _apply(self, obj, data):
+        """Set the attributes of a stored object and re-index it."""
+        self._unindex(obj.id)
+        try:
+            for key, value in data.items():
+                setattr(obj, key, value)
+        finally:
+            # Even if a setter failed, the object must stay indexed
+            self._index(obj)
+
+    def _partitions_for(self, cls):
+        """Return the partitions holding instances of a class."""
+        return [
+            partition for part_cls, partition in self._partitions.items()
+            if issubclass(part_cls, cls)
+        ]
+
+    def _discard(self, obj_id):
+        """Remove an object from the id map, its partition and indexes."""
+        obj = self.storage.pop(obj_id, None)
+        if obj is None:
+            return None
+        cls = type(obj)
+        partition = self._partitions.get(self._record_models.get(cls, cls))
+        if partition is not None:
+            partition.pop(obj_id, None)
+        self._unindex(obj_id)
+        return obj
+
+    def _insert(self, obj):
+        """Store an object, replacing any previous one with its id.
+
+        Returns the stored object, a record for compacted models.
+        """
+        cls = type(obj)
+        record_type = self._record_types.get(cls)
+        if record_type is not None:
+            obj = record_type.from_model(obj)
+        else:
+            cls = self._record_models.get(cls, cls)
+        self._discard(obj.id)
+        self.storage[obj.id] = obj
+        self._partitions.setdefault(cls, {})[obj.id] = obj
+        self._index(obj)
+        return obj
+
+    def _clear(self, cls=None):
+        """Remove every object, or the instances of a class."""
+        if cls is None:
+            self.storage.clear()
+            self._partitions.clear()
+            self._indexed_values.clear()
+            for index in self._indexes.values():
+                index.clear()
+            self._sorted_values.clear()
+            for lists in self._sorted.values():
+                lists.clear()
+            if self._spatial is not None:
+                self._spatial.clear()
+            for text_index in self._text_indexes.values():
+                text_index.clear()
+            return
+        for part_cls in list(self._partitions):
+            if not issubclass(part_cls, cls):
+                continue
+            for obj_id in self._partitions.pop(part_cls):
+                del self.storage[obj_id]
+                self._unindex(obj_id)
 
     def add(self, obj):
         """Add object to storage."""
-        print("\n=== Adding object to storage ===")
-        print(f"Object ID: {obj.id}")
-        print(f"Object type: {type(obj).__name__}")
+        logger.debug("Adding %s %s", type(obj).__name__, obj.id)
 
-        self.storage[obj.id] = obj
-        print(f"Current storage keys: {list(self.storage.keys())}")
+        with self._lock.write_locked():
+            self._check_unique(obj)
+            stored = self._insert(obj)
+            if self._persistence is not None:
+                self._persistence.record_put(stored)
 
     def get(self, obj_id):
         """Get object by ID."""
-        print("\n=== Getting object from storage ===")
-        print(f"Searching for ID: {obj_id}")
-        print(f"Available IDs: {list(self.storage.keys())}")
-
-        obj = self.storage.get(obj_id)
-        print(f"Found object: {obj is not None}")
-        if obj:
-            print(f"Object type: {type(obj).__name__}")
-
+        with self._lock.read_locked():
+            obj = self.storage.get(obj_id)
+        logger.debug("Getting %s: found=%s", obj_id, obj is not None)
         return obj
 
     def get_all(self, cls=None):
         """Get all objects, optionally filtered by class."""
-        print("\n=== Getting all objects ===")
-        print(f"Filter class: {cls.__name__ if cls else 'None'}")
-
-        if cls is None:
-            items = list(self.storage.values())
-        else:
-            items = [
-                obj for obj in self.storage.values()
-                if isinstance(obj, cls)
-            ]
+        with self._lock.read_locked():
+            if cls is None:
+                items = list(self.storage.values())
+            else:
+                items = [
+                    obj for partition in self._partitions_for(cls)
+                    for obj in partition.values()
+                ]
 
-        print(f"Found {len(items)} items")
+        logger.debug("Getting all %s: %d items",
+                     cls.__name__ if cls else 'objects', len(items))
         return items
 
+    def iter_all(self, cls=None, batch_size=1000):
+        """Lazily iterate over all objects, optionally of a class.
+
+        Objects are read ``batch_size`` at a time and the lock is only
+        held while a batch is read, never between two ``next()`` calls.
+        With a sorted index on created_at, which every model sets, each
+        batch is the next keyset page of it and nothing else is copied.
+        Otherwise the ids are snapshotted first. Objects added during the
+        iteration may or may not be seen, deleted ones are skipped.
+        """
+        if 'created_at' in self._sorted:
+            after = None
+            while True:
+                batch = self.get_page(after, batch_size, cls)
+                yield from batch
+                if len(batch) < batch_size:
+                    return
+                after = page_key(batch[-1])
+
+        with self._lock.read_locked():
+            obj_ids = list(self._candidates(cls))
+        for start in range(0, len(obj_ids), batch_size):
+            with self._lock.read_locked():
+                batch = [self.storage[obj_id]
+                         for obj_id in obj_ids[start:start + batch_size]
+                         if obj_id in self.storage]
+            yield from batch
+
+    def count(self, cls=None):
+        """Count stored objects, optionally restricted to a class."""
+        with self._lock.read_locked():
+            if cls is None:
+                return len(self.storage)
+            return sum(
+                len(partition) for partition in self._partitions_for(cls))
+
     def update(self, obj_id, data):
         """Update object attributes."""
-        print("\n=== Updating object ===")
-        print(f"Object ID: {obj_id}")
-        print(f"Update data: {data}")
+        logger.debug("Updating %s with %s", obj_id, data)
 
-        obj = self.get(obj_id)
-        if obj:
-            for key, value in data.items():
-                setattr(obj, key, value)
-            self.storage[obj_id] = obj
-            print("Object updated successfully")
+        with self._lock.write_locked():
+            obj = self.get(obj_id)
+            if obj:
+                self._check_columns(obj, data)
+                self._check_unique(obj, data)
+                self._apply(obj, data)
+                if self._persistence is not None:
+                    self._persistence.record_put(obj)
+
+    def update_with(self, obj_id, compute):
+        """Update an object with the changes ``compute(obj)`` returns.
+
+        The object is read and updated under the write lock, so concurrent
+        read-modify-write updates, such as counters, are not lost. Returns
+        the changes, or None if the object is not stored.
+        """
+        with self._lock.write_locked():
+            obj = self.storage.get(obj_id)
+            if obj is None:
+                return None
+            changes = compute(obj)
+            self.update(obj_id, changes)
+        return changes
+
+    @staticmethod
+    def _object_id(obj_or_id):
+        """Return the id of an object, or the id itself."""
+        if isinstance(obj_or_id, str):
+            return obj_or_id
+        if hasattr(obj_or_id, 'id'):
+            return obj_or_id.id
+        raise ValueError("delete() requires a valid object or object ID")
 
     def delete(self, obj_or_id):
         """Delete object from storage."""
-        print("\n=== Deleting object ===")
+        obj_id = self._object_id(obj_or_id)
 
-        if isinstance(obj_or_id, str):
-            obj_id = obj_or_id
-            print(f"Deleting by ID: {obj_id}")
-        elif hasattr(obj_or_id, 'id'):
-            obj_id = obj_or_id.id
-            print(f"Deleting by object ID: {obj_id}")
-        else:
-            raise ValueError("delete() requires a valid object or object ID")
+        with self._lock.write_locked():
+            deleted = self._discard(obj_id) is not None
+            if deleted and self._persistence is not None:
+                self._persistence.record_delete(obj_id)
+        logger.debug("Deleting %s: found=%s", obj_id, deleted)
 
-        if obj_id in self.storage:
-            del self.storage[obj_id]
-            print("Object deleted successfully")
-        else:
-            print("Object not found")
+    def add_many(self, objs):
+        """Add objects under one lock and one pass over the indexes.
+
+        Unique indexes are checked for the whole batch first, so either
+        every object is added or none is.
+        """
+        objs = list(objs)
+        with self._lock.write_locked():
+            self._check_unique_many([(obj, None) for obj in objs])
+            with self._batched():
+                stored = [self._insert(obj) for obj in objs]
+            if self._persistence is not None:
+                self._persistence.record_put_many(stored)
+        logger.debug("Added %d objects", len(objs))
+
+    def update_many(self, updates):
+        """Update several objects, given as {object id: data}.
+
+        Unique indexes, and the columns of compact records, are checked
+        for the whole batch before any change is applied; ids that are
+        not stored are ignored.
+        """
+        with self._lock.write_locked():
+            targets = [(self.storage[obj_id], data)
+                       for obj_id, data in updates.items()
+                       if obj_id in self.storage]
+            for obj, data in targets:
+                self._check_columns(obj, data)
+            self._check_unique_many(targets)
+            with self._batched():
+                for obj, data in targets:
+                    self._apply(obj, data)
+            if self._persistence is not None:
+                self._persistence.record_put_many(
+                    [obj for obj, _ in targets])
+        logger.debug("Updated %d objects", len(targets))
+
+    def delete_many(self, objs_or_ids):
+        """Delete several objects or ids; return how many were found."""
+        obj_ids = [self._object_id(obj_or_id) for obj_or_id in objs_or_ids]
+        with self._lock.write_locked():
+            deleted = [obj_id for obj_id in obj_ids
+                       if self._discard(obj_id) is not None]
+            if deleted and self._persistence is not None:
+                self._persistence.record_delete_many(deleted)
+        logger.debug("Deleted %d of %d objects", len(deleted), len(obj_ids))
+        return len(deleted)
 
     def clear_all(self, cls=None):
         """Clear storage, optionally by class."""
-        print("\n=== Clearing storage ===")
-        print(f"Filter class: {cls.__name__ if cls else 'None'}")
+        with self._lock.write_locked():
+            self._clear(cls)
+            if self._persistence is not None:
+                self._persistence.record_clear(cls)
+        logger.debug("Cleared %s: %d items remaining",
+                     cls.__name__ if cls else 'storage', len(self.storage))
 
-        if cls is None:
-            self.storage.clear()
+    def _lookup(self, criteria):
+        """Return the index bucket matching criteria, or None to scan."""
+        name = self._covering.get(frozenset(criteria))
+        if name is None:
+            return None
+        if isinstance(name, tuple):
+            key = tuple(criteria[attr_name] for attr_name in name)
         else:
-            self.storage = {
-                k: v for k, v in self.storage.items()
-                if not isinstance(v, cls)
-            }
-        print(f"Remaining items: {len(self.storage)}")
+            key = criteria[name]
+        try:
+            return self._indexes[name].get(key, {})
+        except TypeError:
+            return None
+
+    @staticmethod
+    def _matches(obj, criteria):
+        """Tell whether an object carries every attribute value given."""
+        return all(
+            getattr(obj, attr_name, None) == attr_value
+            for attr_name, attr_value in criteria.items()
+        )
 
     def get_by_attribute(self, attr_name, attr_value):
         """Find first object by attribute value."""
-        print("\n=== Getting object by attribute ===")
-        print(f"Attribute: {attr_name}")
-        print(f"Value: {attr_value}")
+        with self._lock.read_locked():
+            bucket = self._lookup({attr_name: attr_value})
+            if bucket is not None:
+                return next(iter(bucket.values()), None)
 
-        try:
-            obj = next(
+            logger.debug("No index on %s, scanning storage", attr_name)
+            try:
+                return next(
+                    (obj for obj in self.storage.values()
+                        if getattr(obj, attr_name, None) == attr_value),
+                    None
+                )
+            except Exception:
+                logger.exception("Lookup by %s failed", attr_name)
+                return None
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Find all objects by attribute value."""
+        with self._lock.read_locked():
+            bucket = self._lookup({attr_name: attr_value})
+            if bucket is not None:
+                return list(bucket.values())
+
+            logger.debug("No index on %s, scanning storage", attr_name)
+            return [
+                obj for obj in self.storage.values()
+                if getattr(obj, attr_name, None) == attr_value
+            ]
+
+    def get_by_attributes(self, **criteria):
+        """Find first object matching every attribute value given.
+
+        A single probe when a composite index covers exactly these
+        attributes, a scan otherwise.
+        """
+        with self._lock.read_locked():
+            bucket = self._lookup(criteria)
+            if bucket is not None:
+                return next(iter(bucket.values()), None)
+            return next(
                 (obj for obj in self.storage.values()
-                    if getattr(obj, attr_name, None) == attr_value),
+                    if self._matches(obj, criteria)),
                 None
             )
-            print(f"Found object: {obj is not None}")
-            return obj
-        except Exception as e:
-            print(f"Error: {str(e)}")
-            return None
 
-    def get_all_by_attribute(self, attr_name, attr_value):
-        """Find all objects by attribute value."""
-        print("\n=== Getting all objects by attribute ===")
-        print(f"Attribute: {attr_name}")
-        print(f"Value: {attr_value}")
+    def get_all_by_attributes(self, **criteria):
+        """Find all objects matching every attribute value given."""
+        with self._lock.read_locked():
+            bucket = self._lookup(criteria)
+            if bucket is not None:
+                return list(bucket.values())
+            return [
+                obj for obj in self.storage.values()
+                if self._matches(obj, criteria)
+            ]
 
-        items = [
-            obj for obj in self.storage.values()
-            if getattr(obj, attr_name, None) == attr_value
-        ]
-        print(f"Found {len(items)} items")
-        return items
+    def _candidates(self, cls):
+        """Return an id -> object map of the objects of a class."""
+        if cls is None:
+            return self.storage
+        partitions = self._partitions_for(cls)
+        if len(partitions) == 1:
+            return partitions[0]
+        return {
+            obj_id: obj for partition in partitions
+            for obj_id, obj in partition.items()
+        }
+
+    def _sorted_lists(self, name, cls):
+        """Return the lists of a sorted index for the classes of cls."""
+        lists = self._sorted[name]
+        if cls is None:
+            return list(lists.values())
+        return [entries for part_cls, entries in lists.items()
+                if issubclass(part_cls, cls)]
+
+    @staticmethod
+    def _merge(runs, reverse=False):
+        """Iterate over the entries of sorted runs in order."""
+        if len(runs) == 1:
+            return iter(runs[0])
+        return heapq.merge(*runs, reverse=reverse)
+
+    def get_all_by_range(self, attr_name, low=None, high=None, cls=None):
+        """Find all objects whose attribute is within [low, high].
+
+        Either bound may be None for an open range, and ``cls`` restricts
+        the results to a class. Results are ordered by the attribute
+        value. Served by a sorted index when one is declared, by a scan
+        and a sort otherwise.
+        """
+        with self._lock.read_locked():
+            if attr_name in self._sorted:
+                runs = []
+                for entries in self._sorted_lists(attr_name, cls):
+                    start = 0 if low is None else bisect.bisect_left(
+                        entries, low, key=_first)
+                    end = len(entries) if high is None else \
+                        bisect.bisect_right(entries, high, key=_first)
+                    runs.append(entries[start:end])
+                return [self.storage[obj_id]
+                        for _, obj_id in self._merge(runs)]
+
+            candidates = self._candidates(cls)
+            logger.debug("No sorted index on %s, scanning storage",
+                         attr_name)
+            matches = [
+                obj for obj in candidates.values()
+                if getattr(obj, attr_name, None) is not None
+                and (low is None or getattr(obj, attr_name) >= low)
+                and (high is None or getattr(obj, attr_name) <= high)
+            ]
+            matches.sort(key=lambda obj: getattr(obj, attr_name))
+            return matches
+
+    def get_page(self, after=None, limit=20, cls=None):
+        """Return up to ``limit`` objects ordered by (created_at, id),
+        starting after the key ``after``.
+
+        Served by a sorted index on created_at when one is declared, whose
+        (value, id) entries are exactly the page keys, by a scan otherwise.
+        Its lists are kept per class, so a page costs O(log N + limit)
+        whatever the objects of other classes and the depth of the page.
+        """
+        with self._lock.read_locked():
+            if 'created_at' not in self._sorted:
+                logger.debug("No sorted index on created_at, scanning")
+                return paginate(self._candidates(cls).values(), after, limit)
+
+            runs = []
+            for entries in self._sorted_lists('created_at', cls):
+                position = 0 if after is None else bisect.bisect_right(
+                    entries, after)
+                runs.append(islice(entries, position, None))
+            return [self.storage[obj_id] for _, obj_id in
+                    islice(self._merge(runs), limit)]
+
+    def get_page_by(self, name, prefix, after=None, limit=20,
+                    descending=False, cls=None):
+        """Return a keyset page of the objects sharing leading values of a
+        composite sorted index, ordered by its other attributes and id.
+
+        Args:
+            name: The composite sorted index, e.g.
+                ``('place_id', 'created_at')``.
+            prefix: Values of its leading attributes, e.g. ``(place_id,)``.
+            after: Key of the last object of the previous page: the values
+                of the other attributes, then the id.
+            limit: Maximum number of objects returned.
+            descending: Order from the greatest key down.
+            cls: Only return instances of this class.
+
+        A bisection finds the start of the page, so its cost does not
+        depend on how many objects share the prefix.
+        """
+        size = len(prefix)
+        if after is not None:
+            after = (prefix + tuple(after[:-1]), after[-1])
+
+        def leading(entry):
+            return entry[0][:size]
+
+        with self._lock.read_locked():
+            runs = []
+            for entries in self._sorted_lists(name, cls):
+                start = bisect.bisect_left(entries, prefix, key=leading)
+                end = bisect.bisect_right(entries, prefix, lo=start,
+                                          key=leading)
+                if after is not None:
+                    if descending:
+                        end = bisect.bisect_left(entries, after, start, end)
+                    else:
+                        start = bisect.bisect_right(entries, after, start,
+                                                    end)
+                positions = (range(end - 1, start - 1, -1) if descending
+                             else range(start, end))
+                runs.append(map(entries.__getitem__, positions))
+            return [self.storage[obj_id] for _, obj_id in
+                    islice(self._merge(runs, descending), limit)]
+
+    def get_all_in_bbox(self, min_lat, min_lon, max_lat, max_lon, cls=None):
+        """Find all objects located inside a bounding box.
+
+        A box with ``min_lon > max_lon`` crosses the antimeridian. Served
+        by the spatial grid index when one is declared, by a scan
+        otherwise.
+        """
+        with self._lock.read_locked():
+            candidates = self._candidates(cls)
+            if self._spatial is not None:
+                return [
+                    candidates[obj_id] for obj_id in self._spatial.search(
+                        min_lat, min_lon, max_lat, max_lon)
+                    if obj_id in candidates
+                ]
+
+            logger.debug("No spatial index, scanning storage")
+            matches = []
+            for obj in candidates.values():
+                latitude = getattr(obj, 'latitude', None)
+                longitude = getattr(obj, 'longitude', None)
+                if latitude is None or longitude is None:
+                    continue
+                if not min_lat <= latitude <= max_lat:
+                    continue
+                if min_lon <= max_lon:
+                    inside = min_lon <= longitude <= max_lon
+                else:
+                    inside = longitude >= min_lon or longitude <= max_lon
+                if inside:
+                    matches.append(obj)
+            return matches
+
+    def get_nearest(self, latitude, longitude, limit, radius_km=None,
+                    cls=None):
+        """Find the objects closest to a point by great-circle distance.
+
+        Returns up to ``limit`` sorted ``(distance_km, obj)`` pairs,
+        optionally within ``radius_km``. Served by the spatial grid index
+        and a bounded heap when one is declared, by a scan otherwise.
+        """
+        with self._lock.read_locked():
+            candidates = self._candidates(cls)
+            if self._spatial is not None:
+                keep = None if candidates is self.storage else (
+                    candidates.__contains__)
+                return [
+                    (distance, candidates[obj_id])
+                    for distance, obj_id in self._spatial.nearest(
+                        latitude, longitude, limit, radius_km, keep)
+                ]
+
+            logger.debug("No spatial index, scanning storage")
+            distances = (
+                (haversine_km(latitude, longitude, obj.latitude,
+                              obj.longitude), obj)
+                for obj in candidates.values()
+                if getattr(obj, 'latitude', None) is not None
+                and getattr(obj, 'longitude', None) is not None
+            )
+            if radius_km is not None:
+                distances = (
+                    pair for pair in distances if pair[0] <= radius_km)
+            return heapq.nsmallest(limit, distances, key=_first)
+
+    def search(self, index_name, query, limit=None, offset=0, cls=None,
+               scope=ANY_SCOPE):
+        """Rank the objects matching a keyword query on a text index.
+
+        ``scope`` restricts a scoped index to the objects with that value
+        of its scope attribute. Returns the number of matches and the
+        requested page of ``(score, obj)`` pairs, best BM25 score first.
+        """
+        with self._lock.read_locked():
+            candidates = self._candidates(cls)
+            keep = None if candidates is self.storage else (
+                candidates.__contains__)
+            total, page = self._text_indexes[index_name].search(
+                query, limit, offset, keep, scope)
+            return total, [(score, candidates[obj_id])
+                           for score, obj_id in page]
 
     def save(self):
-        """Persist changes (no-op for in-memory storage)."""
-        print("\n=== Saving changes ===")
-        print(f"Current storage size: {len(self.storage)}")
+        """Wait until journaled changes are durable.
+
+        A no-op unless persistence is enabled. Changes made by setting
+        attributes directly are not journaled, use ``update`` for them.
+        Within a request unit of work, the wait happens once at the end
+        of the request.
+        """
+        persistence = self._persistence
+        if persistence is None:
+            return
+        pending = unit_of_work.current()
+        if pending is not None:
+            pending.defer_save(self)
+            return
+        logger.debug("Saving changes: %d items", len(self.storage))
+        persistence.sync()
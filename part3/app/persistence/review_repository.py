@@ -1,3 +1,4 @@
+from app import db
 from app.persistence.repository import SQLAlchemyRepository
 from app.models.review import Review
 
@@ -10,3 +11,26 @@ class ReviewRepository(SQLAlchemyRepository):
 
     def __init__(self):
         super().__init__(Review)
+
+    def get_by_user_and_place(self, user_id, place_id):
+        """
+        Retourne l'avis d'un utilisateur pour un lieu, via l'index unique
+        (user_id, place_id) de la table reviews.
+        """
+        return self.get_by_attributes(user_id=user_id, place_id=place_id)
+
+    def get_page_by_place(self, place_id, after=None, limit=20,
+                          order_by=('created_at',)):
+        """
+        Retourne une page des avis d'un lieu, triés par ordre décroissant
+        des colonnes order_by puis de l'id, après la clé after (valeurs de
+        ces colonnes puis id). Les index (place_id, created_at) et
+        (place_id, rating, created_at) servent la recherche et le tri,
+        quel que soit le nombre d'avis du lieu.
+        """
+        columns = [getattr(Review, name) for name in order_by] + [Review.id]
+        query = self._query().filter(Review.place_id == place_id)
+        if after is not None:
+            query = query.filter(db.tuple_(*columns) < tuple(after))
+        return query.order_by(
+            *(column.desc() for column in columns)).limit(limit).all()
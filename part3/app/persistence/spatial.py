@@ -0,0 +1,161 @@
+"""
+Uniform grid index over latitude/longitude points.
+
+The world is cut into square cells of ``cell_size`` degrees and every
+indexed point is bucketed in the cell that contains it. A bounding-box
+query only visits the cells overlapping the box, or the occupied cells
+when there are fewer of those, and then checks the points it finds.
+
+Nearest-neighbour queries grow a search radius around the query point,
+compute great-circle distances only for the points of the cells it
+covers, and keep the k best in a bounded heap.
+"""
+
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (math.sin(dphi / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(latitude, longitude, radius_km):
+    """Return the (min_lat, min_lon, max_lat, max_lon) box enclosing a
+    circle. ``min_lon > max_lon`` when it crosses the antimeridian."""
+    angle = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angle)
+    max_lat = latitude + math.degrees(angle)
+    if min_lat <= -90 or max_lat >= 90 or angle >= math.pi / 2:
+        # The circle contains a pole: every longitude is in reach
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    dlon = math.degrees(
+        math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+    min_lon, max_lon = longitude - dlon, longitude + dlon
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    return min_lat, min_lon, max_lat, max_lon
+
+
+class GridIndex:
+    """Spatial index of object ids by (latitude, longitude)."""
+
+    def __init__(self, cell_size=0.5):
+        self.cell_size = cell_size
+        # (row, column) -> {object id -> (latitude, longitude)}
+        self._cells = {}
+        # object id -> (row, column) of its cell
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _cell(self, latitude, longitude):
+        return (math.floor(latitude / self.cell_size),
+                math.floor(longitude / self.cell_size))
+
+    def insert(self, obj_id, latitude, longitude):
+        """Index a point, replacing any previous position of the id."""
+        self.remove(obj_id)
+        cell = self._cell(latitude, longitude)
+        self._cells.setdefault(cell, {})[obj_id] = (latitude, longitude)
+        self._positions[obj_id] = cell
+
+    def remove(self, obj_id):
+        cell = self._positions.pop(obj_id, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[obj_id]
+        if not bucket:
+            del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._positions.clear()
+
+    def _points(self, min_lat, min_lon, max_lat, max_lon):
+        """Yield (id, latitude, longitude) for the points in a box."""
+        if min_lon > max_lon:
+            yield from self._points(min_lat, min_lon, max_lat, 180.0)
+            yield from self._points(min_lat, -180.0, max_lat, max_lon)
+            return
+
+        first_row, first_col = self._cell(min_lat, min_lon)
+        last_row, last_col = self._cell(max_lat, max_lon)
+        spanned = (last_row - first_row + 1) * (last_col - first_col + 1)
+        if spanned <= len(self._cells):
+            cells = (
+                self._cells.get((row, col))
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)
+            )
+        else:
+            # Large box over a sparse grid: walk the occupied cells
+            cells = (
+                bucket for (row, col), bucket in self._cells.items()
+                if first_row <= row <= last_row
+                and first_col <= col <= last_col
+            )
+
+        for bucket in cells:
+            if not bucket:
+                continue
+            for obj_id, (latitude, longitude) in bucket.items():
+                if (min_lat <= latitude <= max_lat
+                        and min_lon <= longitude <= max_lon):
+                    yield obj_id, latitude, longitude
+
+    def search(self, min_lat, min_lon, max_lat, max_lon):
+        """Yield the ids of the points inside a bounding box.
+
+        A box with ``min_lon > max_lon`` crosses the antimeridian and is
+        searched as its two halves.
+        """
+        for obj_id, _, _ in self._points(min_lat, min_lon, max_lat,
+                                         max_lon):
+            yield obj_id
+
+    def nearest(self, latitude, longitude, k, radius_km=None, keep=None):
+        """Return the k closest points as sorted (distance_km, id) pairs.
+
+        Args:
+            latitude, longitude: The query point.
+            k: How many points to return at most.
+            radius_km: Only consider points within this distance.
+            keep: Optional predicate on ids, for points that may be
+                returned.
+        """
+        if k <= 0 or not self._positions:
+            return []
+        limit = HALF_CIRCUMFERENCE_KM if radius_km is None else min(
+            radius_km, HALF_CIRCUMFERENCE_KM)
+        # Start around one cell and double until k points are in reach
+        reach = min(limit, self.cell_size * 111.2)
+        while True:
+            heap = []
+            for obj_id, lat, lon in self._points(
+                    *bbox_around(latitude, longitude, reach)):
+                if keep is not None and not keep(obj_id):
+                    continue
+                distance = haversine_km(latitude, longitude, lat, lon)
+                if distance > reach:
+                    continue
+                if len(heap) < k:
+                    heapq.heappush(heap, (-distance, obj_id))
+                elif distance < -heap[0][0]:
+                    heapq.heapreplace(heap, (-distance, obj_id))
+            # Points beyond the reach are farther than every point found
+            if len(heap) == k or reach >= limit:
+                return sorted((-neg, obj_id) for neg, obj_id in heap)
+            reach = min(limit, reach * 2)
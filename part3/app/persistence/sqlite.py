@@ -0,0 +1,29 @@
+"""
+SQLite connection tuning.
+
+PRAGMA settings such as ``synchronous`` or ``cache_size`` belong to a
+connection, not to the database, so they are applied on every connection
+the engine pool opens. ``journal_mode = WAL`` is recorded in the database
+file: readers then work on a snapshot while a writer appends to the
+write-ahead log, instead of waiting for it to release its lock.
+"""
+
+from sqlalchemy import event
+
+
+def apply_pragmas(engine, pragmas):
+    """Run ``PRAGMA name = value`` on each new connection of an engine.
+
+    Does nothing for other databases than SQLite, or without pragmas.
+    """
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
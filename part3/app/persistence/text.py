@@ -0,0 +1,161 @@
+"""
+Inverted full-text index with BM25 ranking.
+
+Text attributes are split into lowercase, accent-folded word tokens. Each
+term maps to the objects containing it with their term frequency, so a
+query only touches the postings of its own terms. Documents are added and
+removed incrementally as the repository changes.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+
+_WORD = re.compile(r'\w+')
+# Default scope of a search: every scope
+ANY_SCOPE = object()
+
+
+def _rank_order(pair):
+    """Best score first, ties broken by id for a stable pagination."""
+    score, obj_id = pair
+    return -score, obj_id
+
+
+def tokenize(text):
+    """Split text into lowercase, accent-folded word tokens."""
+    if not text:
+        return []
+    folded = unicodedata.normalize('NFKD', str(text).lower())
+    folded = ''.join(char for char in folded
+                     if not unicodedata.combining(char))
+    return _WORD.findall(folded)
+
+
+class InvertedIndex:
+    """
+    BM25-ranked inverted index over some text attributes of objects.
+
+    Args:
+        fields: The attribute names whose text is indexed.
+        weights: Optional {attribute: weight} multiplying the term
+            frequencies of an attribute, e.g. to favour titles.
+        scope: Optional attribute partitioning the postings, e.g.
+            ``'place_id'``. A scoped search only reads the postings of
+            its scope, while scores keep using the statistics of the
+            whole collection.
+        k1, b: The BM25 saturation and length normalization parameters.
+    """
+
+    def __init__(self, fields, weights=None, scope=None, k1=1.2, b=0.75):
+        self.fields = tuple(fields)
+        self.weights = dict(weights or {})
+        self.scope = scope
+        self.k1 = k1
+        self.b = b
+        # term -> {scope value -> {object id -> weighted term frequency}}
+        self._postings = {}
+        # term -> number of objects containing it, over every scope
+        self._document_frequency = {}
+        # object id -> (scope value, weighted length, distinct terms)
+        self._documents = {}
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, obj_id, obj):
+        """Index the text attributes of an object under its id."""
+        self.remove(obj_id)
+        frequencies = {}
+        length = 0.0
+        for field in self.fields:
+            weight = self.weights.get(field, 1.0)
+            for term in tokenize(getattr(obj, field, None)):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+                length += weight
+        if not frequencies:
+            return
+        scope = getattr(obj, self.scope, None) if self.scope else None
+        for term, frequency in frequencies.items():
+            scopes = self._postings.setdefault(term, {})
+            scopes.setdefault(scope, {})[obj_id] = frequency
+            self._document_frequency[term] = (
+                self._document_frequency.get(term, 0) + 1)
+        self._documents[obj_id] = (scope, length, tuple(frequencies))
+        self._total_length += length
+
+    def remove(self, obj_id):
+        """Drop an object from the index."""
+        document = self._documents.pop(obj_id, None)
+        if document is None:
+            return
+        scope, length, terms = document
+        self._total_length -= length
+        for term in terms:
+            scopes = self._postings[term]
+            postings = scopes[scope]
+            del postings[obj_id]
+            if not postings:
+                del scopes[scope]
+                if not scopes:
+                    del self._postings[term]
+            self._document_frequency[term] -= 1
+            if not self._document_frequency[term]:
+                del self._document_frequency[term]
+
+    def clear(self):
+        self._postings.clear()
+        self._document_frequency.clear()
+        self._documents.clear()
+        self._total_length = 0.0
+
+    def search(self, query, limit=None, offset=0, keep=None, scope=ANY_SCOPE):
+        """Rank the objects matching any query term by BM25 score.
+
+        Args:
+            query: The query text, tokenized like the documents.
+            limit: Page size, or None for every match.
+            offset: How many of the best matches to skip.
+            keep: Optional predicate on ids, for objects that may match.
+            scope: Only search the objects with this scope value.
+
+        Returns:
+            tuple: The number of matches and the requested page of
+            ``(score, id)`` pairs, best first.
+        """
+        count = len(self._documents)
+        if not count:
+            return 0, []
+        average_length = self._total_length / count
+        scores = {}
+        for term in set(tokenize(query)):
+            scopes = self._postings.get(term)
+            if not scopes:
+                continue
+            if scope is ANY_SCOPE:
+                postings_lists = scopes.values()
+            elif scope in scopes:
+                postings_lists = (scopes[scope],)
+            else:
+                continue
+            frequency = self._document_frequency[term]
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for postings in postings_lists:
+                for obj_id, tf in postings.items():
+                    if keep is not None and not keep(obj_id):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b
+                                      * self._documents[obj_id][1]
+                                      / average_length)
+                    scores[obj_id] = (scores.get(obj_id, 0.0) + idf * tf
+                                      * (self.k1 + 1) / (tf + norm))
+
+        ranked = ((score, obj_id) for obj_id, score in scores.items())
+        if limit is None:
+            page = sorted(ranked, key=_rank_order)[offset:]
+        else:
+            page = heapq.nsmallest(offset + limit, ranked,
+                                   key=_rank_order)[offset:]
+        return len(scores), page
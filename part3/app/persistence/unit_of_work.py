@@ -0,0 +1,110 @@
+"""
+Request-scoped unit of work.
+
+When ``UNIT_OF_WORK`` is enabled, each request runs in one unit of work:
+
+- SQL repository writes only flush, so their statements run and their
+  errors surface right away, and the request ends with a single commit,
+  or a rollback when it fails (an exception or an error status).
+- ``InMemoryRepository.save`` does not wait for the storage journal; the
+  journal is synced once when the request ends. Writes to the in-memory
+  storage are not transactional and are kept even when the SQL session
+  is rolled back.
+
+Outside of a request, e.g. in scripts and tests, writes commit at once.
+"""
+
+import logging
+
+from flask import g, has_request_context
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork:
+    """Pending work of one request."""
+
+    def __init__(self):
+        # In-memory repositories whose save() was deferred
+        self.storages = []
+
+    def defer_save(self, repo):
+        if repo not in self.storages:
+            self.storages.append(repo)
+
+
+def current():
+    """Return the unit of work of the current request, or None."""
+    if not has_request_context():
+        return None
+    return g.get('unit_of_work')
+
+
+def begin():
+    g.unit_of_work = UnitOfWork()
+
+
+def end(commit):
+    """Commit or roll back the session, then save the storages.
+
+    A no-op when no unit of work is open, so it may be called twice.
+    """
+    unit_of_work = g.pop('unit_of_work', None)
+    if unit_of_work is None:
+        return
+    try:
+        if commit:
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        else:
+            db.session.rollback()
+    finally:
+        # Outside the unit of work again: these wait for the journal
+        for repo in unit_of_work.storages:
+            repo.save()
+
+
+def commit():
+    """Commit the session, or only flush it inside a unit of work.
+
+    A failed write rolls the session back, and within a unit of work the
+    earlier writes of the request with it.
+    """
+    try:
+        if current() is not None:
+            db.session.flush()
+        else:
+            db.session.commit()
+    except IntegrityError:
+        # Leave the session usable for the rest of the request
+        db.session.rollback()
+        raise
+
+
+def init_app(app):
+    """Run every request of the app in a unit of work if enabled."""
+    if not app.config.get('UNIT_OF_WORK'):
+        return
+
+    @app.before_request
+    def begin_unit_of_work():
+        begin()
+
+    @app.after_request
+    def end_unit_of_work(response):
+        # Error responses leave no partial writes behind
+        end(commit=response.status_code < 400)
+        return response
+
+    @app.teardown_request
+    def abort_unit_of_work(exc):
+        # Only still open when the request raised
+        if g.get('unit_of_work') is not None:
+            logger.debug("Rolling back the unit of work: %r", exc)
+        end(commit=False)
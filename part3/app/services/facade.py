@@ -1,20 +1,30 @@
+import logging
+from datetime import datetime
+from functools import partial
+from itertools import takewhile
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from app.persistence.repository import InMemoryRepository
+from app.persistence.repository import UniqueConstraintError
 from app.models.user import User
 from app.models.review import Review
 from app.models.amenity import Amenity
-from app.models.place import Place
+from app.models.place import Place, rating_aggregates, rating_changes
 from app.models import storage
 from app.persistence.repository import SQLAlchemyRepository
 from app.persistence.user_repository import UserRepository
-from app import db
 from app.persistence.place_repository import PlaceRepository
 from app.persistence.review_repository import ReviewRepository
 from app.persistence.amenity_repository import AmenityRepository
+from app.persistence import identity_map, unit_of_work
+from app.persistence.pagination import (
+    decode_cursor, encode_cursor, page_key, paginate)
+from app.logger import Lazy
 
 
 bcrypt = Bcrypt()
+logger = logging.getLogger(__name__)
 
 
 # Exception handler for validation errors
@@ -22,6 +32,33 @@ class ValidationError(Exception):
     pass
 
 
+# Upper bounds of the limit parameter of nearby and keyword searches, and
+# of the leaderboards
+MAX_NEARBY_LIMIT = 100
+MAX_SEARCH_LIMIT = 100
+MAX_TOP_LIMIT = 100
+# Page size of the list endpoints, by default and at most
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+# Orders of the reviews of a place, newest or best rated first: the
+# attributes sorted on after place_id, and the types of the page key
+# (their values, then the id)
+REVIEW_SORTS = {
+    'newest': (('created_at',), (datetime, str)),
+    'rating': (('rating', 'created_at'), (int, datetime, str)),
+}
+# Orders of the places list besides the default, oldest first: by average
+# rating or by number of reviews, greatest first, in the same form
+PLACE_SORTS = {
+    'rating': (('average_rating', 'created_at'), (float, datetime, str)),
+    'reviews': (('review_count', 'created_at'), (int, datetime, str)),
+}
+# Columns of a place its owner may update; the others, such as the rating
+# aggregates, are maintained by the facade, and the owner never changes
+PLACE_UPDATE_FIELDS = ('title', 'description', 'price', 'latitude',
+                       'longitude')
+
+
 class HBnBFacade:
     """
     The HBnB facade enables interaction with object repositories
@@ -101,6 +138,7 @@ class HBnBFacade:
             raise ValueError("Place not found")
 
         storage.delete(place)
+        identity_map.forget(place)
         storage.save()
         return True
 
@@ -122,11 +160,13 @@ class HBnBFacade:
         if not review:
             raise ValueError("Review not found")
 
+        changes = {}
         if 'text' in review_data:
-            review.text = review_data['text']
+            changes['text'] = review_data['text']
         if 'rating' in review_data:
-            review.rating = self.validate_rating(review_data['rating'])
+            changes['rating'] = self.validate_rating(review_data['rating'])
 
+        self._update_review(review, changes)
         storage.save()
         return review
 
@@ -145,7 +185,6 @@ class HBnBFacade:
 
     def create_user(self, user_data: dict) -> User:
         """Create a new user."""
-        print("\n=== Creating User in Facade ===")
         try:
             # VCheck if the email already exists
             existing_user = self.get_user_by_email(user_data.get('email'))
@@ -154,7 +193,6 @@ class HBnBFacade:
 
             # Obtain password and other user data
             password = user_data.get('password')
-            print("Received raw password in facade")
 
             user = User(
                 first_name=user_data["first_name"],
@@ -164,24 +202,47 @@ class HBnBFacade:
                 is_admin=user_data.get("is_admin", False)
             )
 
-            print(f"User created in facade. Final password hash: {
-                user.password[:20]}...")
-
             # Ajouter l'utilisateur via le SQLAlchemyRepository
             self.user_repo.add(user)
+            logger.info("User created with ID: %s", user.id)
             return user
 
         except Exception as e:
-            print(f"Error in create_user: {str(e)}")
+            logger.debug("Error in create_user: %s", e)
             raise ValueError(str(e))
 
+    def create_users(self, users_data):
+        """Create several users in one transaction."""
+        emails = [user_data.get('email') for user_data in users_data]
+        if len(set(emails)) != len(emails):
+            raise ValueError("Email already in use")
+        if User.query.filter(User.email.in_(emails)).first():
+            raise ValueError("Email already in use")
+
+        users = [
+            User(
+                first_name=user_data["first_name"],
+                last_name=user_data["last_name"],
+                email=user_data["email"],
+                password=user_data.get('password'),
+                is_admin=user_data.get("is_admin", False)
+            )
+            for user_data in users_data
+        ]
+        try:
+            self.user_repo.add_many(users)
+        except IntegrityError:
+            raise ValueError("Email already in use")
+        logger.info("%d users created", len(users))
+        return users
+
     def update_user(self, user_id, user_data):
         current_user_id = get_jwt_identity()
 
         if user_id != current_user_id:
             raise ValidationError("Unauthorized access")
 
-        user = self.user_repo.get(user_id)
+        user = self.get_user(user_id)
         if not user:
             raise ValidationError("User not found")
 
@@ -191,21 +252,45 @@ class HBnBFacade:
         if 'last_name' in user_data:
             user.last_name = user_data['last_name']
         if 'email' in user_data or 'password' in user_data:
-            print("Modification de l'email ou du mot de passe interdite.")
+            logger.debug("Modification de l'email ou du mot de passe "
+                         "interdite.")
 
-        db.session.commit()  # Sauvegarder les changements
+        unit_of_work.commit()  # Sauvegarder les changements
         return user
 
     def delete_user(self, user_id):
-        user = self.user_repo.get(user_id)
+        user = self.get_user(user_id)
         if not user:
             raise ValidationError("User not found")
 
         # Suppression via SQLAlchemyRepository
         self.user_repo.delete(user_id)
+        identity_map.forget(user)
+
+    def _page(self, fetch, limit, cursor, key=page_key,
+              key_types=(datetime, str)):
+        """Fetch one keyset page with ``fetch(after, limit)``.
+
+        Returns the page and the cursor of the next one, None on the last
+        page. One extra object is fetched to know whether there is more.
+        Pages are ordered by (created_at, id) unless another ``key``
+        function and the types of its values are given.
+        """
+        if not 1 <= limit <= MAX_PAGE_LIMIT:
+            raise ValidationError(
+                f'limit must be between 1 and {MAX_PAGE_LIMIT}')
+        try:
+            after = decode_cursor(cursor, key_types) if cursor else None
+        except ValueError as e:
+            raise ValidationError(str(e))
+        objs = fetch(after, limit + 1)
+        if len(objs) > limit:
+            return objs[:limit], encode_cursor(key(objs[limit - 1]))
+        return objs, None
 
     def get_user(self, user_id):
-        return self.user_repo.get(user_id)
+        return identity_map.lookup(user_id,
+                                   partial(self.user_repo.get, user_id))
 
     def get_user_by_email(self, email):
         # Rechercher l'utilisateur par email en utilisant SQLAlchemy
@@ -219,16 +304,14 @@ class HBnBFacade:
     def create_review(self, review_data):
         user_id = review_data.get('user_id')
         place_id = review_data.get('place_id')
-        print(f"Debug: User ID = {user_id}, Place ID = {place_id}")
+        logger.debug("Creating review: user=%s place=%s", user_id, place_id)
 
-        user = storage.get(user_id)
+        user = identity_map.lookup(user_id, partial(storage.get, user_id))
         if not user:
-            print(f"Error: User {user_id} not found.")
             raise ValidationError(f"User with ID {user_id} not found")
 
-        place = storage.get(place_id)
+        place = identity_map.lookup(place_id, partial(storage.get, place_id))
         if not place:
-            print(f"Error: Place {place_id} not found.")
             raise ValidationError(f"Place with ID {place_id} not found")
 
         if place.owner_id == user_id:
@@ -244,9 +327,17 @@ class HBnBFacade:
             user_id=user_id,
             place_id=place_id
         )
-        storage.add(review)
+        try:
+            # The unique (user_id, place_id) index rejects a concurrent
+            # duplicate that got past the check above
+            storage.add(review)
+        except (UniqueConstraintError, IntegrityError):
+            raise ValidationError("User has already reviewed this place")
+        self._rate_place(place_id, added=review.rating)
+        identity_map.add(review.id, review)
+        identity_map.add(('review', user_id, place_id), review)
         storage.save()
-        print(f"Review created with ID: {review.id}")
+        logger.info("Review created with ID: %s", review.id)
         return review
 
     def get_user_review_for_place(self, user_id, place_id):
@@ -261,20 +352,50 @@ class HBnBFacade:
         Returns:
             Review or None: The review if found, otherwise None.
         """
-        reviews = storage.get_all(Review)
-        for review in reviews:
-            if review.user_id == user_id and review.place_id == place_id:
-                return review
-        return None
+        # Single probe of the composite (user_id, place_id) index
+        return identity_map.lookup(
+            ('review', user_id, place_id),
+            partial(storage.get_by_attributes, user_id=user_id,
+                    place_id=place_id))
 
     def get_review(self, review_id):
-        return storage.get(review_id)
+        return identity_map.lookup(review_id,
+                                   partial(storage.get, review_id))
 
     def get_all_reviews(self):
         return storage.get_all(Review)
 
+    def get_reviews_page(self, limit=DEFAULT_PAGE_LIMIT, cursor=None):
+        """Get a page of reviews, oldest first."""
+        return self._page(partial(storage.get_page, cls=Review), limit,
+                          cursor)
+
+    def get_reviews_by_place(self, place_id, limit=DEFAULT_PAGE_LIMIT,
+                             cursor=None, sort='newest'):
+        """Get a page of the reviews of a place, newest or best rated
+        first.
+
+        Read from a composite sorted index of the storage, so a page costs
+        the same whatever the number of reviews of the place.
+        """
+        if sort not in REVIEW_SORTS:
+            raise ValidationError(
+                f"sort must be one of: {', '.join(REVIEW_SORTS)}")
+        attr_names, key_types = REVIEW_SORTS[sort]
+
+        def fetch(after, limit):
+            return storage.get_page_by(
+                ('place_id', *attr_names), (place_id,), after, limit,
+                descending=True, cls=Review)
+
+        def key(review):
+            return (*(getattr(review, attr_name)
+                      for attr_name in attr_names), review.id)
+
+        return self._page(fetch, limit, cursor, key, key_types)
+
     def update_review(self, review_id, review_data):
-        review = storage.get(review_id)
+        review = self.get_review(review_id)
         if not review:
             raise ValidationError("Review not found")
 
@@ -282,19 +403,63 @@ class HBnBFacade:
         if review.user_id != current_user_id:
             return {"error": "Unauthorized access"}, 403
 
+        changes = {}
         if 'text' in review_data:
-            review.text = review_data['text']
+            changes['text'] = review_data['text']
         if 'rating' in review_data:
-            review.rating = review_data['rating']
-
+            try:
+                changes['rating'] = self.validate_rating(
+                    review_data['rating'])
+            except ValueError as e:
+                raise ValidationError(str(e))
+
+        # Through the repository so the change reaches the journal
+        self._update_review(review, changes)
         storage.save()
         return review
 
+    def _update_review(self, review, changes):
+        """Update a review, then the rating aggregates of its place.
+
+        The previous rating is read under the storage lock with the write,
+        so concurrent updates of a review each count once.
+        """
+        previous = {}
+
+        def apply(stored):
+            previous['rating'] = stored.rating
+            return changes
+
+        if storage.update_with(review.id, apply) is None:
+            return
+        if changes.get('rating', previous['rating']) != previous['rating']:
+            self._rate_place(review.place_id, added=changes['rating'],
+                             removed=previous['rating'])
+
+    def _rate_place(self, place_id, added=None, removed=None):
+        """Apply a review rating change to the aggregates of a place."""
+        storage.update_with(place_id, partial(
+            rating_changes, added=added, removed=removed))
+
+    def rebuild_place_ratings(self):
+        """Recompute the rating aggregates of every place from its
+        reviews, for places stored before they were kept or to repair
+        them. Returns the number of places."""
+        ratings = {}
+        for review in storage.iter_all(Review):
+            ratings.setdefault(review.place_id, []).append(review.rating)
+        updates = {
+            place.id: rating_aggregates(ratings.get(place.id, ()))
+            for place in storage.iter_all(Place)
+        }
+        storage.update_many(updates)
+        storage.save()
+        return len(updates)
+
     def delete_review(self, review_id):
-        print(f"Attempting to delete review with ID: {review_id}")
-        review = storage.get(review_id)
+        review = self.get_review(review_id)
         if not review:
-            print(f"Error: Review with ID {review_id} not found.")
+            logger.debug("Review %s not found", review_id)
             return {
                 "message": (
                     "Review not found. It might have already been deleted."
@@ -305,9 +470,12 @@ class HBnBFacade:
         if review.user_id != current_user_id:
             return {"error": "Unauthorized access"}, 403
 
-        storage.delete(review)
+        # Only the request that actually deleted it updates the aggregates
+        if storage.delete_many([review.id]):
+            self._rate_place(review.place_id, removed=review.rating)
+        identity_map.forget(review)
         storage.save()
-        print(f"Review with ID {review_id} successfully deleted.")
+        logger.info("Review %s deleted", review_id)
         return {"message": "Review deleted successfully"}, 200
 
     # ---------------------------- Amenity Management -------------------------
@@ -323,11 +491,24 @@ class HBnBFacade:
         storage.save()
         return new_amenity
 
+    def create_amenities(self, amenities_data):
+        """Create several amenities with one storage write."""
+        if not all(amenity_data.get('name')
+                   for amenity_data in amenities_data):
+            raise ValidationError("Name is required")
+
+        amenities = [Amenity(name=amenity_data['name'])
+                     for amenity_data in amenities_data]
+        storage.add_many(amenities)
+        storage.save()
+        return amenities
+
     def get_amenity(self, amenity_id):
         """
         Retrieves an amenity by ID from the repository.
         """
-        amenity = self.amenity_repo.get(amenity_id)
+        amenity = identity_map.lookup(
+            amenity_id, partial(self.amenity_repo.get, amenity_id))
         if not amenity:
             return None, "Amenity not found"
         return amenity
@@ -335,8 +516,17 @@ class HBnBFacade:
     def get_all_amenities(self):
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, limit=DEFAULT_PAGE_LIMIT, cursor=None,
+                           fields=None):
+        """Get a page of amenities, oldest first, with only the given
+        columns loaded if any."""
+        return self._page(
+            partial(self.amenity_repo.get_page, columns=fields), limit,
+            cursor)
+
     def update_amenity(self, amenity_id, amenity_data):
-        amenity = self.amenity_repo.get(amenity_id)
+        amenity = identity_map.lookup(
+            amenity_id, partial(self.amenity_repo.get, amenity_id))
         if not amenity:
             return None, "Amenity not found"
 
@@ -347,18 +537,19 @@ class HBnBFacade:
         return amenity, None
 
     def delete_amenity(self, amenity_id):
-        amenity = self.amenity_repo.get(amenity_id)
+        amenity = identity_map.lookup(
+            amenity_id, partial(self.amenity_repo.get, amenity_id))
         if not amenity:
             return False, "Amenity not found"
         self.amenity_repo.delete(amenity_id)
+        identity_map.forget(amenity)
         return True
 
     # ---------------------------- Place Management ---------------------------
 
     def create_place(self, place_data):
         """Create a new place."""
-        print("\n=== Creating Place ===")
-        print(f"Place data: {place_data}")
+        logger.debug("Creating place with data: %s", place_data)
 
         self.validate_place_data(place_data)
 
@@ -374,9 +565,33 @@ class HBnBFacade:
         # Add the place to storage
         storage.add(new_place)
         storage.save()
-        print(f"Place created with ID: {new_place.id}")
+        logger.info("Place created with ID: %s", new_place.id)
         return new_place
 
+    def create_places(self, places_data):
+        """Create several places with one storage write.
+
+        Every place is validated before any is stored.
+        """
+        for place_data in places_data:
+            self.validate_place_data(place_data)
+
+        new_places = [
+            Place(
+                title=place_data['title'],
+                description=place_data.get('description', ''),
+                price=place_data['price'],
+                latitude=place_data['latitude'],
+                longitude=place_data['longitude'],
+                owner_id=place_data['owner_id']
+            )
+            for place_data in places_data
+        ]
+        storage.add_many(new_places)
+        storage.save()
+        logger.info("%d places created", len(new_places))
+        return new_places
+
     def validate_place_data(self, place_data):
         """
         Internal function to validate place data.
@@ -403,19 +618,172 @@ class HBnBFacade:
 
     def get_place(self, place_id):
         """Get a place by ID."""
-        print(f"\n=== Getting Place {place_id} ===")
         # Use storage instead of place_repo
-        place = storage.get(place_id)
-        print(f"Place found: {place is not None}")
+        place = identity_map.lookup(place_id, partial(storage.get, place_id))
         if place:
-            print(f"Place details: {place.to_dict()}")
+            # Only serialized when DEBUG is enabled for this module
+            logger.debug("Place details: %s", Lazy(place.to_dict))
         return place
 
     def get_all_places(self):
         return self.place_repo.get_all()
 
+    def get_places_page(self, limit=DEFAULT_PAGE_LIMIT, cursor=None,
+                        min_price=None, max_price=None, bbox=None,
+                        sort=None):
+        """Get a page of places, oldest first, optionally filtered.
+
+        ``sort`` orders them by one of PLACE_SORTS instead, best first.
+        Without filters the page is read from the created_at index of the
+        storage, or the sorted index of the order. Filtered places come
+        from the price or grid index and only the page is selected among
+        them.
+        """
+        if sort is not None and sort not in PLACE_SORTS:
+            raise ValidationError(
+                f"sort must be one of: {', '.join(PLACE_SORTS)}")
+        filtered = not (bbox is None and min_price is None
+                        and max_price is None)
+        if sort is not None:
+            attr_names, key_types = PLACE_SORTS[sort]
+
+            def key(place):
+                return (*(getattr(place, attr_name)
+                          for attr_name in attr_names), place.id)
+
+            def fetch(after, limit):
+                if filtered:
+                    return paginate(self._filter_places(
+                        min_price, max_price, bbox), after, limit, key,
+                        descending=True)
+                return storage.get_page_by(attr_names, (), after, limit,
+                                           descending=True, cls=Place)
+
+            return self._page(fetch, limit, cursor, key, key_types)
+
+        if not filtered:
+            return self._page(partial(storage.get_page, cls=Place), limit,
+                              cursor)
+        return self._page(
+            partial(paginate, self._filter_places(min_price, max_price,
+                                                  bbox)), limit, cursor)
+
+    def _filter_places(self, min_price, max_price, bbox):
+        """Return the places within a price range and a bounding box,
+        either of which may be None."""
+        if bbox is not None:
+            return [
+                place for place in self.get_places_in_bbox(*bbox)
+                if (min_price is None or place.price >= min_price)
+                and (max_price is None or place.price <= max_price)
+            ]
+        return self.get_places_by_price(min_price, max_price)
+
+    def get_places_by_price(self, min_price=None, max_price=None):
+        """Get the places priced within [min_price, max_price].
+
+        Either bound may be None. Served by the sorted price index of the
+        storage, ordered by price.
+        """
+        if (min_price is not None and max_price is not None
+                and min_price > max_price):
+            raise ValidationError('min_price must not exceed max_price')
+        return storage.get_all_by_range('price', min_price, max_price,
+                                        cls=Place)
+
+    def get_places_in_bbox(self, min_lon, min_lat, max_lon, max_lat):
+        """Get the places inside a bounding box, using the grid index.
+
+        ``min_lon > max_lon`` describes a box crossing the antimeridian.
+        """
+        if not (-90 <= min_lat <= max_lat <= 90):
+            raise ValidationError(
+                'bbox latitudes must satisfy -90 <= min_lat <= max_lat <= 90')
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise ValidationError(
+                'bbox longitudes must be between -180 and 180')
+        return storage.get_all_in_bbox(min_lat, min_lon, max_lat, max_lon,
+                                       cls=Place)
+
+    def search_places(self, query, limit=20, offset=0):
+        """Search places by keywords in their title and description.
+
+        Returns the number of matches and a page of ``(score, place)``
+        pairs ranked by BM25 on the storage's inverted index.
+        """
+        if not query or not query.strip():
+            raise ValidationError('q must not be empty')
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValidationError(
+                f'limit must be between 1 and {MAX_SEARCH_LIMIT}')
+        if offset < 0:
+            raise ValidationError('offset must not be negative')
+        return storage.search('places', query, limit, offset, cls=Place)
+
+    def search_reviews(self, query, place_id=None, limit=20, offset=0):
+        """Search reviews by keywords, optionally within one place.
+
+        The review index is partitioned by place, so a place-scoped
+        search only reads the postings of that place's reviews.
+        """
+        if not query or not query.strip():
+            raise ValidationError('q must not be empty')
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValidationError(
+                f'limit must be between 1 and {MAX_SEARCH_LIMIT}')
+        if offset < 0:
+            raise ValidationError('offset must not be negative')
+        if place_id is None:
+            return storage.search('reviews', query, limit, offset,
+                                  cls=Review)
+        if not self.get_place(place_id):
+            raise ValidationError(f"Place with ID {place_id} not found")
+        return storage.search('reviews', query, limit, offset, cls=Review,
+                              scope=place_id)
+
+    def get_top_places(self, by='rating', limit=10, bayesian=True):
+        """Get the best rated or most reviewed places.
+
+        By rating, places are ranked by their Bayesian average rating
+        unless ``bayesian`` is false. Only reviewed places are ranked. The
+        rating aggregates are kept up to date by every review write, so
+        the leaderboard is the head of a sorted index of the storage.
+        """
+        if by not in ('rating', 'reviews'):
+            raise ValidationError('by must be one of: rating, reviews')
+        if not 1 <= limit <= MAX_TOP_LIMIT:
+            raise ValidationError(
+                f'limit must be between 1 and {MAX_TOP_LIMIT}')
+        if by == 'reviews':
+            attr_name = 'review_count'
+        else:
+            attr_name = 'bayesian_rating' if bayesian else 'average_rating'
+        places = storage.get_page_by((attr_name, 'created_at'), (),
+                                     limit=limit, descending=True, cls=Place)
+        # Places without reviews sort last, or are not indexed at all
+        return list(takewhile(lambda place: place.review_count, places))
+
+    def get_nearby_places(self, latitude, longitude, limit=10,
+                          radius_km=None):
+        """Get the places closest to a point, nearest first.
+
+        Returns ``(distance_km, place)`` pairs from a k-nearest-neighbour
+        search on the grid index of the storage.
+        """
+        if not -90 <= latitude <= 90:
+            raise ValidationError('lat must be between -90 and 90')
+        if not -180 <= longitude <= 180:
+            raise ValidationError('lon must be between -180 and 180')
+        if radius_km is not None and radius_km <= 0:
+            raise ValidationError('radius_km must be positive')
+        if not 1 <= limit <= MAX_NEARBY_LIMIT:
+            raise ValidationError(
+                f'limit must be between 1 and {MAX_NEARBY_LIMIT}')
+        return storage.get_nearest(latitude, longitude, limit, radius_km,
+                                   cls=Place)
+
     def update_place(self, place_id, place_data):
-        place = self.place_repo.get(place_id)
+        place = identity_map.lookup(place_id, partial(storage.get, place_id))
         if not place:
             return {"error": "Place not found"}, 404
 
@@ -423,14 +791,17 @@ class HBnBFacade:
         if place.owner_id != current_user_id:
             return {"error": "Unauthorized access"}, 403
 
-        for key, value in place_data.items():
-            setattr(place, key, value)
-
+        changes = {key: value for key, value in place_data.items()
+                   if key in PLACE_UPDATE_FIELDS}
+        changes['updated_at'] = datetime.utcnow()
+        # Through the repository so the change reaches the indexes and
+        # the journal
+        storage.update(place_id, changes)
         storage.save()
-        return place
+        return storage.get(place_id)
 
     def delete_place(self, place_id):
-        place = storage.get(place_id)
+        place = identity_map.lookup(place_id, partial(storage.get, place_id))
         if not place:
             return {"error": "Place not found"}, 404
 
@@ -439,5 +810,6 @@ class HBnBFacade:
             return {"error": "Unauthorized access"}, 403
 
         storage.delete(place)
+        identity_map.forget(place)
         storage.save()
         return {"message": "Place deleted successfully"}, 200
@@ -1,8 +1,9 @@
 import pytest
+from functools import partial
 from flask import Flask
 from flask_restx import Api
 from app.models import storage
-from app.models.place import Place
+from app.models.place import Place, rating_changes
 from app.api.v1.places import api as places_api  # L'API des places
 
 
@@ -42,6 +43,217 @@ def test_get_places(client, setup_data):
     assert 'Maison' in response.get_data(as_text=True)
 
 
+def test_get_places_pages(client, setup_data):
+    """
+    Test de la pagination par curseur de la liste des lieux.
+    """
+    for i in range(4):
+        storage.add(Place(title=f"Lieu {i}", price=100, owner_id="Xa",
+                          latitude=45.0, longitude=6.0))
+
+    titles = []
+    cursor = None
+    while True:
+        url = '/api/v1/places/?limit=2'
+        if cursor:
+            url += f'&cursor={cursor}'
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page['results']) <= 2
+        titles += [p['title'] for p in page['results']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    # Ordre de création, sans doublon ni oubli
+    assert titles == ['Maison', 'Lieu 0', 'Lieu 1', 'Lieu 2', 'Lieu 3']
+
+    response = client.get('/api/v1/places/?max_price=500&limit=1')
+    page = response.get_json()
+    assert [p['title'] for p in page['results']] == ['Lieu 0']
+    response = client.get(
+        f"/api/v1/places/?max_price=500&limit=1&cursor={page['next_cursor']}")
+    assert [p['title'] for p in response.get_json()['results']] == ['Lieu 1']
+
+    assert client.get('/api/v1/places/?cursor=abc').status_code == 400
+    assert client.get('/api/v1/places/?limit=0').status_code == 400
+
+
+def test_get_places_by_price_range(client, setup_data):
+    """
+    Test du filtre min_price/max_price sur la liste des lieux.
+    """
+    cabane = Place(title="Cabane", price=50, owner_id="Xa",
+                   latitude=45.0, longitude=6.0)
+    storage.add(cabane)
+
+    response = client.get('/api/v1/places/?min_price=10&max_price=100')
+    assert response.status_code == 200
+    assert [p['title'] for p in response.get_json()['results']] == ['Cabane']
+
+    response = client.get('/api/v1/places/?min_price=100')
+    assert [p['title'] for p in response.get_json()['results']] == ['Maison']
+
+    response = client.get('/api/v1/places/?max_price=abc')
+    assert response.status_code == 400
+
+
+def test_get_places_sorted_by_rating(client, setup_data):
+    """
+    Test du tri de la liste des lieux par note moyenne et par nombre d'avis,
+    lus dans les agrégats des lieux.
+    """
+    notes = {"Lieu A": [5, 4], "Lieu B": [2, 3, 3], "Lieu C": [5]}
+    for title, ratings in notes.items():
+        place = Place(title=title, price=100, owner_id="Xa",
+                      latitude=45.0, longitude=6.0)
+        storage.add(place)
+        for rating in ratings:
+            storage.update_with(place.id, partial(rating_changes,
+                                                  added=rating))
+
+    response = client.get('/api/v1/places/?sort=rating&limit=2')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['title'] for p in data['results']] == ["Lieu C", "Lieu A"]
+    assert data['results'][1]['average_rating'] == 4.5
+    assert data['results'][1]['rating_histogram']['4'] == 1
+    response = client.get(
+        f"/api/v1/places/?sort=rating&limit=2&cursor={data['next_cursor']}")
+    assert [p['title'] for p in response.get_json()['results']] == [
+        "Lieu B", "Maison"]
+
+    response = client.get('/api/v1/places/?sort=reviews&max_price=500')
+    assert [p['review_count'] for p in response.get_json()['results']] == [
+        3, 2, 1]
+
+    response = client.get('/api/v1/places/?sort=price')
+    assert response.status_code == 400
+
+
+def test_get_places_sparse_fields(client, setup_data):
+    """
+    Test des champs demandés (fields) et des relations incluses (expand).
+    """
+    response = client.get('/api/v1/places/?fields=id,title,price')
+    assert response.status_code == 200
+    place = response.get_json()['results'][0]
+    assert place == {'id': setup_data.id, 'title': "Maison", 'price': 1000}
+
+    response = client.get('/api/v1/places/?expand=amenities')
+    place = response.get_json()['results'][0]
+    assert 'amenities' in place and 'reviews' not in place
+    assert place['average_rating'] == 0.0
+
+    response = client.get(f'/api/v1/places/{setup_data.id}?fields=title')
+    assert response.get_json() == {'title': "Maison"}
+
+    response = client.get('/api/v1/places/?fields=id,password')
+    assert response.status_code == 400
+    assert 'password' in response.get_json()['error']
+
+
+def test_get_top_places(client, setup_data):
+    """
+    Test des classements : la moyenne bayésienne ne laisse pas un lieu
+    noté une seule fois à 5 étoiles passer devant un lieu très bien noté
+    par beaucoup d'avis.
+    """
+    notes = {"Un avis": [5], "Beaucoup d'avis": [5] * 9 + [4] * 11,
+             "Moyen": [3, 3, 2]}
+    for title, ratings in notes.items():
+        place = Place(title=title, price=100, owner_id="Xa",
+                      latitude=45.0, longitude=6.0)
+        storage.add(place)
+        for rating in ratings:
+            storage.update_with(place.id, partial(rating_changes,
+                                                  added=rating))
+
+    response = client.get('/api/v1/places/top')
+    assert response.status_code == 200
+    # "Maison", sans avis, n'est pas classée
+    assert [p['title'] for p in response.get_json()] == [
+        "Beaucoup d'avis", "Un avis", "Moyen"]
+
+    response = client.get('/api/v1/places/top?bayesian=false&limit=2')
+    assert [p['title'] for p in response.get_json()] == [
+        "Un avis", "Beaucoup d'avis"]
+
+    response = client.get('/api/v1/places/top?by=reviews')
+    assert [p['review_count'] for p in response.get_json()] == [20, 3, 1]
+
+    response = client.get('/api/v1/places/top?by=price')
+    assert response.status_code == 400
+
+
+def test_get_places_in_bbox(client, setup_data):
+    """
+    Test du filtre bbox (min_lon,min_lat,max_lon,max_lat).
+    """
+    tokyo = Place(title="Tokyo", price=80, owner_id="Xa",
+                  latitude=35.68, longitude=139.69)
+    storage.add(tokyo)
+
+    response = client.get('/api/v1/places/?bbox=-80,35,-70,45')
+    assert response.status_code == 200
+    assert [p['title'] for p in response.get_json()['results']] == ['Maison']
+
+    response = client.get('/api/v1/places/?bbox=130,30,-170,40')
+    assert [p['title'] for p in response.get_json()['results']] == ['Tokyo']
+
+    response = client.get('/api/v1/places/?bbox=1,2,3')
+    assert response.status_code == 400
+
+
+def test_get_nearby_places(client, setup_data):
+    """
+    Test de la recherche des lieux les plus proches d'un point.
+    """
+    boston = Place(title="Boston", price=80, owner_id="Xa",
+                   latitude=42.36, longitude=-71.06)
+    storage.add(boston)
+
+    response = client.get(
+        '/api/v1/places/nearby?lat=42.0&lon=-71.5&limit=2')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['title'] for p in data] == ['Boston', 'Maison']
+    assert data[0]['distance_km'] < data[1]['distance_km']
+
+    response = client.get(
+        '/api/v1/places/nearby?lat=42.0&lon=-71.5&radius_km=100')
+    assert [p['title'] for p in response.get_json()] == ['Boston']
+
+    response = client.get('/api/v1/places/nearby?lat=42.0')
+    assert response.status_code == 400
+
+
+def test_search_places(client, setup_data):
+    """
+    Test de la recherche plein texte classée par pertinence (BM25).
+    """
+    for title, description in (("Chalet à la montagne", "Vue sur lac"),
+                               ("Studio", "Proche du lac et de la gare"),
+                               ("Loft", "Centre-ville")):
+        storage.add(Place(title=title, price=90, owner_id="Xa",
+                          description=description))
+
+    response = client.get('/api/v1/places/search?q=lac+chalet')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total'] == 2
+    assert [p['title'] for p in data['results']] == [
+        'Chalet à la montagne', 'Studio']
+
+    response = client.get('/api/v1/places/search?q=LAC&limit=1&offset=1')
+    data = response.get_json()
+    assert data['total'] == 2
+    assert len(data['results']) == 1
+
+    response = client.get('/api/v1/places/search?q=')
+    assert response.status_code == 400
+
+
 def test_post_place(client):
     """
     Test pour vérifier la création d'un lieu.
@@ -0,0 +1,1054 @@
+"""
+Unit tests for the InMemoryRepository.
+
+These tests check the per-class partitions and that the declared
+secondary indexes stay in sync with the store through add, update, delete
+and clear_all.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from app import create_app, db
+from app.models import storage
+from app.persistence import identity_map
+from app.persistence.locks import ReadWriteLock
+from app.persistence.migrations import (
+    add_missing_columns, create_missing_indexes)
+from app.persistence.pagination import page_key
+from app.persistence.amenity_repository import AmenityRepository
+from app.persistence.place_repository import PlaceRepository
+from app.persistence.repository import (
+    InMemoryRepository, UniqueConstraintError)
+from app.persistence.review_repository import ReviewRepository
+from app.persistence.user_repository import UserRepository
+from app.persistence.text import InvertedIndex, tokenize
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.serializers import serializer
+from app.models.user import User
+from app.services.facade import HBnBFacade, ValidationError
+
+MODELS = (User, Place, Review, Amenity)
+
+
+@contextmanager
+def count_queries():
+    """Collect the (statement, parameters) run by the engine inside the
+    block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+class TestInMemoryRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = InMemoryRepository(indexes=('owner_id', 'place_id'))
+        self.place = Place(title="Maison", price=100, owner_id="owner-1",
+                           latitude=48.85, longitude=2.35)
+        self.repo.add(self.place)
+
+    def test_get_by_indexed_attribute(self):
+        found = self.repo.get_by_attribute('owner_id', 'owner-1')
+        self.assertIs(found, self.place)
+        self.assertIsNone(self.repo.get_by_attribute('owner_id', 'owner-2'))
+
+    def test_update_moves_index_entry(self):
+        self.repo.update(self.place.id, {'owner_id': 'owner-2'})
+        self.assertIsNone(self.repo.get_by_attribute('owner_id', 'owner-1'))
+        self.assertIs(
+            self.repo.get_by_attribute('owner_id', 'owner-2'), self.place)
+
+    def test_delete_and_clear_remove_index_entries(self):
+        review = Review(text="Nice", rating=4, place_id=self.place.id,
+                        user_id="user-1")
+        self.repo.add(review)
+        self.assertEqual(
+            self.repo.get_all_by_attribute('place_id', self.place.id),
+            [review])
+
+        self.repo.delete(review)
+        self.assertEqual(
+            self.repo.get_all_by_attribute('place_id', self.place.id), [])
+
+        self.repo.clear_all(Place)
+        self.assertIsNone(self.repo.get_by_attribute('owner_id', 'owner-1'))
+
+    def test_unindexed_attribute_falls_back_to_scan(self):
+        self.assertIs(
+            self.repo.get_by_attribute('title', 'Maison'), self.place)
+
+    def test_class_partitions(self):
+        review = Review(text="Nice", rating=4, place_id=self.place.id,
+                        user_id="user-1")
+        self.repo.add(review)
+        self.assertEqual(self.repo.get_all(Review), [review])
+        self.assertEqual(self.repo.count(Place), 1)
+        self.assertEqual(self.repo.count(), 2)
+
+        self.repo.clear_all(Review)
+        self.assertEqual(self.repo.count(Review), 0)
+        self.assertEqual(self.repo.get_all(Place), [self.place])
+
+    def test_sorted_index_range_queries(self):
+        repo = InMemoryRepository(sorted_indexes=('price',))
+        places = [Place(title=f"Place {price}", price=price,
+                        owner_id="owner-1") for price in (80, 20, 50, 50)]
+        for place in places:
+            repo.add(place)
+
+        self.assertEqual(
+            [p.price for p in repo.get_all_by_range('price', 20, 50)],
+            [20, 50, 50])
+        self.assertEqual(
+            [p.price for p in repo.get_all_by_range('price', low=60)], [80])
+
+        repo.update(places[0].id, {'price': 10})
+        repo.delete(places[2])
+        self.assertEqual(
+            [p.price for p in repo.get_all_by_range('price')], [10, 20, 50])
+        self.assertEqual(
+            repo.get_all_by_range('price', cls=Review), [])
+        # Without a sorted index the same query scans
+        self.assertEqual(
+            [p.price for p in self.repo.get_all_by_range('price', 50, 150)],
+            [100])
+
+    def test_spatial_index_bbox_queries(self):
+        repo = InMemoryRepository(spatial=('latitude', 'longitude'))
+        paris = Place(title="Paris", price=100, owner_id="owner-1",
+                      latitude=48.85, longitude=2.35)
+        fiji = Place(title="Fiji", price=100, owner_id="owner-1",
+                     latitude=-17.7, longitude=178.0)
+        for place in (paris, fiji):
+            repo.add(place)
+
+        self.assertEqual(repo.get_all_in_bbox(40, -5, 50, 10), [paris])
+        # Across the antimeridian
+        self.assertEqual(repo.get_all_in_bbox(-20, 170, -10, -170), [fiji])
+        # Whole world, walking the occupied cells
+        self.assertEqual(len(repo.get_all_in_bbox(-90, -180, 90, 180)), 2)
+
+        repo.update(paris.id, {'latitude': 0.0, 'longitude': 0.0})
+        self.assertEqual(repo.get_all_in_bbox(40, -5, 50, 10), [])
+        repo.delete(fiji)
+        self.assertEqual(repo.get_all_in_bbox(-20, 170, -10, -170), [])
+        # Without a spatial index the same query scans
+        self.assertEqual(
+            self.repo.get_all_in_bbox(40, -5, 50, 10), [self.place])
+
+    def test_nearest_neighbours(self):
+        indexed = InMemoryRepository(spatial=('latitude', 'longitude'))
+        indexed.add(self.place)
+        coordinates = [(48.84, 2.35), (48.87, 2.34), (45.76, 4.84),
+                       (51.51, -0.13), (-33.87, 151.21), (64.15, -21.94)]
+        for i, (latitude, longitude) in enumerate(coordinates):
+            place = Place(title=f"Place {i}", price=10, owner_id="owner-1",
+                          latitude=latitude, longitude=longitude)
+            indexed.add(place)
+            self.repo.add(place)
+
+        for repo in (indexed, self.repo):
+            nearest = repo.get_nearest(48.85, 2.35, 3)
+            self.assertEqual([place.title for _, place in nearest],
+                             ["Maison", "Place 0", "Place 1"])
+            self.assertEqual(
+                [round(distance) for distance, _ in nearest], [0, 1, 2])
+            within = repo.get_nearest(48.85, 2.35, 10, radius_km=400)
+            self.assertEqual(len(within), 5)
+            # Far from everything, the search grows to the whole world
+            self.assertEqual(len(repo.get_nearest(-80.0, -100.0, 10)), 7)
+            self.assertEqual(
+                repo.get_nearest(48.85, 2.35, 3, cls=Review), [])
+
+    def test_text_index_search(self):
+        repo = InMemoryRepository(text_indexes={
+            'places': InvertedIndex(('title', 'description'))})
+        cafe = Place(title="Café du port", price=10, owner_id="owner-1",
+                     description="Terrasse sur le port")
+        loft = Place(title="Loft", price=10, owner_id="owner-1",
+                     description="Près du port")
+        for place in (cafe, loft):
+            repo.add(place)
+        repo.add(Review(text="port", rating=4, place_id=cafe.id,
+                        user_id="user-1"))
+
+        self.assertEqual(tokenize("Café, PORT!"), ["cafe", "port"])
+        total, page = repo.search('places', "port")
+        self.assertEqual(total, 2)
+        self.assertEqual([place for _, place in page], [cafe, loft])
+        self.assertEqual(repo.search('places', "cafe")[1][0][1], cafe)
+
+        repo.update(loft.id, {'description': "Centre-ville"})
+        self.assertEqual(repo.search('places', "port")[0], 1)
+        repo.delete(cafe)
+        self.assertEqual(repo.search('places', "port"), (0, []))
+
+    def test_scoped_text_index(self):
+        index = InvertedIndex(('text',), scope='place_id')
+        repo = InMemoryRepository(text_indexes={'reviews': index})
+        reviews = [Review(text=text, rating=4, place_id=place_id,
+                          user_id="user-1")
+                   for text, place_id in (("great view", "p1"),
+                                          ("great food", "p2"),
+                                          ("view of the sea", "p2"))]
+        for review in reviews:
+            repo.add(review)
+
+        self.assertEqual(repo.search('reviews', "great view")[0], 3)
+        total, page = repo.search('reviews', "great view", scope="p2")
+        self.assertEqual(total, 2)
+        self.assertEqual({review for _, review in page}, set(reviews[1:]))
+        self.assertEqual(repo.search('reviews', "view", scope="p3"),
+                         (0, []))
+
+        # Moving a review to another place moves its postings
+        repo.update(reviews[0].id, {'place_id': "p2"})
+        self.assertEqual(repo.search('reviews', "view", scope="p1"),
+                         (0, []))
+        self.assertEqual(repo.search('reviews', "view", scope="p2")[0], 2)
+
+    def test_composite_unique_index(self):
+        repo = InMemoryRepository(unique=(('user_id', 'place_id'),))
+        review = Review(text="Nice", rating=4, place_id="p1",
+                        user_id="user-1")
+        repo.add(review)
+        self.assertIs(
+            repo.get_by_attributes(user_id="user-1", place_id="p1"), review)
+        self.assertIsNone(
+            repo.get_by_attributes(user_id="user-2", place_id="p1"))
+
+        duplicate = Review(text="Again", rating=2, place_id="p1",
+                           user_id="user-1")
+        with self.assertRaises(UniqueConstraintError):
+            repo.add(duplicate)
+        self.assertEqual(repo.count(Review), 1)
+
+        # Re-adding or updating the same review keeps its own key
+        repo.update(review.id, {'rating': 5})
+        self.assertEqual(review.rating, 5)
+
+    def test_bulk_add_update_delete(self):
+        repo = InMemoryRepository(indexes=('owner_id',),
+                                  sorted_indexes=('price',),
+                                  unique=(('user_id', 'place_id'),))
+        places = [Place(title=f"Place {price}", price=price,
+                        owner_id="owner-1") for price in (80, 20, 50)]
+        repo.add(Place(title="Place 30", price=30, owner_id="owner-2"))
+        repo.add_many(places)
+        self.assertEqual(
+            [p.price for p in repo.get_all_by_range('price')],
+            [20, 30, 50, 80])
+        self.assertEqual(
+            len(repo.get_all_by_attribute('owner_id', 'owner-1')), 3)
+
+        repo.update_many({places[0].id: {'price': 10},
+                          places[1].id: {'owner_id': 'owner-2'},
+                          "missing": {'price': 1}})
+        self.assertEqual(
+            [p.price for p in repo.get_all_by_range('price')],
+            [10, 20, 30, 50])
+        self.assertEqual(
+            len(repo.get_all_by_attribute('owner_id', 'owner-2')), 2)
+
+        self.assertEqual(
+            repo.delete_many([places[0], places[2].id, "missing"]), 2)
+        self.assertEqual(
+            [p.price for p in repo.get_all_by_range('price')], [20, 30])
+
+        # A duplicate inside the batch rejects the whole batch
+        reviews = [Review(text="Nice", rating=4, place_id="p1",
+                          user_id="user-1") for _ in range(2)]
+        with self.assertRaises(UniqueConstraintError):
+            repo.add_many(reviews)
+        self.assertEqual(repo.count(Review), 0)
+
+    def test_iter_all_streams_in_batches(self):
+        for repo in (InMemoryRepository(),
+                     InMemoryRepository(sorted_indexes=('created_at',))):
+            places = [Place(title=f"Place {i}", price=10, owner_id="o")
+                      for i in range(7)]
+            repo.add_many(places)
+            repo.add(Amenity(name="Wifi"))
+
+            stream = repo.iter_all(Place, batch_size=3)
+            first = next(stream)
+            # Writes are not blocked between two batches
+            repo.delete(places[6])
+            seen = [first, *stream]
+            self.assertEqual({p.id for p in seen},
+                             {p.id for p in places[:6]})
+            self.assertEqual(len(list(repo.iter_all(batch_size=2))), 7)
+
+    def test_sorted_indexes_are_kept_per_class(self):
+        repo = InMemoryRepository(sorted_indexes=('created_at',))
+        objs = [Place(title=f"Place {i}", price=10, owner_id="o")
+                if i % 3 == 0 else Amenity(name=f"Amenity {i}")
+                for i in range(12)]
+        for i, obj in enumerate(objs):
+            obj.created_at = datetime(2024, 1, 1 + i)
+        repo.add_many(objs)
+
+        # A page of a class only walks the sorted list of that class
+        places = repo._sorted['created_at'][Place]
+        self.assertEqual([obj_id for _, obj_id in places],
+                         [obj.id for obj in objs[::3]])
+        page = repo.get_page(page_key(objs[3]), limit=2, cls=Place)
+        self.assertEqual(page, [objs[6], objs[9]])
+        # Reads over every class merge the lists in key order
+        self.assertEqual(repo.get_page(page_key(objs[4]), limit=3),
+                         objs[5:8])
+        self.assertEqual(repo.get_all_by_range(
+            'created_at', datetime(2024, 1, 3), datetime(2024, 1, 6)),
+            objs[2:6])
+
+    def test_concurrent_readers_and_writers(self):
+        repo = InMemoryRepository(indexes=('owner_id',),
+                                  lock=ReadWriteLock())
+        errors = []
+        done = threading.Event()
+
+        def writer(worker):
+            for i in range(300):
+                place = Place(title="Maison", price=100,
+                              owner_id=f"owner-{worker}")
+                repo.add(place)
+                repo.update(place.id, {'owner_id': f"owner-{i % 3}"})
+                if i % 2:
+                    repo.delete(place.id)
+
+        def reader():
+            while not done.is_set():
+                try:
+                    places = repo.get_all(Place)
+                    self.assertEqual(len({p.id for p in places}),
+                                     len(places))
+                    for place in repo.get_all_by_attribute(
+                            'owner_id', 'owner-1'):
+                        self.assertEqual(place.owner_id, 'owner-1')
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        writers = [threading.Thread(target=writer, args=(w,))
+                   for w in range(4)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        # Each writer keeps every other place it created
+        self.assertEqual(repo.count(Place), 4 * 150)
+        self.assertEqual(
+            sum(len(repo.get_all_by_attribute('owner_id', f"owner-{i}"))
+                for i in range(3)),
+            4 * 150)
+
+
+class TestCompactRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = InMemoryRepository(indexes=('owner_id',))
+        self.repo.compact(Place)
+        self.place = Place(title="Maison", price=100, owner_id="owner-1",
+                           latitude=48.85, longitude=2.35)
+        self.repo.add(self.place)
+
+    def test_reads_return_records_with_model_api(self):
+        record = self.repo.get(self.place.id)
+        self.assertNotIsInstance(record, Place)
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(record.to_dict(), self.place.to_dict())
+        self.assertEqual(self.repo.get_all(Place), [record])
+        self.assertEqual(
+            self.repo.get_all_by_attribute('owner_id', 'owner-1'), [record])
+
+    def test_update_and_delete_records(self):
+        self.repo.update(self.place.id, {'price': 150})
+        self.assertEqual(self.repo.get(self.place.id).price, 150)
+        self.repo.delete(self.place.id)
+        self.assertEqual(self.repo.count(Place), 0)
+
+    def test_update_rejects_non_columns_unchanged(self):
+        repo = InMemoryRepository(sorted_indexes=('price', 'created_at'))
+        repo.compact(Place)
+        repo.add(self.place)
+        for update in (
+                lambda: repo.update(self.place.id,
+                                    {'price': 9999.0, 'amenities': []}),
+                lambda: repo.update_many(
+                    {self.place.id: {'price': 9999.0, 'amenities': []}})):
+            with self.assertRaises(ValueError):
+                update()
+            self.assertEqual(repo.get(self.place.id).price, 100)
+            self.assertEqual(
+                [p.id for p in repo.get_all_by_range('price', 50, 150)],
+                [self.place.id])
+            self.assertEqual([p.id for p in repo.get_page(cls=Place)],
+                             [self.place.id])
+
+    def test_compacting_converts_stored_objects(self):
+        repo = InMemoryRepository()
+        repo.add(self.place)
+        repo.compact(Place)
+        self.assertIsNot(repo.get(self.place.id), self.place)
+        self.assertEqual(repo.get(self.place.id).title, "Maison")
+
+
+class TestStoragePersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def open_repo(self):
+        repo = InMemoryRepository(indexes=('owner_id',))
+        repo.enable_persistence(self.directory, MODELS,
+                                snapshot_interval=None)
+        return repo
+
+    def test_journal_replay(self):
+        repo = self.open_repo()
+        kept = Place(title="Maison", price=100, owner_id="owner-1",
+                     latitude=48.85, longitude=2.35)
+        dropped = Place(title="Cabane", price=30, owner_id="owner-1",
+                        latitude=45.0, longitude=6.0)
+        repo.add(kept)
+        repo.add(dropped)
+        repo.update(kept.id, {'price': 120})
+        repo.delete(dropped)
+        repo.save()
+        repo.disable_persistence()
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        place = recovered.get(kept.id)
+        self.assertEqual(place.price, 120)
+        self.assertEqual(place.created_at, kept.created_at)
+        self.assertIsNone(recovered.get(dropped.id))
+        self.assertEqual(
+            recovered.get_all_by_attribute('owner_id', 'owner-1'), [place])
+
+    def test_snapshot_then_journal_tail(self):
+        repo = self.open_repo()
+        first = Amenity(name="Wifi")
+        repo.add(first)
+        repo.persistence.compact()
+        second = Amenity(name="Pool")
+        repo.add(second)
+        repo.disable_persistence()
+
+        logs = [name for name in os.listdir(self.directory)
+                if name.endswith('.log')]
+        self.assertEqual(len(logs), 1)
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        self.assertEqual(
+            sorted(a.name for a in recovered.get_all(Amenity)),
+            ["Pool", "Wifi"])
+
+    def test_compact_records_are_journaled(self):
+        repo = self.open_repo()
+        repo.compact(Place)
+        place = Place(title="Maison", price=100, owner_id="owner-1",
+                      latitude=48.85, longitude=2.35)
+        repo.add(place)
+        repo.disable_persistence()
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        self.assertEqual(recovered.get(place.id).to_dict(), place.to_dict())
+
+    def test_bulk_operations_are_journaled(self):
+        repo = self.open_repo()
+        amenities = [Amenity(name=name) for name in ("Wifi", "Pool", "Spa")]
+        repo.add_many(amenities)
+        repo.update_many({amenities[0].id: {'name': "Fibre"}})
+        repo.delete_many([amenities[2].id])
+        repo.disable_persistence()
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        self.assertEqual(
+            sorted(a.name for a in recovered.get_all(Amenity)),
+            ["Fibre", "Pool"])
+
+    def test_torn_tail_is_dropped(self):
+        repo = self.open_repo()
+        amenity = Amenity(name="Wifi")
+        repo.add(amenity)
+        repo.disable_persistence()
+
+        log, = [name for name in os.listdir(self.directory)
+                if name.endswith('.log')]
+        with open(os.path.join(self.directory, log), 'ab') as journal:
+            journal.write(b'\x00\x00\x01\x00partial')
+
+        recovered = self.open_repo()
+        self.addCleanup(recovered.disable_persistence)
+        self.assertEqual(recovered.get(amenity.id).name, "Wifi")
+        self.assertEqual(recovered.count(), 1)
+
+
+class TestSQLAlchemyRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.repo = ReviewRepository()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def test_unique_review_per_user_and_place(self):
+        review = Review(text="Nice", rating=4, place_id="p1",
+                        user_id="user-1")
+        self.repo.add(review)
+        self.assertEqual(
+            self.repo.get_by_user_and_place("user-1", "p1").id, review.id)
+
+        with self.assertRaises(IntegrityError):
+            self.repo.add(Review(text="Again", rating=2, place_id="p1",
+                                 user_id="user-1"))
+        self.assertEqual(len(self.repo.get_all()), 1)
+
+    def test_bulk_add_update_delete(self):
+        reviews = [Review(text="Nice", rating=4, place_id=f"p{i}",
+                          user_id="user-1") for i in range(3)]
+        self.repo.add_many(reviews)
+        self.assertEqual(len(self.repo.get_all()), 3)
+
+        self.repo.update_many({reviews[0].id: {'rating': 1},
+                               reviews[1].id: {'rating': 2}})
+        db.session.expire_all()
+        self.assertEqual(
+            sorted(r.rating for r in self.repo.get_all()), [1, 2, 4])
+
+        self.assertEqual(
+            self.repo.delete_many([reviews[0].id, reviews[1].id]), 2)
+        self.assertEqual(
+            [r.id for r in self.repo.get_all()], [reviews[2].id])
+
+        # One transaction: a duplicate rolls the whole batch back
+        with self.assertRaises(IntegrityError):
+            self.repo.add_many([
+                Review(text="New", rating=3, place_id="p9", user_id="u"),
+                Review(text="Again", rating=2, place_id="p2",
+                       user_id="user-1")])
+        self.assertEqual(len(self.repo.get_all()), 1)
+
+    def test_iter_all(self):
+        reviews = [Review(text="Nice", rating=4, place_id=f"p{i}",
+                          user_id="user-1") for i in range(5)]
+        self.repo.add_many(reviews)
+        self.assertEqual(
+            sorted(r.id for r in self.repo.iter_all(batch_size=2)),
+            sorted(r.id for r in reviews))
+
+    def test_keyset_pages(self):
+        # Equal creation times are ordered by id
+        created_at = datetime(2024, 1, 1)
+        reviews = [Review(text="Nice", rating=4, place_id=f"p{i}",
+                          user_id="user-1") for i in range(5)]
+        for review in reviews:
+            review.created_at = created_at
+        self.repo.add_many(reviews)
+        expected = sorted(review.id for review in reviews)
+
+        seen = []
+        after = None
+        while True:
+            page = self.repo.get_page(after, limit=2)
+            if not page:
+                break
+            seen += [review.id for review in page]
+            after = page_key(page[-1])
+        self.assertEqual(seen, expected)
+
+        memory = InMemoryRepository(sorted_indexes=('created_at',))
+        memory.add_many(reviews)
+        self.assertEqual(
+            [r.id for r in memory.get_page(page_key(reviews[0]), 10)],
+            [obj_id for obj_id in expected if obj_id > reviews[0].id])
+
+    def test_reviews_of_place_pages(self):
+        # SQL and the composite sorted indexes return the same pages,
+        # newest or best rated first, ties broken by id
+        reviews = [Review(text="Nice", rating=1 + i % 3,
+                          place_id="p1" if i < 7 else "p2",
+                          user_id=f"user-{i}") for i in range(10)]
+        for i, review in enumerate(reviews):
+            review.created_at = datetime(2024, 1, 1 + i // 2)
+        self.repo.add_many(reviews)
+        memory = InMemoryRepository(
+            sorted_indexes=(('place_id', 'created_at'),
+                            ('place_id', 'rating', 'created_at')))
+        memory.add_many(reviews)
+
+        for order_by in (('created_at',), ('rating', 'created_at')):
+            def key(review):
+                return (*(getattr(review, name) for name in order_by),
+                        review.id)
+            expected = sorted((r for r in reviews if r.place_id == "p1"),
+                              key=key, reverse=True)
+            sql_pages, memory_pages, after = [], [], None
+            while True:
+                page = self.repo.get_page_by_place("p1", after, 3, order_by)
+                memory_page = memory.get_page_by(
+                    ('place_id', *order_by), ("p1",), after, 3,
+                    descending=True)
+                if not page and not memory_page:
+                    break
+                sql_pages += page
+                memory_pages += memory_page
+                after = key((page or memory_page)[-1])
+            self.assertEqual([r.id for r in sql_pages],
+                             [r.id for r in expected])
+            self.assertEqual(memory_pages, sql_pages)
+
+        # Ascending pages of the in-memory index, and updates reindexed
+        memory.update(reviews[0].id, {'rating': 5})
+        best = memory.get_page_by(('place_id', 'rating', 'created_at'),
+                                  ("p1",), limit=1, descending=True)
+        self.assertEqual(best, [reviews[0]])
+        after = page_key(reviews[0])
+        oldest = memory.get_page_by(('place_id', 'created_at'), ("p1",),
+                                    after)
+        self.assertEqual(oldest, sorted(
+            (r for r in reviews[1:7] if page_key(r) > after), key=page_key))
+
+
+class TestQueryCounts(unittest.TestCase):
+    """N+1 detection: the number of queries needed to serialize a result
+    must not grow with its size."""
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.owner = User(first_name="Owner", last_name="Test",
+                          email="owner@example.com", password="secret")
+        db.session.add(self.owner)
+        db.session.commit()
+        self.owner_id = self.owner.id
+        self.repo = PlaceRepository()
+        self.places = 0
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def seed(self, count):
+        """Add places, each with its own amenity and a review."""
+        for _ in range(count):
+            place = Place(title=f"Place {self.places}", price=100,
+                          owner_id=self.owner_id)
+            place.user_id = self.owner_id
+            place.amenities.append(Amenity(name=f"Amenity {self.places}"))
+            db.session.add(place)
+            db.session.add(Review(text="Nice", rating=4, place_id=place.id,
+                                  user_id=self.owner_id))
+            self.places += 1
+        db.session.commit()
+        # Start each measure with an empty identity map
+        db.session.expunge_all()
+
+    def query_counts(self, call):
+        """Return the queries of ``call`` for 2 and then 10 places."""
+        counts = []
+        for size in (2, 10):
+            self.seed(size - self.places)
+            with count_queries() as statements:
+                call()
+            counts.append(len(statements))
+        return counts
+
+    def assertConstantQueries(self, call):
+        small, large = self.query_counts(call)
+        self.assertEqual(small, large,
+                         f"N+1 queries: {small} for 2 rows, {large} for 10")
+
+    def test_detector_catches_lazy_loads(self):
+        small, large = self.query_counts(
+            lambda: [p.to_dict() for p in self.repo.get_all()])
+        self.assertGreater(large, small)
+
+    def test_list_endpoints(self):
+        # The amenities list is read from SQL and grows with the seed
+        client = self.app.test_client()
+        sizes = []
+
+        def get_amenities():
+            response = client.get('/api/v1/amenities/?limit=100')
+            sizes.append(len(response.get_json()['results']))
+
+        self.assertConstantQueries(get_amenities)
+        self.assertEqual(sizes, [2, 10])
+
+
+class TestSparseFields(unittest.TestCase):
+    """List queries load only the requested columns."""
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.repo = UserRepository()
+        self.repo.add_many([
+            User(first_name="Ada", last_name=str(i),
+                 email=f"ada{i}@example.com", password="secret")
+            for i in range(3)])
+        db.session.expunge_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def test_page_selects_requested_columns(self):
+        with count_queries() as statements:
+            users = self.repo.get_page(limit=2, columns=['id', 'email'])
+            rows = [user.to_dict(['id', 'email']) for user in users]
+        self.assertEqual(len(statements), 1)
+        selected = statements[0][0].split(' FROM ')[0]
+        self.assertIn('users.email', selected)
+        self.assertIn('users.created_at', selected)
+        self.assertNotIn('users.password', selected)
+        self.assertNotIn('users.first_name', selected)
+        self.assertEqual([sorted(row) for row in rows], [['email', 'id']] * 2)
+
+
+class TestSerializers(unittest.TestCase):
+    """Serializers generated from the column metadata of the models."""
+
+    def setUp(self):
+        self.user = User(first_name="Ada", last_name="Lovelace",
+                         email="ada@example.com", password="secret")
+        self.place = Place(title="Maison", price=100, owner_id="owner-1")
+
+    def test_serializes_columns(self):
+        data = serializer(User)(self.user)
+        self.assertEqual(data['email'], "ada@example.com")
+        self.assertEqual(data['created_at'],
+                         self.user.created_at.isoformat())
+        self.assertEqual(data, self.user.to_dict())
+
+    def test_fields_order_and_batches(self):
+        serialize = serializer(User, ['email', 'id'])
+        self.assertEqual(list(serialize(self.user)), ['email', 'id'])
+        self.assertEqual(serialize.many([self.user, self.user]),
+                         [serialize(self.user)] * 2)
+        self.assertIs(serializer(User, ('email', 'id')), serialize)
+
+    def test_computed_fields_and_relations(self):
+        serialize = serializer(Place, ['id', 'rating_histogram'],
+                               ['reviews'])
+        self.assertEqual(serialize(self.place), {
+            'id': self.place.id,
+            'rating_histogram': {str(rating): 0 for rating in range(1, 6)},
+            'reviews': []})
+
+    def test_unknown_names_raise(self):
+        for fields, expand in ((['password2'], ()), (['id'], ['author']),
+                               (['id); import os'], ())):
+            with self.assertRaises(ValueError):
+                serializer(Place, fields, expand)
+
+
+class TestQueryPlans(unittest.TestCase):
+    """EXPLAIN QUERY PLAN of the statements run by repository queries:
+    every table must be searched through an index, never scanned."""
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def assertUsesIndexes(self, call):
+        with count_queries() as statements:
+            call()
+        self.assertTrue(statements)
+        for statement, parameters in statements:
+            plan = [row[-1] for row in db.session.connection().exec_driver_sql(
+                'EXPLAIN QUERY PLAN ' + statement, parameters)]
+            for step in plan:
+                self.assertFalse(
+                    step.startswith('SCAN') and 'USING' not in step
+                    or 'TEMP B-TREE FOR ORDER BY' in step,
+                    f"{step!r} in the plan of {statement}")
+
+    def test_repository_queries_use_indexes(self):
+        users, places = UserRepository(), PlaceRepository()
+        reviews, amenities = ReviewRepository(), AmenityRepository()
+        after = (datetime(2024, 1, 1), "id")
+        for call in (
+            lambda: users.get("id"),
+            lambda: users.get_by_attribute('email', "a@example.com"),
+            lambda: users.get_page(after),
+            lambda: places.get_by_attribute('owner_id', "owner-1"),
+            lambda: places.get_by_attribute('user_id', "user-1"),
+            lambda: places.get_all_by_range('price', 10, 100),
+            lambda: places.get_all_in_bbox(40, -80, 45, -70),
+            lambda: places.get_page(),
+            lambda: places.get_page(after),
+            lambda: reviews.get_by_attribute('place_id', "p1"),
+            lambda: reviews.get_by_attribute('user_id', "user-1"),
+            lambda: reviews.get_by_user_and_place("user-1", "p1"),
+            lambda: reviews.get_page_by_place("p1"),
+            lambda: reviews.get_page_by_place("p1", after),
+            lambda: reviews.get_page_by_place(
+                "p1", (5,) + after, order_by=('rating', 'created_at')),
+            lambda: amenities.get_page(after),
+        ):
+            self.assertUsesIndexes(call)
+
+    def test_migration_builds_missing_indexes(self):
+        db.session.execute(
+            db.text('DROP INDEX ix_reviews_place_id_created_at'))
+        db.session.commit()
+        self.assertEqual(create_missing_indexes(db.engine),
+                         ['ix_reviews_place_id_created_at'])
+        self.assertEqual(create_missing_indexes(db.engine), [])
+
+    def test_migration_adds_missing_columns(self):
+        db.session.execute(
+            db.text('ALTER TABLE places DROP COLUMN rating_5_count'))
+        db.session.commit()
+        self.assertEqual(add_missing_columns(db.engine),
+                         ['places.rating_5_count'])
+        self.assertEqual(add_missing_columns(db.engine), [])
+        self.assertUsesIndexes(
+            lambda: ReviewRepository().get_by_attribute('place_id', "p1"))
+
+
+class TestRatingAggregates(unittest.TestCase):
+    """The rating aggregates of a place follow the writes of its reviews
+    and match a recount of them."""
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+        self.place = Place(title="Loft", description="", price=80.0,
+                           latitude=48.8, longitude=2.3, owner_id="owner")
+        self.users = [User(first_name="Guest", last_name=str(i),
+                           email=f"guest{i}@example.com", password="secret")
+                      for i in range(3)]
+        for obj in [self.place] + self.users:
+            storage.add(obj)
+            self.addCleanup(storage.delete, obj.id)
+
+    def review(self, user, rating):
+        review = self.facade.create_review({
+            'text': "Nice", 'rating': rating, 'user_id': user.id,
+            'place_id': self.place.id})
+        self.addCleanup(storage.delete, review.id)
+        return review
+
+    def aggregates(self):
+        place = storage.get(self.place.id)
+        return (place.review_count, place.rating_sum, place.average_rating,
+                [getattr(place, f'rating_{rating}_count')
+                 for rating in range(1, 6)])
+
+    def test_review_writes_update_aggregates(self):
+        first = self.review(self.users[0], 5)
+        second = self.review(self.users[1], 3)
+        self.assertEqual(self.aggregates(), (2, 8, 4.0, [0, 0, 1, 0, 1]))
+
+        self.facade.admin_update_review(second.id, {'rating': 1})
+        self.assertEqual(self.aggregates(), (2, 6, 3.0, [1, 0, 0, 0, 1]))
+        # Text only: the aggregates are left alone
+        with mock.patch('app.services.facade.get_jwt_identity',
+                        return_value=first.user_id):
+            self.facade.update_review(first.id, {'text': "Great"})
+            self.facade.delete_review(first.id)
+            # Already deleted, counted once
+            self.facade.delete_review(first.id)
+        self.assertEqual(self.aggregates(), (1, 1, 1.0, [1, 0, 0, 0, 0]))
+
+        with self.assertRaises(ValidationError):
+            self.review(self.users[1], 4)
+        self.assertEqual(self.aggregates()[0], 1)
+
+        counted = self.aggregates()
+        storage.update(self.place.id, {'review_count': 0, 'rating_sum': 0})
+        self.facade.rebuild_place_ratings()
+        self.assertEqual(self.aggregates(), counted)
+        self.assertEqual(
+            storage.get(self.place.id).to_dict()['rating_histogram'],
+            {'1': 1, '2': 0, '3': 0, '4': 0, '5': 0})
+
+
+class TestPlaceUpdates(unittest.TestCase):
+    """Place updates reach the storage indexes."""
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+        self.place = Place(title="Loft", description="City loft",
+                           price=100.0, latitude=48.8, longitude=2.3,
+                           owner_id="owner")
+        storage.add(self.place)
+        self.addCleanup(storage.delete, self.place.id)
+
+    def ids(self, objs):
+        return [obj.id for obj in objs]
+
+    def test_update_reindexes_place(self):
+        with mock.patch('app.services.facade.get_jwt_identity',
+                        return_value="owner"):
+            place = self.facade.update_place(self.place.id, {
+                'title': "Seaside villa", 'price': 900.0, 'latitude': 43.7,
+                'amenities': [], 'review_count': 99, 'owner_id': "other"})
+        self.assertEqual(
+            (place.title, place.price, place.review_count, place.owner_id),
+            ("Seaside villa", 900.0, 0, "owner"))
+        self.assertNotIn(self.place.id, self.ids(
+            storage.get_all_by_range('price', 50, 150, cls=Place)))
+        self.assertIn(self.place.id, self.ids(
+            storage.get_all_by_range('price', 800, 1000, cls=Place)))
+        self.assertIn(self.place.id, self.ids(
+            storage.get_all_in_bbox(43.5, 2.0, 44.0, 2.5, cls=Place)))
+        _, found = storage.search('places', 'villa', cls=Place)
+        self.assertIn(self.place.id, [obj.id for _, obj in found])
+        _, found = storage.search('places', 'loft', cls=Place)
+        self.assertIn(self.place.id, [obj.id for _, obj in found])
+
+
+class TestUnitOfWork(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.repo = AmenityRepository()
+
+        @self.app.route('/_test/amenities/<int:count>/<int:status>')
+        def add_amenities(count, status):
+            for i in range(count):
+                self.repo.add(Amenity(name=f"Amenity {i}"))
+            if status == 500:
+                raise RuntimeError("failed request")
+            return {}, status
+
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        self.commits = []
+        self.record_commit = self.commits.append
+        event.listen(db.engine, 'commit', self.record_commit)
+
+    def tearDown(self):
+        event.remove(db.engine, 'commit', self.record_commit)
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def test_one_commit_per_request(self):
+        response = self.client.get('/_test/amenities/3/200')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.commits), 1)
+        self.assertEqual(len(self.repo.get_all()), 3)
+
+    def test_failed_request_rolls_back(self):
+        self.client.get('/_test/amenities/2/400')
+        with self.assertRaises(RuntimeError):
+            self.client.get('/_test/amenities/2/500')
+        self.assertEqual(self.commits, [])
+        self.assertEqual(self.repo.get_all(), [])
+
+    def test_commits_at_once_outside_requests(self):
+        self.repo.add(Amenity(name="Wifi"))
+        self.repo.add(Amenity(name="Pool"))
+        self.assertEqual(len(self.commits), 2)
+
+
+class TestIdentityMap(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app("config.TestingConfig")
+        self.facade = HBnBFacade()
+        self.place = Place(title="Loft", description="", price=80.0,
+                           latitude=48.8, longitude=2.3, owner_id="owner")
+        self.review = Review(text="Great", rating=5, user_id="guest",
+                             place_id=self.place.id)
+        storage.add(self.place)
+        storage.add(self.review)
+
+        @self.app.route('/_test/lookups')
+        def lookups():
+            for _ in range(3):
+                self.facade.get_place(self.place.id)
+                self.facade.get_review(self.review.id)
+                self.facade.get_user_review_for_place("guest", self.place.id)
+                self.facade.get_place("missing")
+            return {}, 200
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        storage.delete(self.review)
+        storage.delete(self.place)
+
+    def test_entities_loaded_once_per_request(self):
+        before = identity_map.stats()
+        with mock.patch.object(storage, 'get', wraps=storage.get) as get, \
+                mock.patch.object(storage, 'get_by_attributes',
+                                  wraps=storage.get_by_attributes) as probe:
+            self.client.get('/_test/lookups')
+            self.client.get('/_test/lookups')
+        # Per request: the place and the review once, "missing" each time
+        self.assertEqual(get.call_count, 2 * (2 + 3))
+        self.assertEqual(probe.call_count, 2)
+        after = identity_map.stats()
+        self.assertEqual(after['requests'] - before['requests'], 2)
+        self.assertEqual(after['hits'] - before['hits'], 2 * 6)
+        self.assertEqual(after['misses'] - before['misses'], 2 * 6)
+
+    def test_lookups_load_outside_requests(self):
+        with mock.patch.object(storage, 'get', wraps=storage.get) as get:
+            self.facade.get_place(self.place.id)
+            self.facade.get_place(self.place.id)
+        self.assertEqual(get.call_count, 2)
+
+    def test_forget_drops_every_key(self):
+        entities = identity_map.IdentityMap()
+        entities.add(self.review.id, self.review)
+        entities.add(('review', "guest", self.place.id), self.review)
+        entities.forget(self.review)
+        self.assertEqual(entities.entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
 from app import create_app
+from app.models import storage
+from app.models.place import Place
+from app.models.review import Review
 
 
 class TestReviewEndpoints(unittest.TestCase):
@@ -37,7 +40,8 @@ class TestReviewEndpoints(unittest.TestCase):
         # Test retrieving all reviews
         response = self.client.get('/api/v1/reviews/')
         self.assertEqual(response.status_code, 200)
-        self.assertIsInstance(response.get_json(), list)
+        self.assertIsInstance(response.get_json()['results'], list)
+        self.assertIn('next_cursor', response.get_json())
 
     def test_get_review_by_id(self):
         # Test retrieving a review by a specific ID
@@ -53,6 +57,66 @@ class TestReviewEndpoints(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertIn('Review not found', response.get_json()['error'])
 
+    def test_search_reviews(self):
+        # Test the keyword search, globally and within one place
+        places = [Place(title=title, price=50, owner_id="owner")
+                  for title in ("Loft", "Studio")]
+        reviews = [
+            Review(text="Quiet and clean", rating=5,
+                   place_id=places[0].id, user_id="u1"),
+            Review(text="Clean but noisy street", rating=3,
+                   place_id=places[1].id, user_id="u1"),
+        ]
+        for obj in places + reviews:
+            storage.add(obj)
+            self.addCleanup(storage.delete, obj.id)
+
+        response = self.client.get('/api/v1/reviews/search?q=clean')
+        self.assertEqual(response.status_code, 200)
+        ids = [r['id'] for r in response.get_json()['results']]
+        self.assertTrue({reviews[0].id, reviews[1].id} <= set(ids))
+
+        response = self.client.get(
+            f'/api/v1/reviews/search?q=clean&place_id={places[1].id}')
+        data = response.get_json()
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(data['results'][0]['id'], reviews[1].id)
+
+        response = self.client.get(
+            '/api/v1/reviews/search?q=clean&place_id=unknown')
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_place_reviews_pages(self):
+        # Reviews of a place, newest first by default or best rated first
+        place = Place(title="Loft", price=50, owner_id="owner")
+        reviews = [Review(text="Nice", rating=rating, place_id=place.id,
+                          user_id=f"u{i}")
+                   for i, rating in enumerate((3, 5, 4))]
+        for obj in [place] + reviews:
+            storage.add(obj)
+            self.addCleanup(storage.delete, obj.id)
+        url = f'/api/v1/reviews/places/{place.id}/reviews'
+
+        response = self.client.get(url + '?limit=2')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        newest = sorted(reviews, key=lambda r: (r.created_at, r.id),
+                        reverse=True)
+        self.assertEqual([r['id'] for r in data['results']],
+                         [r.id for r in newest[:2]])
+        response = self.client.get(
+            f"{url}?limit=2&cursor={data['next_cursor']}")
+        data = response.get_json()
+        self.assertEqual([r['id'] for r in data['results']], [newest[2].id])
+        self.assertIsNone(data['next_cursor'])
+
+        response = self.client.get(url + '?sort=rating')
+        self.assertEqual([r['rating'] for r in response.get_json()['results']],
+                         [5, 4, 3])
+
+        response = self.client.get(url + '?sort=oldest')
+        self.assertEqual(response.status_code, 400)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Multi-threaded stress and throughput benchmark of the in-memory storage.
+
+Runs reader threads (``get``, ``get_by_attribute`` and ``get_all`` on a
+class partition) against writer threads (``add``, ``update``, ``delete``)
+for a fixed time, once per lock policy, and reports the operations per
+second of each side. The repository invariants are checked at the end of
+every run.
+
+Usage (from the part3 directory):
+    python -m benchmarks.bench_concurrency [--readers N] [--writers N]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from app.models import amenity, user  # noqa: F401 (mapper registry)
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.locks import ExclusiveLock, ReadWriteLock
+from app.persistence.repository import InMemoryRepository
+
+
+def build(lock, places):
+    """Creates a repository preloaded with synthetic places and reviews."""
+    repo = InMemoryRepository(indexes=('owner_id', 'place_id'), lock=lock)
+    ids = []
+    for i in range(places):
+        place = Place(title=f"Place {i}", price=10 + i % 500,
+                      owner_id=f"owner-{i % 50}")
+        repo.add(place)
+        repo.add(Review(text="Nice", rating=1 + i % 5, place_id=place.id,
+                        user_id=f"user-{i}"))
+        ids.append(place.id)
+    return repo, ids
+
+
+def run(lock, args):
+    repo, ids = build(lock, args.places)
+    stop = threading.Event()
+    counts = {'read': 0, 'write': 0}
+    counts_lock = threading.Lock()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        done = 0
+        while not stop.is_set():
+            repo.get(rng.choice(ids))
+            repo.get_by_attribute('owner_id', f"owner-{rng.randrange(50)}")
+            if done % 20 == 0:
+                repo.get_all(Place)
+            done += 1
+        with counts_lock:
+            counts['read'] += done
+
+    def writer(seed):
+        rng = random.Random(seed)
+        done = 0
+        while not stop.is_set():
+            place = Place(title="New", price=99,
+                          owner_id=f"owner-{rng.randrange(50)}")
+            repo.add(place)
+            repo.update(place.id, {'price': 120})
+            repo.delete(place.id)
+            done += 1
+        with counts_lock:
+            counts['write'] += done
+
+    threads = [threading.Thread(target=reader, args=(i,))
+               for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + i,))
+                for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    # Every writer removes what it adds
+    assert repo.count(Place) == args.places
+    assert len(repo.get_all(Place)) == args.places
+    return (counts['read'] / args.seconds, counts['write'] / args.seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{args.places} places, {args.readers} readers, "
+          f"{args.writers} writers, {args.seconds}s per run")
+    for label, lock in (('exclusive lock', ExclusiveLock()),
+                        ('read/write lock', ReadWriteLock())):
+        reads, writes = run(lock, args)
+        print(f"{label:<16} reads {reads:10.0f} ops/s   "
+              f"writes {writes:8.0f} ops/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark of request latency with debug tracing on and off.
+
+Fills the in-memory storage with places, then times
+``GET /api/v1/places/<id>`` through the Flask test client with the ``app``
+loggers at DEBUG (every trace formatted and queued) and at WARNING (trace
+calls return immediately).
+
+Usage (from the part3 directory):
+    python -m benchmarks.bench_logging [--places N] [--requests N]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import time
+
+from app import create_app
+from app.logger import configure_logging
+from app.models import storage
+from app.models.place import Place
+
+
+def populate(places):
+    """Adds synthetic places to the storage."""
+    ids = []
+    for i in range(places):
+        place = Place(title=f"Place {i}", price=50 + i % 200,
+                      owner_id=f"owner-{i % 100}",
+                      description="A quiet place " * 10,
+                      latitude=(i % 180) - 90.0,
+                      longitude=(i % 360) - 180.0)
+        storage.add(place)
+        ids.append(place.id)
+    return ids
+
+
+def measure(client, ids, requests):
+    """Returns the per-request latencies in microseconds."""
+    timings = []
+    for i in range(requests):
+        place_id = ids[i % len(ids)]
+        start = time.perf_counter()
+        response = client.get(f'/api/v1/places/{place_id}')
+        timings.append((time.perf_counter() - start) * 1e6)
+        assert response.status_code == 200
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"{label:<14} mean {statistics.mean(timings):9.1f} us   "
+          f"p50 {statistics.median(timings):9.1f} us   p99 {p99:9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    app = create_app("config.TestingConfig")
+    client = app.test_client()
+    ids = populate(args.places)
+    app_logger = logging.getLogger('app')
+
+    with open(os.devnull, 'w') as devnull:
+        # Route the listener output away from the terminal
+        configure_logging(app, stream=devnull)
+
+        print(f"{args.places} places, {args.requests} requests")
+        for label, level in (('tracing off', logging.WARNING),
+                             ('tracing on', logging.DEBUG)):
+            app_logger.setLevel(level)
+            measure(client, ids, min(200, args.requests))  # warm-up
+            report(label, measure(client, ids, args.requests))
+        app_logger.setLevel(logging.WARNING)
+        storage.clear_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Memory footprint of places in the in-memory storage.
+
+Fills a repository with synthetic places, once storing the mapped
+``Place`` instances and once as compact slots records, and reports the
+bytes retained per place (traced with ``tracemalloc``, indexes included)
+along with the time of a ``get`` and of a ``get_all`` + ``to_dict`` pass.
+
+Usage (from the part3 directory):
+    python -m benchmarks.bench_memory [--places N]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from app.models import amenity, review, user  # noqa: F401 (mapper registry)
+from app.models.place import Place
+from app.persistence.repository import InMemoryRepository
+
+
+def fill(repo, places):
+    """Adds synthetic places and returns their ids."""
+    ids = []
+    for i in range(places):
+        place = Place(title=f"Place {i}", price=10.0 + i % 500,
+                      owner_id=f"owner-{i % 1000}",
+                      description="A quiet place",
+                      latitude=-90 + (i * 0.37) % 180,
+                      longitude=-180 + (i * 0.73) % 360)
+        repo.add(place)
+        ids.append(place.id)
+    return ids
+
+
+def run(compact, places):
+    repo = InMemoryRepository(indexes=('owner_id',))
+    if compact:
+        repo.compact(Place)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ids = fill(repo, places)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The id list belongs to the benchmark, the id strings to the storage
+    retained -= sys.getsizeof(ids)
+
+    rng = random.Random(0)
+    sample = [rng.choice(ids) for _ in range(100000)]
+    start = time.perf_counter()
+    for obj_id in sample:
+        repo.get(obj_id)
+    get_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    start = time.perf_counter()
+    for place in repo.get_all(Place):
+        place.to_dict()
+    dump_ms = (time.perf_counter() - start) * 1000
+    return retained / places, get_us, dump_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--places', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{args.places} places")
+    for label, compact in (('mapped instances', False),
+                           ('compact records', True)):
+        per_place, get_us, dump_ms = run(compact, args.places)
+        print(f"{label:<17} {per_place:8.0f} bytes/place   "
+              f"get {get_us:6.2f} us   get_all+to_dict {dump_ms:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Latency of nearest-place searches on the grid index.
+
+Indexes synthetic place coordinates (clustered around cities, like real
+listings, plus uniform noise) and times ``GridIndex.nearest`` against a
+brute-force haversine scan with ``heapq.nsmallest``, checking both agree.
+Runs at 100k and 1M points by default; the storage itself is left out so
+that a million points fit in memory.
+
+Usage (from the part3 directory):
+    python -m benchmarks.bench_nearby [--sizes 100000 1000000]
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+from app.persistence.spatial import GridIndex, haversine_km
+
+
+def synthetic_points(count, rng):
+    """Returns (id, latitude, longitude) tuples."""
+    cities = [(rng.uniform(-60, 70), rng.uniform(-180, 180))
+              for _ in range(200)]
+    points = []
+    for i in range(count):
+        if i % 10 == 0:
+            latitude, longitude = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        else:
+            city_lat, city_lon = rng.choice(cities)
+            latitude = max(-90.0, min(90.0, rng.gauss(city_lat, 0.3)))
+            longitude = (rng.gauss(city_lon, 0.3) + 180) % 360 - 180
+        points.append((f"place-{i}", latitude, longitude))
+    return points
+
+
+def brute_force(points, latitude, longitude, k, radius_km):
+    distances = (
+        (haversine_km(latitude, longitude, lat, lon), obj_id)
+        for obj_id, lat, lon in points
+    )
+    if radius_km is not None:
+        distances = (pair for pair in distances if pair[0] <= radius_km)
+    return heapq.nsmallest(k, distances)
+
+
+def timed(func, queries):
+    start = time.perf_counter()
+    results = [func(*query) for query in queries]
+    return (time.perf_counter() - start) / len(queries) * 1000, results
+
+
+def run(size, args):
+    rng = random.Random(size)
+    points = synthetic_points(size, rng)
+    index = GridIndex()
+    start = time.perf_counter()
+    for obj_id, latitude, longitude in points:
+        index.insert(obj_id, latitude, longitude)
+    build_s = time.perf_counter() - start
+    print(f"{size} places, grid built in {build_s:.1f}s")
+
+    # Query around existing places, as a map client would
+    queries = []
+    for _ in range(args.queries):
+        _, latitude, longitude = rng.choice(points)
+        queries.append((latitude, longitude))
+
+    for radius_km in (args.radius_km, None):
+        label = (f"k={args.limit} within {radius_km} km"
+                 if radius_km else f"k={args.limit} unbounded")
+        grid_ms, grid = timed(
+            lambda lat, lon: index.nearest(lat, lon, args.limit, radius_km),
+            queries)
+        sample = queries[:args.brute_force_queries]
+        scan_ms, scan = timed(
+            lambda lat, lon: brute_force(points, lat, lon, args.limit,
+                                         radius_km),
+            sample)
+        for found, expected in zip(grid, scan):
+            assert [round(d, 9) for d, _ in found] == \
+                [round(d, 9) for d, _ in expected]
+        print(f"  {label:<24} grid {grid_ms:8.3f} ms/query   "
+              f"full scan {scan_ms:9.1f} ms/query   "
+              f"speedup {scan_ms / grid_ms:8.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100000, 1000000])
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--radius-km', type=float, default=25.0)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--brute-force-queries', type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args)
+
+
+if __name__ == '__main__':
+    main()
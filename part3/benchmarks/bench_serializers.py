@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark of serialization throughput, in objects per second.
+
+Serializes batches of places (models and the compact records of the
+storage), users and reviews with the generated serializers, one object at
+a time and with ``many``, and with copies of the ``to_dict`` methods they
+replaced: a per-field dispatch with ``hasattr`` checks for places, a loop
+over the mapper columns with ``isinstance`` checks for the other models.
+
+Usage (from the part3 directory):
+    python -m benchmarks.bench_serializers [--objects N] [--repeat N]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import InvalidRequestError
+
+from app import create_app
+from app.models import storage
+from app.models.base_model import BaseModel
+from app.models.place import (PLACE_FIELDS, PLACE_RELATIONS, RATINGS, Place,
+                              place_serializer)
+from app.models.review import Review
+from app.models.serializers import serializer
+from app.models.user import User
+
+
+def legacy_place_to_dict(place, fields=None, expand=None):
+    """Place.to_dict before the generated serializers."""
+    if fields is None:
+        fields = PLACE_FIELDS
+        if expand is None:
+            expand = PLACE_RELATIONS
+    place_dict = {name: legacy_place_field(place, name) for name in fields}
+    for name in expand or ():
+        try:
+            related = getattr(place, name)
+        except InvalidRequestError:
+            continue
+        place_dict[name] = [item.to_dict() if hasattr(item, 'to_dict')
+                            else item for item in related]
+    return place_dict
+
+
+def legacy_place_field(place, name):
+    if name == 'owner_id':
+        return place.owner_id if isinstance(place.owner_id, BaseModel) \
+            else place.owner_id
+    if name == 'review_count':
+        return place.review_count or 0
+    if name == 'average_rating':
+        return round(place.average_rating or 0.0, 2)
+    if name == 'bayesian_rating':
+        return round(place.bayesian_rating, 2) \
+            if place.bayesian_rating is not None else None
+    if name == 'rating_histogram':
+        return {str(rating): getattr(place, f'rating_{rating}_count') or 0
+                for rating in RATINGS}
+    return getattr(place, name)
+
+
+def legacy_to_dict(obj, fields=None):
+    """BaseModel.to_dict before the generated serializers."""
+    if fields is None:
+        fields = [attr.key for attr in sa_inspect(type(obj)).column_attrs]
+    obj_dict = {}
+    for name in fields:
+        value = getattr(obj, name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        obj_dict[name] = value
+    return obj_dict
+
+
+def populate(count):
+    """Returns places, their compact records, users and reviews."""
+    # Hashing the passwords makes users slow to create, a few are repeated
+    users = [User(first_name="Ada", last_name=f"Lovelace {i}",
+                  email=f"ada{i}@example.com", password="secret")
+             for i in range(min(count, 20))]
+    users = (users * (count // len(users) + 1))[:count]
+    places, reviews = [], []
+    for i in range(count):
+        place = Place(title=f"Place {i}", price=50 + i % 200,
+                      owner_id=f"owner-{i % 100}",
+                      description="A quiet place " * 10,
+                      latitude=(i % 180) - 90.0,
+                      longitude=(i % 360) - 180.0)
+        storage.add(place)
+        places.append(place)
+        reviews.append(Review(text="Great place to stay! " * 5,
+                              rating=1 + i % 5, place_id=place.id,
+                              user_id=users[i].id))
+    records = [storage.get(place.id) for place in places]
+    return places, records, users, reviews
+
+
+def measure(serialize, objs, repeat):
+    """Returns the best throughput of serialize(objs), in objects/s."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(objs)
+        best = min(best, time.perf_counter() - start)
+    return len(objs) / best
+
+
+def report(label, rates):
+    baseline = rates[0][1]
+    print(label)
+    for name, rate in rates:
+        print(f"  {name:<20} {rate:12,.0f} obj/s   x{rate / baseline:5.2f}")
+
+
+def compare(label, objs, legacy, generated, repeat):
+    report(label, [
+        ('legacy to_dict', measure(
+            lambda batch: [legacy(obj) for obj in batch], objs, repeat)),
+        ('serializer', measure(
+            lambda batch: [generated(obj) for obj in batch], objs, repeat)),
+        ('serializer.many', measure(generated.many, objs, repeat)),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        places, records, users, reviews = populate(args.objects)
+        review_fields = ('id', 'text', 'rating', 'user_id', 'place_id')
+
+        print(f"{args.objects} objects, best of {args.repeat}")
+        compare('places', places, legacy_place_to_dict, place_serializer(),
+                args.repeat)
+        compare('compact places', records, legacy_place_to_dict,
+                place_serializer(), args.repeat)
+        compare('places, 3 fields', places,
+                lambda place: legacy_place_to_dict(
+                    place, ('id', 'title', 'price')),
+                place_serializer(('id', 'title', 'price')), args.repeat)
+        compare('users', users, legacy_to_dict, serializer(User),
+                args.repeat)
+        compare('reviews, 5 fields', reviews,
+                lambda review: legacy_to_dict(review, review_fields),
+                serializer(Review, review_fields), args.repeat)
+        storage.clear_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Read/write throughput of SQLite under the development and production
+engine configurations.
+
+Builds an engine from each config class (engine options and SQLite
+pragmas) on a fresh database file seeded with synthetic places, then runs
+reader threads (a place by id, a price range page) against writer threads
+(a review insert and a price update, each committed on its own) for a
+fixed time. Reports the operations per second of each side and the p99
+read latency, where readers waiting behind writers show up.
+
+Usage (from the part3 directory):
+    python -m benchmarks.bench_sqlite [--readers N] [--writers N]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models import amenity, user  # noqa: F401 (mapper registry)
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.sqlite import apply_pragmas
+from config import DevelopmentConfig, ProductionConfig
+
+places = Place.__table__
+reviews = Review.__table__
+
+
+def build_engine(config, path):
+    engine = create_engine(f'sqlite:///{path}',
+                           **getattr(config, 'SQLALCHEMY_ENGINE_OPTIONS', {}))
+    apply_pragmas(engine, config.SQLITE_PRAGMAS)
+    return engine
+
+
+def seed(engine, count):
+    """Creates the tables and synthetic places, returns their ids."""
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    rows = [{
+        'id': str(uuid.uuid4()), 'title': f"Place {i}",
+        'description': "A quiet place", 'price': 10.0 + i % 500,
+        'latitude': 0.0, 'longitude': 0.0, 'owner_id': f"owner-{i % 50}",
+        'user_id': f"owner-{i % 50}", 'created_at': now, 'updated_at': now,
+    } for i in range(count)]
+    with engine.begin() as conn:
+        conn.execute(insert(places), rows)
+    return [row['id'] for row in rows]
+
+
+def run(config, args):
+    directory = tempfile.mkdtemp()
+    engine = build_engine(config, os.path.join(directory, 'bench.db'))
+    ids = seed(engine, args.places)
+    stop = threading.Event()
+    reads, writes, errors = [0], [0], [0]
+    latencies = []
+    counter_lock = threading.Lock()
+
+    def reader(seed_value):
+        rng = random.Random(seed_value)
+        count, samples = 0, []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(select(places).where(
+                        places.c.id == rng.choice(ids))).first()
+                    low = rng.uniform(10, 500)
+                    conn.execute(select(places).where(
+                        places.c.price.between(low, low + 20))
+                        .order_by(places.c.price).limit(20)).all()
+            except OperationalError:
+                with counter_lock:
+                    errors[0] += 1
+                continue
+            samples.append(time.perf_counter() - start)
+            count += 1
+        with counter_lock:
+            reads[0] += count
+            latencies.extend(samples)
+
+    def writer(seed_value):
+        rng = random.Random(seed_value)
+        count = 0
+        while not stop.is_set():
+            now = datetime.utcnow()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(reviews).values(
+                        id=str(uuid.uuid4()), text="Nice", rating=4,
+                        place_id=rng.choice(ids), user_id=str(uuid.uuid4()),
+                        created_at=now, updated_at=now))
+                with engine.begin() as conn:
+                    conn.execute(update(places).where(
+                        places.c.id == rng.choice(ids)).values(
+                        price=rng.uniform(10, 500), updated_at=now))
+            except OperationalError:
+                with counter_lock:
+                    errors[0] += 1
+                continue
+            count += 2
+        with counter_lock:
+            writes[0] += count
+
+    threads = ([threading.Thread(target=reader, args=(i,))
+                for i in range(args.readers)]
+               + [threading.Thread(target=writer, args=(1000 + i,))
+                  for i in range(args.writers)])
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    shutil.rmtree(directory)
+
+    latencies.sort()
+    p99_ms = latencies[int(len(latencies) * 0.99)] * 1000 if latencies \
+        else float('nan')
+    return (reads[0] / args.duration, writes[0] / args.duration, p99_ms,
+            errors[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--places', type=int, default=20000)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, "
+          f"{args.places} places, {args.duration:.0f}s per config")
+    for label, config in (('development', DevelopmentConfig),
+                          ('production', ProductionConfig)):
+        reads, writes, p99_ms, errors = run(config, args)
+        print(f"{label:<12} reads {reads:9.0f} ops/s   "
+              f"writes {writes:7.0f} ops/s   read p99 {p99_ms:7.2f} ms   "
+              f"errors {errors}")
+
+
+if __name__ == '__main__':
+    main()
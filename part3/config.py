@@ -10,10 +10,41 @@ class Config:
         environment variables.
         DEBUG (bool): Flag indicating if debugging is enabled; default is
         False.
+        LOG_LEVEL (str): Level of the application loggers, retrieved from
+        environment variables; default is WARNING.
+        LOG_LEVELS (dict): Per-module logger levels overriding LOG_LEVEL,
+        e.g. {'app.persistence': 'DEBUG'}.
+        STORAGE_COMPACT_MODELS (tuple): Names of the models the in-memory
+        storage keeps as compact slots records.
+        STORAGE_DIR (str): Directory where the in-memory storage keeps its
+        journal and snapshots; persistence is disabled when unset.
+        STORAGE_COMMIT_INTERVAL (float): Seconds the journal waits to group
+        writes into one fsync.
+        STORAGE_SNAPSHOT_INTERVAL (float): Seconds between compactions of
+        the journal into a snapshot.
+        STORAGE_SNAPSHOT_MIN_RECORDS (int): Journal records needed before a
+        compaction runs.
+        SQLITE_PRAGMAS (dict): PRAGMA settings applied to every new SQLite
+        connection, e.g. {'journal_mode': 'WAL'}; none by default.
+        UNIT_OF_WORK (bool): Run each request in a unit of work: database
+        writes are flushed, then committed once at the end of the request
+        (rolled back if it fails), and the storage journal synced once.
+        IDENTITY_MAP (bool): Keep the entities looked up by a request, so
+        each one is loaded at most once per request.
     """
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     JWT_SECRET_KEY = 'your_secret_key'
     DEBUG = False
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'WARNING')
+    LOG_LEVELS = {}
+    STORAGE_COMPACT_MODELS = ('Place',)
+    STORAGE_DIR = os.getenv('HBNB_STORAGE_DIR')
+    STORAGE_COMMIT_INTERVAL = 0.002
+    STORAGE_SNAPSHOT_INTERVAL = 300
+    STORAGE_SNAPSHOT_MIN_RECORDS = 1000
+    SQLITE_PRAGMAS = {}
+    UNIT_OF_WORK = True
+    IDENTITY_MAP = True
 
 
 class DevelopmentConfig(Config):
@@ -24,12 +55,56 @@ class DevelopmentConfig(Config):
     development environment.
     """
     DEBUG = True
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 
+class ProductionConfig(Config):
+    """
+    Production configuration with a tuned connection pool and SQLite.
+
+    The pool keeps pool_size connections open, plus max_overflow under
+    load, checks each one before use (pre-ping) and replaces those older
+    than pool_recycle seconds. SQLite runs in WAL mode so that readers are
+    not blocked by a writer, with synchronous=NORMAL (durable at each
+    checkpoint, safe against corruption), memory-mapped reads, a 64 MiB
+    page cache and a 5 s wait on a locked database instead of an error.
+    """
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL',
+                                        'sqlite:///production.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,  # in KiB when negative
+        'busy_timeout': 5000,
+    }
+
+
+class TestingConfig(Config):
+    """
+    Testing configuration using a throwaway in-memory SQLite database.
+    """
+    TESTING = True
+    STORAGE_DIR = None
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
 # Dictionary to manage configurations by environment
 config = {
     'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
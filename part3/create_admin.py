@@ -10,12 +10,10 @@ def create_admin():
     """Create an admin user if it doesn't exist"""
     app = create_app()
     with app.app_context():
-        # Check if admin already exists
-        existing_users = storage.get_all(User)
-        for user in existing_users:
-            if user.email == "admin@example.com":
-                print("Admin user already exists")
-                return
+        # Check if admin already exists, through the email index
+        if storage.get_by_attribute('email', "admin@example.com"):
+            print("Admin user already exists")
+            return
 
         # Create admin user
         try:
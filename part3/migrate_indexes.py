@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Script to add the columns and build the indexes declared on the models
+that an existing database (development.db by default) is missing"""
+
+from app import create_app, db
+from app.models import amenity, place, review, user  # noqa: F401 (tables)
+from app.persistence.migrations import (
+    add_missing_columns, create_missing_indexes)
+
+
+def migrate_indexes():
+    """Add the missing columns, then create the missing indexes and report
+    them"""
+    app = create_app()
+    with app.app_context():
+        added = add_missing_columns(db.engine)
+        for name in added:
+            print(f"Added column {name}")
+        created = create_missing_indexes(db.engine)
+        if not added and not created:
+            print("All declared columns and indexes already exist")
+            return
+        for name in created:
+            print(f"Created index {name}")
+
+
+if __name__ == "__main__":
+    migrate_indexes()
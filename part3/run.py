@@ -17,8 +17,8 @@ def create_admin_if_not_exists():
     """Create admin user if it doesn't exist."""
     with app.app_context():
         # Check if admin already exists
-        users = storage.get_all(User)
-        admin_exists = any(user.email == "admin@example.com" for user in users)
+        admin_exists = storage.get_by_attribute(
+            'email', "admin@example.com") is not None
 
         if not admin_exists:
             print("\n=== Creating admin user ===")
@@ -9,6 +9,8 @@ CREATE TABLE IF NOT EXISTS users (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS ix_users_created_at ON users (created_at);
+
 CREATE TABLE IF NOT EXISTS places (
     id CHAR(36) PRIMARY KEY,
     title VARCHAR(255),
@@ -17,11 +19,25 @@ CREATE TABLE IF NOT EXISTS places (
     latitude FLOAT,
     longitude FLOAT,
     owner_id CHAR(36),
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    average_rating FLOAT NOT NULL DEFAULT 0,
+    bayesian_rating FLOAT,
+    rating_1_count INT NOT NULL DEFAULT 0,
+    rating_2_count INT NOT NULL DEFAULT 0,
+    rating_3_count INT NOT NULL DEFAULT 0,
+    rating_4_count INT NOT NULL DEFAULT 0,
+    rating_5_count INT NOT NULL DEFAULT 0,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (owner_id) REFERENCES users(id)
 );
 
+CREATE INDEX IF NOT EXISTS ix_places_price ON places (price);
+CREATE INDEX IF NOT EXISTS ix_places_lat_lon ON places (latitude, longitude);
+CREATE INDEX IF NOT EXISTS ix_places_created_at ON places (created_at);
+CREATE INDEX IF NOT EXISTS ix_places_owner_id ON places (owner_id);
+
 CREATE TABLE IF NOT EXISTS reviews (
     id CHAR(36) PRIMARY KEY,
     text TEXT,
@@ -31,9 +47,17 @@ CREATE TABLE IF NOT EXISTS reviews (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id),
-    FOREIGN KEY (place_id) REFERENCES places(id)
+    FOREIGN KEY (place_id) REFERENCES places(id),
+    CONSTRAINT uq_reviews_user_place UNIQUE (user_id, place_id)
 );
 
+CREATE INDEX IF NOT EXISTS ix_reviews_created_at ON reviews (created_at);
+CREATE INDEX IF NOT EXISTS ix_reviews_place_id_created_at
+    ON reviews (place_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_reviews_place_id_rating
+    ON reviews (place_id, rating, created_at);
+CREATE INDEX IF NOT EXISTS ix_reviews_user_id ON reviews (user_id);
+
 CREATE TABLE IF NOT EXISTS amenities (
     id CHAR(36) PRIMARY KEY,
     name VARCHAR(255) UNIQUE,
@@ -41,6 +65,8 @@ CREATE TABLE IF NOT EXISTS amenities (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS ix_amenities_created_at ON amenities (created_at);
+
 CREATE TABLE IF NOT EXISTS place_amenity (
     place_id CHAR(36),
     amenity_id CHAR(36),